@@ -82,7 +82,16 @@ WSGI_APPLICATION = 'api.wsgi.app'
 Base de datos:
 - Soporta variables clásicas (DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT)
 - Si DATABASE_URL está definida, se usa con SSL requerido (?sslmode=require)
+- En ambos casos la conexión se reutiliza entre peticiones (e invocaciones de una
+  misma instancia serverless) durante DB_CONN_MAX_AGE segundos, verificando que
+  siga viva antes de reutilizarla; DB_CONN_MAX_AGE=0 abre una por petición
+- DB_POOLER_TRANSACCIONES=True para conectarse a un pooler en modo transacción
+  (Supavisor/PgBouncer, puerto 6543 en Supabase): cada transacción puede ir a una
+  conexión distinta del servidor, así que no se usan cursores del lado del servidor
 """
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+DB_POOLER_TRANSACCIONES = config('DB_POOLER_TRANSACCIONES', default=False, cast=bool)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -91,13 +100,22 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='YOUR_PASSWORD_HERE'),
         'HOST': config('DB_HOST', default='db.jpqhjkimtxvbqswauxod.supabase.co'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
 DATABASE_URL = config('DATABASE_URL', default=None)
 if DATABASE_URL:
     # En producción (Vercel), exige SSL
-    DATABASES['default'] = dj_database_url.parse(DATABASE_URL, conn_max_age=600, ssl_require=True)
+    DATABASES['default'] = dj_database_url.parse(
+        DATABASE_URL, conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=True, ssl_require=True
+    )
+
+if DB_POOLER_TRANSACCIONES:
+    # Sin cursores del servidor, QuerySet.iterator() carga el resultado completo en el cliente;
+    # las exportaciones en streaming leen por lotes con consultas keyset (paginacion.iterar_por_lotes)
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
 
 
 # Password validation
@@ -189,6 +207,27 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=36500),
 }
 
+# Cada cuántos segundos se verifica si las configuraciones del sistema cambiaron en otro proceso
+CONFIGURACION_VERIFICACION_SEGUNDOS = config('CONFIGURACION_VERIFICACION_SEGUNDOS', default=30, cast=int)
+
+# Caché por proceso de usuarios autenticados por JWT
+AUTH_CACHE_USUARIOS_SEGUNDOS = config('AUTH_CACHE_USUARIOS_SEGUNDOS', default=60, cast=int)
+AUTH_CACHE_USUARIOS_MAXIMO = config('AUTH_CACHE_USUARIOS_MAXIMO', default=256, cast=int)
+# Cada cuántos segundos se recargan las versiones de token vigentes (revocación)
+AUTH_VERSIONES_TOKEN_SEGUNDOS = config('AUTH_VERSIONES_TOKEN_SEGUNDOS', default=30, cast=int)
+
+# Caché de respuestas de finanzas y totales: segundos que se sirve una respuesta
+# desactualizada a peticiones simultáneas mientras otra la recalcula, y máximo de entradas
+RESPUESTAS_CACHE_STALE_SEGUNDOS = config('RESPUESTAS_CACHE_STALE_SEGUNDOS', default=300, cast=int)
+RESPUESTAS_CACHE_MAXIMO = config('RESPUESTAS_CACHE_MAXIMO', default=128, cast=int)
+
+# Consultas independientes de los reportes ejecutadas a la vez (una conexión por hilo)
+CONSULTAS_CONCURRENTES = config('CONSULTAS_CONCURRENTES', default=True, cast=bool)
+CONSULTAS_CONCURRENTES_HILOS = config('CONSULTAS_CONCURRENTES_HILOS', default=4, cast=int)
+
+# Máximo de milisegundos de un arranque en frío (manage.py verificar_arranque)
+ARRANQUE_PRESUPUESTO_MS = config('ARRANQUE_PRESUPUESTO_MS', default=1000, cast=int)
+
 # Configuración de CORS (modo permisivo para pruebas)
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -0,0 +1,36 @@
+"""
+Perfil de configuración liviano para desplegar solo la API (Vercel).
+
+La API se autentica con JWT y no usa el admin, las sesiones ni los mensajes
+de Django; quitarlos evita cargar sus apps, modelos, checks y middlewares en
+cada arranque en frío. Se activa con DJANGO_SETTINGS_MODULE=api.settings_api;
+api.settings sigue siendo el perfil completo (admin incluido) para desarrollo.
+"""
+from .settings import *  # noqa: F401,F403
+
+APPS_OMITIDAS = [
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+]
+
+# AuthenticationMiddleware depende de las sesiones; DRF asigna request.user por su cuenta
+MIDDLEWARE_OMITIDOS = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in APPS_OMITIDAS]
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in MIDDLEWARE_OMITIDOS]
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            procesador for procesador in TEMPLATES[0]['OPTIONS']['context_processors']
+            if procesador != 'django.contrib.messages.context_processors.messages'
+        ],
+    },
+}]
@@ -7,3 +7,4 @@ class ExampleConfig(AppConfig):
     
     def ready(self):
         import example.models
+        import example.signals
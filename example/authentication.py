@@ -1,7 +1,20 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from django.conf import settings
 from django.contrib.auth.backends import BaseBackend
 from django.contrib.auth.hashers import check_password
+from django.utils.functional import cached_property
+from rest_framework.authentication import BaseAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import RefreshToken
 from .models import UsuarioPersonalizado
 
+logger = logging.getLogger(__name__)
+
 class UsuarioPersonalizadoBackend(BaseBackend):
     """
     Backend de autenticación personalizado para UsuarioPersonalizado
@@ -21,3 +34,181 @@ class UsuarioPersonalizadoBackend(BaseBackend):
             return UsuarioPersonalizado.objects.get(pk=user_id)
         except UsuarioPersonalizado.DoesNotExist:
             return None
+
+
+class CacheUsuarios:
+    """
+    Caché por proceso de usuarios autenticados, indexada por user_id.
+    Cada entrada vive `ttl` segundos y se descartan las menos usadas al
+    superar `maximo` entradas. Se invalida al guardar o eliminar un usuario
+    (ver signals.py).
+    """
+
+    def __init__(self, ttl, maximo):
+        self.ttl = ttl
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+
+    def obtener(self, user_id):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(user_id)
+            if entrada and entrada[1] > ahora:
+                self._entradas.move_to_end(user_id)
+                return entrada[0]
+
+        usuario = UsuarioPersonalizado.objects.filter(pk=user_id).first()
+        if usuario is None:
+            return None
+
+        with self._lock:
+            self._entradas[user_id] = (usuario, ahora + self.ttl)
+            self._entradas.move_to_end(user_id)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+        return usuario
+
+    def invalidar(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(user_id, None)
+
+
+cache_usuarios = CacheUsuarios(
+    ttl=getattr(settings, 'AUTH_CACHE_USUARIOS_SEGUNDOS', 60),
+    maximo=getattr(settings, 'AUTH_CACHE_USUARIOS_MAXIMO', 256)
+)
+
+
+class VersionesToken:
+    """
+    Versión vigente de los tokens de cada usuario activo, en memoria.
+    Se recarga completa (id, token_version) cada `intervalo` segundos y se
+    actualiza de inmediato al guardar o eliminar un usuario en este proceso.
+    """
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._versiones = None
+        self._cargado_en = 0.0
+
+    def _vigentes(self):
+        with self._lock:
+            if self._versiones is None or time.monotonic() - self._cargado_en >= self.intervalo:
+                self._versiones = dict(
+                    UsuarioPersonalizado.objects.filter(is_active=True).values_list('id', 'token_version')
+                )
+                self._cargado_en = time.monotonic()
+            return self._versiones
+
+    def es_vigente(self, user_id, version):
+        return self._vigentes().get(user_id) == version
+
+    def actualizar(self, usuario):
+        with self._lock:
+            if self._versiones is None:
+                return
+            if usuario.is_active:
+                self._versiones[usuario.pk] = usuario.token_version
+            else:
+                self._versiones.pop(usuario.pk, None)
+
+    def eliminar(self, user_id):
+        with self._lock:
+            if self._versiones is not None:
+                self._versiones.pop(user_id, None)
+
+    def invalidar(self):
+        """Fuerza la recarga completa en la próxima consulta."""
+        with self._lock:
+            self._versiones = None
+
+
+versiones_token = VersionesToken(intervalo=getattr(settings, 'AUTH_VERSIONES_TOKEN_SEGUNDOS', 30))
+
+
+class UsuarioDeToken(TokenUser):
+    """
+    Usuario autenticado con los claims del token, sin consultar la base de
+    datos. No es una fila de UsuarioPersonalizado: save() y delete() fallan y
+    los atributos que no vienen en el token no existen. Donde se necesita la
+    fila (p. ej. una clave foránea) se usa su `id`.
+    """
+
+    @cached_property
+    def nombre(self):
+        return self.token.get('nombre', '')
+
+    @cached_property
+    def tipo_usuario(self):
+        return self.token.get('tipo_usuario')
+
+    @cached_property
+    def token_version(self):
+        return self.token['token_version']
+
+    def __getattr__(self, attr):
+        # TokenUser retorna None para cualquier atributo; aquí solo existen los de arriba
+        raise AttributeError(f"{type(self).__name__} no tiene el atributo '{attr}'")
+
+
+def generar_token(usuario):
+    """
+    Token de acceso (sin expiración) con los datos del usuario como claims,
+    para autorizar sin consultar la base de datos.
+    """
+    access_token = RefreshToken.for_user(usuario).access_token
+    access_token.set_exp(lifetime=None)
+    access_token['username'] = usuario.username
+    access_token['nombre'] = usuario.nombre
+    access_token['tipo_usuario'] = usuario.tipo_usuario
+    access_token['token_version'] = usuario.token_version
+    return str(access_token)
+
+
+class UsuarioPersonalizadoJWTAuthentication(BaseAuthentication):
+    """
+    Autenticación con el token JWT emitido por login_usuario. El token se
+    decodifica una sola vez; si trae los claims del usuario se autoriza con
+    ellos como UsuarioDeToken (solo se verifica su versión contra
+    versiones_token), y si es un token anterior sin claims el usuario se
+    resuelve desde cache_usuarios.
+    """
+
+    def authenticate(self, request):
+        auth_header = request.META.get('HTTP_AUTHORIZATION')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return None
+
+        token = auth_header.split(' ')[1]
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+        except jwt.InvalidTokenError as e:
+            logger.debug("Token JWT inválido: %s", e)
+            return None
+
+        user_id = payload.get('user_id')
+        if not user_id:
+            logger.debug("Token JWT sin user_id")
+            return None
+
+        if 'token_version' in payload:
+            if not versiones_token.es_vigente(user_id, payload['token_version']):
+                logger.debug("Token revocado del usuario %s", user_id)
+                return None
+            return (UsuarioDeToken(payload), token)
+
+        usuario = cache_usuarios.obtener(user_id)
+        if usuario is None:
+            logger.debug("Usuario del token no existe: %s", user_id)
+            return None
+
+        return (usuario, token)
+
+    def authenticate_header(self, request):
+        # Permite responder 401 (y no 403) cuando falta el token
+        return 'Bearer'
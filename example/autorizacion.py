@@ -0,0 +1,97 @@
+"""
+Cambios de estado de autorización en lote.
+
+Las asistencias elegidas se actualizan con un único UPDATE: el estado es el
+de la acción y las horas siguen la misma regla que calcular_horas_asistencia()
+(4 horas si presente y autorizada/recuperada, 0 en otro caso) expresada como
+CASE sobre `presente`. QuerySet.update no dispara señales, así que el resumen
+diario y la versión de la tabla se actualizan explícitamente.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, When, Value, DecimalField
+
+from .models import Asistencia, HORAS_POR_JORNADA
+from .resumen import programar_recalculo
+from . import versiones
+
+ESTADOS_POR_ACCION = {
+    'autorizar': 'autorizado',
+    'rechazar': 'rechazado',
+    'recuperar': 'recuperado',
+}
+
+ESTADOS_CON_HORAS = ('autorizado', 'recuperado')
+
+
+def _horas(estado, presente):
+    if presente and estado in ESTADOS_CON_HORAS:
+        return Decimal(HORAS_POR_JORNADA)
+    return Decimal(0)
+
+
+def _motivo_no_aplicable(accion, fila, hoy):
+    # Mismas reglas que directivo_recuperar_asistencia
+    if accion != 'recuperar':
+        return None
+    if fila['estado_autorizacion'] != 'pendiente':
+        return f'La asistencia debe estar en estado "pendiente" para poder recuperarla. Estado actual: {fila["estado_autorizacion"]}'
+    if fila['fecha'] >= hoy:
+        return 'Solo se pueden recuperar asistencias de fechas pasadas'
+    return None
+
+
+def aplicar_accion_en_lote(asistencias_qs, accion, ids=None):
+    """
+    Aplica `accion` ('autorizar', 'rechazar' o 'recuperar') a las asistencias
+    de `asistencias_qs`. Si se indican `ids`, el resultado incluye también los
+    que no existen. Retorna una lista con el resultado por id:
+    {'id', 'resultado': 'actualizada' | 'no_aplicable' | 'no_encontrada', ...}.
+    """
+    estado = ESTADOS_POR_ACCION[accion]
+    hoy = date.today()
+
+    with transaction.atomic():
+        filas = list(
+            asistencias_qs.select_for_update(of=('self',)).order_by('id').values(
+                'id', 'usuario_id', 'fecha', 'presente', 'estado_autorizacion'
+            )
+        )
+
+        resultados = {}
+        aplicables = []
+        for fila in filas:
+            motivo = _motivo_no_aplicable(accion, fila, hoy)
+            if motivo:
+                resultados[fila['id']] = {'id': fila['id'], 'resultado': 'no_aplicable', 'detalle': motivo}
+                continue
+            aplicables.append(fila)
+            resultados[fila['id']] = {
+                'id': fila['id'],
+                'resultado': 'actualizada',
+                'estado_autorizacion': estado,
+                'horas': '{:.2f}'.format(_horas(estado, fila['presente'])),
+            }
+
+        if aplicables:
+            horas_si_presente = _horas(estado, True)
+            Asistencia.objects.filter(id__in=[fila['id'] for fila in aplicables]).update(
+                estado_autorizacion=estado,
+                horas=Case(
+                    When(presente=True, then=Value(horas_si_presente)),
+                    default=Value(Decimal(0)),
+                    output_field=DecimalField(max_digits=4, decimal_places=2)
+                )
+            )
+            # UPDATE no dispara señales
+            programar_recalculo((fila['usuario_id'], fila['fecha']) for fila in aplicables)
+            versiones.incrementar(Asistencia)
+
+    if ids is None:
+        return list(resultados.values())
+    return [
+        resultados.get(id_, {'id': id_, 'resultado': 'no_encontrada'})
+        for id_ in dict.fromkeys(ids)
+    ]
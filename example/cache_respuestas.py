@@ -0,0 +1,144 @@
+"""
+Caché por proceso de respuestas de endpoints de solo lectura costosos
+(finanzas y totales de horarios).
+
+Cada entrada guarda los datos de la respuesta junto con las versiones de
+cambios de las tablas de las que depende (ver example/versiones.py), así que
+las señales que incrementan esas versiones la invalidan en todos los
+procesos: en cada petición se leen las versiones (una consulta) y se
+comparan con las de la entrada.
+
+Cuando la entrada quedó desactualizada, la primera petición que lo nota la
+recalcula dentro de su propio ciclo (con el lock de la clave); mientras
+tanto, durante `ventana_stale` segundos, las peticiones simultáneas de la
+misma clave reciben la copia desactualizada en lugar de esperar
+(stale-while-revalidate). Sin entrada, o pasada la ventana, esperan ese
+único cálculo en lugar de repetirlo. No se usan hilos en segundo plano: en
+Vercel la instancia se congela al responder y un recálculo pendiente
+quedaría a medias.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import versiones
+
+
+class CacheRespuestas:
+
+    def __init__(self, ventana_stale, maximo):
+        self.ventana_stale = ventana_stale
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        # clave -> {'versiones', 'datos', 'desactualizada_desde'}
+        self._entradas = OrderedDict()
+        # clave -> Lock del cálculo en curso (uno por clave)
+        self._calculos = {}
+
+    def _entrada(self, clave):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada:
+                self._entradas.move_to_end(clave)
+            return entrada
+
+    def _guardar(self, clave, versiones_actuales, datos):
+        with self._lock:
+            self._entradas[clave] = {
+                'versiones': versiones_actuales,
+                'datos': datos,
+                'desactualizada_desde': None,
+            }
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.maximo:
+                descartada, _ = self._entradas.popitem(last=False)
+                calculo = self._calculos.get(descartada)
+                if calculo and not calculo.locked():
+                    del self._calculos[descartada]
+
+    def _lock_calculo(self, clave):
+        with self._lock:
+            return self._calculos.setdefault(clave, threading.Lock())
+
+    def _calcular(self, clave, versiones_actuales, calcular):
+        respuesta = calcular()
+        if respuesta.status_code == status.HTTP_200_OK:
+            self._guardar(clave, versiones_actuales, respuesta.data)
+        return respuesta
+
+    def responder(self, clave, versiones_actuales, calcular):
+        """
+        Response para `clave`: desde la caché si sigue vigente (o desactualizada
+        dentro de la ventana), o el resultado de calcular() en otro caso.
+        """
+        entrada = self._entrada(clave)
+        if entrada and entrada['versiones'] == versiones_actuales:
+            return Response(entrada['datos'], headers={'X-Cache': 'HIT'})
+
+        calculo = self._lock_calculo(clave)
+        adquirido = False
+        if entrada:
+            ahora = time.monotonic()
+            if entrada['desactualizada_desde'] is None:
+                entrada['desactualizada_desde'] = ahora
+            if ahora - entrada['desactualizada_desde'] <= self.ventana_stale:
+                adquirido = calculo.acquire(blocking=False)
+                if not adquirido:
+                    # Otra petición ya la está recalculando: se sirve la copia desactualizada
+                    return Response(entrada['datos'], headers={'X-Cache': 'STALE'})
+        if not adquirido:
+            calculo.acquire()
+
+        try:
+            # Otra petición pudo terminar el cálculo mientras se esperaba
+            entrada = self._entrada(clave)
+            if entrada and entrada['versiones'] == versiones_actuales:
+                return Response(entrada['datos'], headers={'X-Cache': 'HIT'})
+            respuesta = self._calcular(clave, versiones_actuales, calcular)
+        finally:
+            calculo.release()
+        respuesta['X-Cache'] = 'MISS'
+        return respuesta
+
+    def invalidar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+cache_respuestas = CacheRespuestas(
+    ventana_stale=getattr(settings, 'RESPUESTAS_CACHE_STALE_SEGUNDOS', 300),
+    maximo=getattr(settings, 'RESPUESTAS_CACHE_MAXIMO', 128)
+)
+
+
+def cache_respuesta(*modelos):
+    """
+    Decorador para vistas GET cuya respuesta depende solo de las tablas de
+    `modelos`, de los parámetros de la URL y de la fecha actual. Va justo
+    encima de la función (debajo de @permission_classes).
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.method != 'GET':
+                return vista(request, *args, **kwargs)
+
+            clave = (
+                vista.__name__,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted((nombre, tuple(valores)) for nombre, valores in request.query_params.lists())),
+                date.today(),
+            )
+            return cache_respuestas.responder(
+                clave,
+                versiones.obtener(*modelos),
+                lambda: vista(request, *args, **kwargs)
+            )
+        return envoltura
+    return decorador
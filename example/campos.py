@@ -0,0 +1,58 @@
+"""
+Selección de campos (?fields=) y expansiones (?expand=) para los reportes y
+listados de directivos.
+
+- fields: claves a incluir, separadas por comas. Las secciones omitidas no se
+  consultan ni se serializan. Sin el parámetro se incluye todo.
+- expand: relaciones anidadas a incluir completas. Sin el parámetro se
+  mantiene la respuesta de siempre (todo expandido); con él, solo las
+  relaciones listadas se expanden y las demás se reducen a su id
+  (`?expand=` vacío deja todas como id).
+"""
+
+
+class CamposInvalidos(ValueError):
+    pass
+
+
+def _lista(valor):
+    return [parte.strip() for parte in valor.split(',') if parte.strip()]
+
+
+class SeleccionCampos:
+    """
+    `disponibles` son los campos que acepta ?fields= y `expandibles` las
+    relaciones que acepta ?expand= en el endpoint.
+    """
+
+    def __init__(self, query_params, disponibles, expandibles=()):
+        self.campos = None
+        self.expandir = None
+
+        if 'fields' in query_params:
+            self.campos = _lista(query_params['fields'])
+            desconocidos = [c for c in self.campos if c not in disponibles]
+            if desconocidos:
+                raise CamposInvalidos(
+                    f"fields: campos desconocidos {', '.join(desconocidos)} (disponibles: {', '.join(disponibles)})"
+                )
+
+        if 'expand' in query_params:
+            self.expandir = _lista(query_params['expand'])
+            desconocidos = [r for r in self.expandir if r not in expandibles]
+            if desconocidos:
+                raise CamposInvalidos(
+                    f"expand: relaciones desconocidas {', '.join(desconocidos)} (disponibles: {', '.join(expandibles) or 'ninguna'})"
+                )
+
+    def incluye(self, campo):
+        return self.campos is None or campo in self.campos
+
+    def expande(self, relacion):
+        return self.expandir is None or relacion in self.expandir
+
+    def filtrar(self, datos):
+        """Copia de `datos` solo con los campos pedidos, en su orden original."""
+        if self.campos is None:
+            return datos
+        return {clave: valor for clave, valor in datos.items() if clave in self.campos}
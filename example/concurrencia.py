@@ -0,0 +1,64 @@
+"""
+Ejecución concurrente de consultas independientes de los reportes.
+
+Los reportes de directivos hacen varias consultas que no dependen entre sí
+(totales de horas, detalle de asistencias, ajustes, horarios...). Contra una
+base de datos remota cada una paga un viaje de ida y vuelta completo; aquí se
+lanzan a la vez con asyncio.gather sobre un grupo fijo de hilos, de modo que
+la latencia total queda cerca de la de la consulta más lenta.
+
+Cada hilo usa su propia conexión (Django las mantiene por hilo), así que una
+petición ocupa hasta CONSULTAS_CONCURRENTES_HILOS conexiones más a la vez; con
+el pooler de transacciones conviene contarlas en su límite. Los hilos aplican
+el mismo ciclo que Django a las conexiones de una petición: antes y después de
+cada consulta, close_old_connections() cierra la conexión si superó
+CONN_MAX_AGE (con 0, siempre) o quedó inutilizable.
+
+No son vistas async: DRF 3.14 no las soporta y las vistas conservan su
+autenticación, permisos, renderers, ETag y caché. Funciona igual bajo
+api/wsgi.py y api/asgi.py: `consultar_en_paralelo` espera el resultado desde
+la vista síncrona; el código asíncrono puede usar directamente `reunir`.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+_hilos = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'CONSULTAS_CONCURRENTES_HILOS', 4),
+    thread_name_prefix='consultas'
+)
+
+
+def _ejecutar(consulta):
+    # Como request_started/request_finished: la conexión del hilo se cierra si expiró o quedó inutilizable
+    close_old_connections()
+    try:
+        return consulta()
+    finally:
+        close_old_connections()
+
+
+async def reunir(**consultas):
+    """
+    Ejecuta a la vez las funciones sin argumentos de `consultas` y retorna un
+    diccionario con el resultado de cada una bajo el mismo nombre.
+    """
+    loop = asyncio.get_running_loop()
+    resultados = await asyncio.gather(*(
+        loop.run_in_executor(_hilos, _ejecutar, consulta) for consulta in consultas.values()
+    ))
+    return dict(zip(consultas, resultados))
+
+
+def consultar_en_paralelo(**consultas):
+    """
+    Versión síncrona de `reunir` para las vistas. Dentro de una transacción
+    (o con CONSULTAS_CONCURRENTES desactivado) las consultas se ejecutan en
+    orden en el hilo actual: otros hilos no verían los cambios sin confirmar.
+    """
+    if not getattr(settings, 'CONSULTAS_CONCURRENTES', True) or len(consultas) < 2 or connection.in_atomic_block:
+        return {nombre: consulta() for nombre, consulta in consultas.items()}
+    return async_to_sync(reunir)(**consultas)
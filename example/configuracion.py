@@ -0,0 +1,75 @@
+"""
+Registro en memoria de las configuraciones del sistema.
+
+Todas las filas de ConfiguracionSistema se cargan de una sola vez y se guardan
+ya convertidas con get_valor_tipado(). El registro se invalida al guardar o
+eliminar una configuración en este proceso (ver signals.py); para detectar los
+cambios hechos por otros workers se compara cada cierto tiempo un sello de
+versión (cantidad de filas y último updated_at) con una consulta de agregado.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import ConfiguracionSistema
+
+
+def _sello_actual():
+    sello = ConfiguracionSistema.objects.aggregate(total=Count('id'), ultima=Max('updated_at'))
+    return (sello['total'], sello['ultima'])
+
+
+class RegistroConfiguracion:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._valores = None
+        self._sello = None
+        self._verificado_en = 0.0
+
+    @property
+    def segundos_verificacion(self):
+        return getattr(settings, 'CONFIGURACION_VERIFICACION_SEGUNDOS', 30)
+
+    def _cargar(self):
+        # El sello se toma antes de leer las filas: si cambian en medio, la
+        # siguiente verificación vuelve a cargar
+        sello = _sello_actual()
+        valores = {
+            config.clave: config.get_valor_tipado()
+            for config in ConfiguracionSistema.objects.only('clave', 'valor', 'tipo_dato')
+        }
+        self._valores, self._sello = valores, sello
+        self._verificado_en = time.monotonic()
+
+    def _vigentes(self):
+        with self._lock:
+            if self._valores is None:
+                self._cargar()
+            elif time.monotonic() - self._verificado_en >= self.segundos_verificacion:
+                if _sello_actual() != self._sello:
+                    self._cargar()
+                else:
+                    self._verificado_en = time.monotonic()
+            return self._valores
+
+    def obtener(self, clave, valor_por_defecto=None):
+        return self._vigentes().get(clave, valor_por_defecto)
+
+    def todas(self):
+        return dict(self._vigentes())
+
+    @property
+    def version(self):
+        """Sello de versión de los valores cargados (cantidad, último updated_at)."""
+        self._vigentes()
+        return self._sello
+
+    def invalidar(self):
+        with self._lock:
+            self._valores = None
+            self._sello = None
+
+
+registro = RegistroConfiguracion()
@@ -0,0 +1,207 @@
+"""
+Exportación en streaming (NDJSON / CSV) de los reportes de horas.
+
+Las asistencias y ajustes del período se leen por lotes (iterar_por_lotes,
+una consulta keyset por lote) en orden de monitor y se agrupan sobre la
+marcha, de modo que en memoria solo hay un monitor (o un lote de filas) a la
+vez sin importar el rango de fechas, también detrás de un pooler en modo
+transacción donde no hay cursores del lado del servidor.
+
+Las horas quedan como Decimal con dos decimales en las filas: el CSV las
+escribe igual que el COPY de exportar_horas_semestre (4.00) y el NDJSON como
+número (4.0).
+"""
+import csv
+import json
+from decimal import Decimal
+from itertools import groupby
+
+from django.http import StreamingHttpResponse
+
+from .models import UsuarioPersonalizado, Asistencia, AjusteHoras
+from .paginacion import iterar_por_lotes
+
+TAMANO_LOTE = 2000
+
+COLUMNAS = [
+    'tipo', 'id', 'monitor_id', 'username', 'nombre', 'fecha', 'sede', 'jornada',
+    'presente', 'estado_autorizacion', 'horas', 'motivo',
+]
+
+TIPOS_CONTENIDO = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def _asistencias(fecha_inicio, fecha_fin, sede=None, jornada=None, monitor_id=None):
+    asistencias = Asistencia.objects.filter(
+        usuario__tipo_usuario='MONITOR',
+        fecha__gte=fecha_inicio,
+        fecha__lte=fecha_fin
+    )
+    if sede:
+        asistencias = asistencias.filter(horario__sede=sede)
+    if jornada:
+        asistencias = asistencias.filter(horario__jornada=jornada)
+    if monitor_id is not None:
+        asistencias = asistencias.filter(usuario_id=monitor_id)
+
+    filas = asistencias.values_list(
+        'id', 'usuario_id', 'usuario__username', 'usuario__nombre', 'fecha',
+        'horario__sede', 'horario__jornada', 'presente', 'estado_autorizacion', 'horas'
+    )
+    orden = ['usuario_id', 'fecha', 'horario__jornada', 'id']
+    for id_, usuario_id, username, nombre, fecha, sede_, jornada_, presente, estado, horas in iterar_por_lotes(filas, orden, TAMANO_LOTE):
+        yield {
+            'tipo': 'asistencia',
+            'id': id_,
+            'monitor_id': usuario_id,
+            'username': username,
+            'nombre': nombre,
+            'fecha': fecha.isoformat(),
+            'sede': sede_,
+            'jornada': jornada_,
+            'presente': presente,
+            'estado_autorizacion': estado,
+            'horas': horas,
+            'motivo': '',
+        }
+
+
+def _ajustes(fecha_inicio, fecha_fin, monitor_id=None):
+    # Los ajustes no tienen sede ni jornada: se incluyen siempre, como en los reportes
+    ajustes = AjusteHoras.objects.filter(
+        usuario__tipo_usuario='MONITOR',
+        fecha__gte=fecha_inicio,
+        fecha__lte=fecha_fin
+    )
+    if monitor_id is not None:
+        ajustes = ajustes.filter(usuario_id=monitor_id)
+
+    filas = ajustes.values_list(
+        'id', 'usuario_id', 'usuario__username', 'usuario__nombre', 'fecha', 'cantidad_horas', 'motivo'
+    )
+    orden = ['usuario_id', 'fecha', 'created_at', 'id']
+    for id_, usuario_id, username, nombre, fecha, cantidad_horas, motivo in iterar_por_lotes(filas, orden, TAMANO_LOTE):
+        yield {
+            'tipo': 'ajuste',
+            'id': id_,
+            'monitor_id': usuario_id,
+            'username': username,
+            'nombre': nombre,
+            'fecha': fecha.isoformat(),
+            'sede': '',
+            'jornada': '',
+            'presente': '',
+            'estado_autorizacion': '',
+            'horas': cantidad_horas,
+            'motivo': motivo,
+        }
+
+
+def _grupos_por_monitor(fecha_inicio, fecha_fin, sede=None, jornada=None, monitor_id=None):
+    """
+    Genera (monitor_id, asistencias, ajustes) en orden de monitor, uniendo los
+    dos iteradores ordenados sin cargarlos completos.
+    """
+    por_monitor = lambda fila: fila['monitor_id']
+    asistencias = groupby(_asistencias(fecha_inicio, fecha_fin, sede, jornada, monitor_id), por_monitor)
+    ajustes = groupby(_ajustes(fecha_inicio, fecha_fin, monitor_id), por_monitor)
+
+    siguiente_asistencia = next(asistencias, None)
+    siguiente_ajuste = next(ajustes, None)
+    while siguiente_asistencia or siguiente_ajuste:
+        ids = [grupo[0] for grupo in (siguiente_asistencia, siguiente_ajuste) if grupo]
+        actual = min(ids)
+        filas_asistencias, filas_ajustes = [], []
+        if siguiente_asistencia and siguiente_asistencia[0] == actual:
+            filas_asistencias = list(siguiente_asistencia[1])
+            siguiente_asistencia = next(asistencias, None)
+        if siguiente_ajuste and siguiente_ajuste[0] == actual:
+            filas_ajustes = list(siguiente_ajuste[1])
+            siguiente_ajuste = next(ajustes, None)
+        yield actual, filas_asistencias, filas_ajustes
+
+
+def filas_reporte_horas(fecha_inicio, fecha_fin, sede=None, jornada=None, monitor_id=None):
+    """Una fila plana por asistencia y por ajuste del período, agrupadas por monitor."""
+    for _, filas_asistencias, filas_ajustes in _grupos_por_monitor(fecha_inicio, fecha_fin, sede, jornada, monitor_id):
+        yield from filas_asistencias
+        yield from filas_ajustes
+
+
+def monitores_reporte_horas(fecha_inicio, fecha_fin, sede=None, jornada=None):
+    """
+    Un objeto por monitor con sus totales del período (mismos campos que
+    directivo_reporte_horas_todos) y sus asistencias y ajustes como filas planas.
+    """
+    monitores = UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR').with_horas(
+        fecha_inicio, fecha_fin, sede, jornada
+    ).values(
+        'id', 'username', 'nombre', 'horas_asistencias', 'horas_ajustes', 'horas_totales',
+        'total_asistencias', 'total_ajustes', 'asistencias_presentes', 'asistencias_autorizadas'
+    )
+    grupos = _grupos_por_monitor(fecha_inicio, fecha_fin, sede, jornada)
+    grupo = next(grupos, None)
+
+    for monitor in iterar_por_lotes(monitores, ['id'], TAMANO_LOTE):
+        # Se avanza hasta el grupo del monitor (los grupos vienen en el mismo orden)
+        while grupo and grupo[0] < monitor['id']:
+            grupo = next(grupos, None)
+        filas_asistencias, filas_ajustes = [], []
+        if grupo and grupo[0] == monitor['id']:
+            _, filas_asistencias, filas_ajustes = grupo
+
+        if not (monitor['total_asistencias'] or monitor['total_ajustes'] or filas_asistencias or filas_ajustes):
+            continue
+
+        yield {
+            'monitor': {
+                'id': monitor['id'],
+                'username': monitor['username'],
+                'nombre': monitor['nombre']
+            },
+            'horas_asistencias': round(float(monitor['horas_asistencias']), 2),
+            'horas_ajustes': round(float(monitor['horas_ajustes']), 2),
+            'total_horas': round(float(monitor['horas_totales']), 2),
+            'total_asistencias': monitor['total_asistencias'],
+            'total_ajustes': monitor['total_ajustes'],
+            'asistencias_presentes': monitor['asistencias_presentes'],
+            'asistencias_autorizadas': monitor['asistencias_autorizadas'],
+            'asistencias': filas_asistencias,
+            'ajustes': filas_ajustes
+        }
+
+
+class _Eco:
+    """Buffer mínimo para csv.writer: retorna la línea en vez de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def _lineas_csv(filas):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(COLUMNAS)
+    for fila in filas:
+        yield escritor.writerow([fila[columna] for columna in COLUMNAS])
+
+
+def _numero_json(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    raise TypeError(f"{type(valor).__name__} no es serializable a JSON")
+
+
+def _lineas_ndjson(objetos):
+    for objeto in objetos:
+        yield json.dumps(objeto, ensure_ascii=False, default=_numero_json) + '\n'
+
+
+def respuesta_streaming(objetos, formato, nombre_archivo):
+    """StreamingHttpResponse con `objetos` en formato 'ndjson' o 'csv' (filas planas)."""
+    lineas = _lineas_csv(objetos) if formato == 'csv' else _lineas_ndjson(objetos)
+    respuesta = StreamingHttpResponse(lineas, content_type=TIPOS_CONTENIDO[formato])
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre_archivo}.{formato}"'
+    return respuesta
@@ -0,0 +1,203 @@
+"""
+Motor financiero vectorizado.
+
+Carga una sola vez las horas y jornadas de todos los monitores y calcula
+costos actuales, proyecciones, promedios y top de monitores sobre arreglos
+de NumPy, de modo que los endpoints de finanzas consolidadas no recorran
+los monitores consultando la base de datos uno por uno. Incluye también
+el histórico semanal real agrupado por semana del semestre.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.db.models import Sum, F
+from django.db.models.functions import TruncWeek
+
+from .models import UsuarioPersonalizado, ResumenHorasDiario, HORAS_POR_JORNADA
+
+
+class MotorFinanzas:
+    """
+    Cálculo financiero de todos los monitores con horarios asignados.
+    Los arreglos son paralelos: la posición i corresponde al mismo monitor
+    en todos ellos.
+    """
+
+    def __init__(self, fecha_inicio, fecha_fin, semanas_trabajadas, costo_por_hora, total_semanas):
+        self.fecha_inicio = fecha_inicio
+        self.fecha_fin = fecha_fin
+        self.semanas_trabajadas = semanas_trabajadas
+        self.costo_por_hora = costo_por_hora
+        self.total_semanas = total_semanas
+        self.dias_periodo = (fecha_fin - fecha_inicio).days + 1
+
+        filas = list(
+            UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR')
+            .with_horas(fecha_inicio, fecha_fin)
+            .with_jornadas_semanales()
+            .order_by('id')
+            .values_list('id', 'username', 'nombre', 'horas_totales', 'jornadas_semanales',
+                         'total_asistencias', 'total_ajustes')
+        )
+
+        # Solo se consideran monitores con horarios asignados
+        filas = [fila for fila in filas if fila[4] > 0]
+        self.monitores = [{'id': fila[0], 'username': fila[1], 'nombre': fila[2]} for fila in filas]
+
+        self.horas_trabajadas = np.array([float(fila[3]) for fila in filas], dtype=np.float64)
+        self.jornadas_semanales = np.array([fila[4] for fila in filas], dtype=np.int64)
+        self.total_asistencias = np.array([fila[5] for fila in filas], dtype=np.int64)
+        self.total_ajustes = np.array([fila[6] for fila in filas], dtype=np.int64)
+
+        self.horas_semanales = self.jornadas_semanales * HORAS_POR_JORNADA
+        self.horas_totales_proyectadas = self.horas_semanales * total_semanas
+        self.horas_trabajadas_proyectadas = self.horas_semanales * semanas_trabajadas
+
+        self.costo_actual = np.round(self.horas_trabajadas * costo_por_hora, 2)
+        self.costo_total_proyectado = np.round(self.horas_totales_proyectadas * costo_por_hora, 2)
+        self.costo_trabajado_proyectado = np.round(self.horas_trabajadas_proyectadas * costo_por_hora, 2)
+
+    @property
+    def total_monitores(self):
+        return len(self.monitores)
+
+    @property
+    def porcentaje_completado(self):
+        return round((self.semanas_trabajadas / self.total_semanas) * 100, 2)
+
+    def totales(self):
+        """
+        Totales y promedios del conjunto de monitores.
+        """
+        total_costo_actual = float(self.costo_actual.sum())
+        total_costo_proyectado = float(self.costo_total_proyectado.sum())
+        total_horas_actuales = float(self.horas_trabajadas.sum())
+        total_horas_proyectadas = float(self.horas_totales_proyectadas.sum())
+
+        return {
+            'total_monitores': self.total_monitores,
+            'monitores_activos': int(np.count_nonzero(self.horas_trabajadas > 0)),
+            'total_costo_actual': total_costo_actual,
+            'total_costo_proyectado': total_costo_proyectado,
+            'total_horas_actuales': total_horas_actuales,
+            'total_horas_proyectadas': total_horas_proyectadas,
+            'costo_promedio_por_monitor': total_costo_actual / max(1, self.total_monitores),
+            'horas_promedio_por_monitor': total_horas_actuales / max(1, self.total_monitores),
+            'porcentaje_ejecutado': (total_costo_actual / max(1, total_costo_proyectado)) * 100,
+            'costo_semanal_promedio': total_costo_actual / max(1, self.dias_periodo) * 7,
+            'horas_semanal_promedio': total_horas_actuales / max(1, self.dias_periodo) * 7,
+        }
+
+    def _orden_por_costo(self, indices):
+        """
+        Ordena `indices` por costo actual descendente; en empate conserva el orden por id.
+        """
+        return indices[np.lexsort((indices, -self.costo_actual[indices]))]
+
+    def monitores_por_costo(self):
+        """
+        Detalle financiero de cada monitor, ordenado por costo actual (descendente).
+        """
+        orden = self._orden_por_costo(np.arange(self.total_monitores))
+
+        horas_semanales = self.horas_semanales.tolist()
+        horas_trabajadas = self.horas_trabajadas.tolist()
+        costo_actual = self.costo_actual.tolist()
+        costo_total_proyectado = self.costo_total_proyectado.tolist()
+        costo_trabajado_proyectado = self.costo_trabajado_proyectado.tolist()
+        total_asistencias = self.total_asistencias.tolist()
+        total_ajustes = self.total_ajustes.tolist()
+        porcentaje_completado = self.porcentaje_completado
+
+        return [
+            {
+                'monitor': self.monitores[i],
+                'horarios_semanales': {
+                    'horas_por_semana': horas_semanales[i],
+                    'jornadas_por_semana': horas_semanales[i] // HORAS_POR_JORNADA
+                },
+                'finanzas_actuales': {
+                    'horas_trabajadas': horas_trabajadas[i],
+                    'costo_total': costo_actual[i]
+                },
+                'proyeccion_semestre': {
+                    'semanas_trabajadas': self.semanas_trabajadas,
+                    'semanas_faltantes': self.total_semanas - self.semanas_trabajadas,
+                    'costo_total_proyectado': costo_total_proyectado[i],
+                    'costo_trabajado_proyectado': costo_trabajado_proyectado[i],
+                    'porcentaje_completado': porcentaje_completado
+                },
+                'estadisticas': {
+                    'total_asistencias': total_asistencias[i],
+                    'total_ajustes': total_ajustes[i]
+                }
+            }
+            for i in orden.tolist()
+        ]
+
+    def top_por_costo(self, n=5):
+        """
+        Los `n` monitores con mayor costo actual. Usa argpartition para no
+        ordenar el arreglo completo.
+        """
+        if self.total_monitores == 0 or n <= 0:
+            return []
+
+        if n < self.total_monitores:
+            candidatos = np.argpartition(-self.costo_actual, n - 1)[:n]
+            # En empates en el límite argpartition puede elegir cualquiera; se
+            # incluyen todos los empatados para conservar el orden por id
+            limite = self.costo_actual[candidatos].min()
+            candidatos = np.flatnonzero(self.costo_actual >= limite)
+        else:
+            candidatos = np.arange(self.total_monitores)
+
+        orden = self._orden_por_costo(candidatos)[:n]
+        costo_actual = self.costo_actual.tolist()
+        horas_trabajadas = self.horas_trabajadas.tolist()
+
+        return [
+            {
+                'monitor': {
+                    'id': self.monitores[i]['id'],
+                    'nombre': self.monitores[i]['nombre'],
+                    'username': self.monitores[i]['username']
+                },
+                'costo_actual': costo_actual[i],
+                'horas_trabajadas': horas_trabajadas[i]
+            }
+            for i in orden.tolist()
+        ]
+
+
+def horas_reales_por_semana(fecha_inicio_semestre, total_semanas):
+    """
+    Horas reales (asistencias + ajustes) por semana del semestre y monitores
+    con horas en cada semana. Agrupa el resumen diario por date_trunc('week')
+    y monitor en una sola consulta.
+    Retorna un dict {numero_semana: {'horas': float, 'monitores_activos': int}}.
+    """
+    lunes_inicio = fecha_inicio_semestre - timedelta(days=fecha_inicio_semestre.weekday())
+    fecha_fin = lunes_inicio + timedelta(weeks=total_semanas, days=-1)
+
+    filas = ResumenHorasDiario.objects.filter(
+        usuario__tipo_usuario='MONITOR',
+        fecha__gte=lunes_inicio,
+        fecha__lte=fecha_fin
+    ).annotate(semana=TruncWeek('fecha')).values('semana', 'usuario_id').annotate(
+        suma_horas=Sum(F('horas_asistencias') + F('horas_ajustes'))
+    ).order_by()
+
+    resultado = defaultdict(lambda: {'horas': 0.0, 'monitores_activos': 0})
+    for fila in filas:
+        semana = fila['semana']
+        if isinstance(semana, datetime):
+            semana = semana.date()
+        numero_semana = (semana - lunes_inicio).days // 7 + 1
+        horas = float(fila['suma_horas'] or 0)
+        resultado[numero_semana]['horas'] += horas
+        if horas > 0:
+            resultado[numero_semana]['monitores_activos'] += 1
+
+    return resultado
@@ -0,0 +1,158 @@
+"""
+Generación masiva de asistencias a partir de los horarios fijos.
+
+Las asistencias de un rango de fechas se insertan con un único bulk_create
+que ignora las filas ya existentes (ON CONFLICT DO NOTHING sobre la
+restricción única usuario/fecha/horario). Los endpoints de consulta no
+crean filas: las asistencias que aún no existen se devuelven como filas
+virtuales y solo se materializan cuando un endpoint que cambia su estado
+las guarda. Un horario no tiene asistencias antes de su `vigente_desde`.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from .models import HorarioFijo, Asistencia
+from .resumen import reconstruir_resumen, recalcular_resumen
+from . import versiones
+
+# Días hacia atrás (desde ayer) en que se buscan asistencias pendientes que nunca se crearon
+DIAS_MAXIMOS_FALTANTES = 90
+
+
+def generar_asistencias(fecha_inicio, fecha_fin, usuario_id=None, horarios_qs=None):
+    """
+    Crea las asistencias pendientes de todos los HorarioFijo (o solo los del
+    usuario indicado, o los de `horarios_qs`) entre fecha_inicio y fecha_fin,
+    ambas incluidas. Retorna la cantidad de filas candidatas enviadas a la
+    base de datos.
+    """
+    horarios = HorarioFijo.objects.all() if horarios_qs is None else horarios_qs
+    if usuario_id is not None:
+        horarios = horarios.filter(usuario_id=usuario_id)
+
+    horarios_por_dia = defaultdict(list)
+    for horario_id, horario_usuario_id, dia_semana, vigente_desde in horarios.values_list(
+        'id', 'usuario_id', 'dia_semana', 'vigente_desde'
+    ):
+        horarios_por_dia[dia_semana].append((horario_id, horario_usuario_id, vigente_desde))
+
+    nuevas = []
+    fecha = fecha_inicio
+    while fecha <= fecha_fin:
+        for horario_id, horario_usuario_id, vigente_desde in horarios_por_dia.get(fecha.weekday(), []):
+            if fecha < vigente_desde:
+                continue
+            nuevas.append(Asistencia(
+                usuario_id=horario_usuario_id,
+                fecha=fecha,
+                horario_id=horario_id,
+                presente=False,
+                estado_autorizacion='pendiente',
+                horas=0
+            ))
+        fecha += timedelta(days=1)
+
+    if not nuevas:
+        return 0
+
+    Asistencia.objects.bulk_create(nuevas, batch_size=1000, ignore_conflicts=True)
+
+    # bulk_create no dispara señales: se actualizan la versión de la tabla y el resumen diario del rango
+    versiones.incrementar(Asistencia)
+    if usuario_id is None and horarios_qs is None:
+        reconstruir_resumen(fecha_inicio, fecha_fin)
+    else:
+        recalcular_resumen({(a.usuario_id, a.fecha) for a in nuevas})
+
+    return len(nuevas)
+
+
+def asistencias_del_dia(fecha, horarios_qs):
+    """
+    Asistencias de `fecha` para los horarios de `horarios_qs`, sin escribir en
+    la base de datos: los horarios que aún no tienen asistencia se devuelven
+    como instancias no guardadas (virtuales, pk=None) en estado pendiente,
+    salvo si la fecha es anterior a su vigente_desde.
+    """
+    horarios = list(horarios_qs.select_related('usuario').order_by('usuario__nombre', 'jornada'))
+    existentes = {
+        asistencia.horario_id: asistencia
+        for asistencia in Asistencia.objects.filter(
+            fecha=fecha,
+            horario_id__in=[horario.id for horario in horarios]
+        ).select_related('usuario')
+    }
+
+    resultado = []
+    for horario in horarios:
+        asistencia = existentes.get(horario.id)
+        if asistencia is None and fecha < horario.vigente_desde:
+            continue
+        if asistencia is None:
+            asistencia = Asistencia(
+                usuario=horario.usuario,
+                fecha=fecha,
+                horario=horario,
+                presente=False,
+                estado_autorizacion='pendiente',
+                horas=0
+            )
+        else:
+            asistencia.horario = horario
+        resultado.append(asistencia)
+    return resultado
+
+
+def asistencias_faltantes(horarios_qs, fecha_inicio, fecha_fin):
+    """
+    Asistencias virtuales (pendientes, sin guardar) de los horarios de
+    `horarios_qs` entre fecha_inicio y fecha_fin, ambas incluidas, que aún no
+    existen en la base de datos. Se generan de forma perezosa de la fecha más
+    reciente a la más antigua, consultando las existentes de a una semana,
+    para que quien solo necesita una página deje de iterar al completarla.
+    """
+    horarios_por_dia = defaultdict(list)
+    for horario in horarios_qs.select_related('usuario').filter(vigente_desde__lte=fecha_fin):
+        horarios_por_dia[horario.dia_semana].append(horario)
+    if not horarios_por_dia:
+        return
+
+    fin = fecha_fin
+    while fin >= fecha_inicio:
+        inicio = max(fecha_inicio, fin - timedelta(days=6))
+        existentes = set(Asistencia.objects.filter(
+            fecha__gte=inicio,
+            fecha__lte=fin,
+            horario__in=horarios_qs
+        ).values_list('horario_id', 'fecha'))
+
+        fecha = fin
+        while fecha >= inicio:
+            for horario in horarios_por_dia.get(fecha.weekday(), []):
+                if fecha < horario.vigente_desde or (horario.id, fecha) in existentes:
+                    continue
+                yield Asistencia(
+                    usuario=horario.usuario,
+                    fecha=fecha,
+                    horario=horario,
+                    presente=False,
+                    estado_autorizacion='pendiente',
+                    horas=0
+                )
+            fecha -= timedelta(days=1)
+        fin = inicio - timedelta(days=1)
+
+
+def obtener_asistencia_de_horario(horario, fecha):
+    """
+    Asistencia de un horario en una fecha, para cambiarle el estado. Si todavía
+    no existe se crea pendiente; si otra petición la crea al mismo tiempo,
+    get_or_create captura el IntegrityError y retorna la de esa petición.
+    """
+    asistencia, _ = Asistencia.objects.get_or_create(
+        usuario_id=horario.usuario_id,
+        fecha=fecha,
+        horario=horario,
+        defaults={'presente': False, 'estado_autorizacion': 'pendiente', 'horas': 0}
+    )
+    return asistencia
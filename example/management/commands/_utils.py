@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from django.core.management.base import CommandError
+
+
+def fecha_argumento(valor):
+    """Convierte un argumento YYYY-MM-DD en date; None si viene vacío."""
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Fecha inválida: {valor} (formato esperado YYYY-MM-DD)")
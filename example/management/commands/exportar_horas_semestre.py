@@ -0,0 +1,85 @@
+import gzip
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from example.configuracion import registro as registro_configuracion
+from example.models import UsuarioPersonalizado, HorarioFijo, Asistencia, AjusteHoras
+
+from ._utils import fecha_argumento
+
+
+# Mismas columnas y formato que la exportación CSV de los reportes (example/exportacion.py):
+# presente como True/False y horas con dos decimales (numeric, p. ej. 4.00)
+CONSULTA = """
+    SELECT 'asistencia' AS tipo, a.id, u.id AS monitor_id, u.username, u.nombre, a.fecha,
+           h.sede, h.jornada, CASE WHEN a.presente THEN 'True' ELSE 'False' END AS presente,
+           a.estado_autorizacion, a.horas, '' AS motivo
+    FROM {asistencia} a
+    JOIN {usuario} u ON u.id = a.usuario_id
+    JOIN {horario} h ON h.id = a.horario_id
+    WHERE u.tipo_usuario = 'MONITOR' AND a.fecha BETWEEN %(fecha_inicio)s AND %(fecha_fin)s {filtros_horario}
+    UNION ALL
+    SELECT 'ajuste', j.id, u.id, u.username, u.nombre, j.fecha,
+           '', '', '', '', j.cantidad_horas, j.motivo
+    FROM {ajuste} j
+    JOIN {usuario} u ON u.id = j.usuario_id
+    WHERE u.tipo_usuario = 'MONITOR' AND j.fecha BETWEEN %(fecha_inicio)s AND %(fecha_fin)s
+    ORDER BY monitor_id, fecha, tipo DESC, id
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta las asistencias y ajustes de horas del período a un CSV comprimido con gzip "
+        "usando COPY de PostgreSQL (sin pasar por el ORM)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha-inicio', help="Fecha inicial (YYYY-MM-DD). Por defecto: configuración fecha_inicio_semestre")
+        parser.add_argument('--fecha-fin', help="Fecha final (YYYY-MM-DD). Por defecto: hoy")
+        parser.add_argument('--sede', choices=['SA', 'BA'], help="Filtrar asistencias por sede")
+        parser.add_argument('--jornada', choices=['M', 'T'], help="Filtrar asistencias por jornada")
+        parser.add_argument('--salida', help="Archivo de salida. Por defecto: horas_<inicio>_<fin>.csv.gz")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Este comando requiere una base de datos PostgreSQL (usa COPY)")
+
+        fecha_inicio = fecha_argumento(options['fecha_inicio']) or fecha_argumento(registro_configuracion.obtener('fecha_inicio_semestre'))
+        if not fecha_inicio:
+            raise CommandError("Indica --fecha-inicio o configura fecha_inicio_semestre")
+        fecha_fin = fecha_argumento(options['fecha_fin']) or date.today()
+        if fecha_fin < fecha_inicio:
+            raise CommandError("La fecha final debe ser posterior a la fecha inicial")
+
+        salida = options['salida'] or f"horas_{fecha_inicio}_{fecha_fin}.csv.gz"
+
+        # Los ajustes no tienen sede ni jornada: se exportan siempre, como en los reportes
+        filtros_horario = ''
+        parametros = {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin}
+        if options['sede']:
+            filtros_horario += ' AND h.sede = %(sede)s'
+            parametros['sede'] = options['sede']
+        if options['jornada']:
+            filtros_horario += ' AND h.jornada = %(jornada)s'
+            parametros['jornada'] = options['jornada']
+
+        consulta = CONSULTA.format(
+            asistencia=connection.ops.quote_name(Asistencia._meta.db_table),
+            ajuste=connection.ops.quote_name(AjusteHoras._meta.db_table),
+            usuario=connection.ops.quote_name(UsuarioPersonalizado._meta.db_table),
+            horario=connection.ops.quote_name(HorarioFijo._meta.db_table),
+            filtros_horario=filtros_horario,
+        )
+
+        with connection.cursor() as cursor, gzip.open(salida, 'wb') as archivo:
+            # COPY no admite parámetros: se interpolan de forma segura con mogrify
+            select = cursor.mogrify(consulta, parametros).decode()
+            cursor.copy_expert(f"COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER true)", archivo)
+            filas = cursor.rowcount
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {filas} filas exportadas del {fecha_inicio} al {fecha_fin} en {salida}"
+        ))
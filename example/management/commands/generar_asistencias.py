@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from example.generacion import generar_asistencias
+
+from ._utils import fecha_argumento
+
+
+class Command(BaseCommand):
+    help = "Pre-genera las asistencias pendientes de las próximas semanas a partir de los horarios fijos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha-inicio', help="Fecha inicial (YYYY-MM-DD). Por defecto: hoy")
+        parser.add_argument('--fecha-fin', help="Fecha final (YYYY-MM-DD). Por defecto: fecha inicial + semanas")
+        parser.add_argument('--semanas', type=int, default=2, help="Semanas a generar si no se indica --fecha-fin (por defecto: 2)")
+
+    def handle(self, *args, **options):
+        fecha_inicio = fecha_argumento(options['fecha_inicio']) or date.today()
+        fecha_fin = fecha_argumento(options['fecha_fin']) or fecha_inicio + timedelta(weeks=options['semanas'], days=-1)
+
+        if fecha_fin < fecha_inicio:
+            raise CommandError("La fecha final debe ser posterior a la fecha inicial")
+
+        candidatas = generar_asistencias(fecha_inicio, fecha_fin)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Asistencias generadas del {fecha_inicio} al {fecha_fin} ({candidatas} bloques de horario revisados)"
+        ))
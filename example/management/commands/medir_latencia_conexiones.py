@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def _percentil(valores_ordenados, percentil):
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    indice = max(0, -(-len(valores_ordenados) * percentil // 100) - 1)
+    return valores_ordenados[int(indice)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia p50/p99 de peticiones simuladas contra la base de datos configurada, "
+        "abriendo una conexión por petición (CONN_MAX_AGE=0) y reutilizándola (CONN_MAX_AGE configurado)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=200, help="Peticiones simuladas por modo (por defecto 200)")
+        parser.add_argument('--consultas', type=int, default=3,
+                            help="Consultas por petición, como autenticación + datos (por defecto 3)")
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help="Alias de la base de datos a medir")
+
+    def _medir(self, conexion, conn_max_age, peticiones, consultas):
+        """
+        Latencias (ms) de `peticiones` ciclos completos de petición: las mismas señales
+        con las que Django abre/cierra conexiones (request_started/request_finished)
+        alrededor de `consultas` consultas mínimas.
+        """
+        conexion.close()
+        conexion.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        latencias = []
+        for _ in range(peticiones):
+            inicio = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with conexion.cursor() as cursor:
+                for _ in range(consultas):
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        conexion.close()
+        return sorted(latencias)
+
+    def handle(self, *args, **options):
+        peticiones = options['peticiones']
+        consultas = options['consultas']
+        if peticiones < 1 or consultas < 1:
+            raise CommandError("--peticiones y --consultas deben ser mayores que 0")
+
+        conexion = connections[options['database']]
+        configurado = conexion.settings_dict.get('CONN_MAX_AGE', 0)
+        if configurado == 0:
+            # Sin reutilización configurada se compara contra la que se usaría por defecto
+            configurado = 600
+        self.stdout.write(
+            f"Base de datos: {conexion.vendor} {conexion.settings_dict.get('HOST') or conexion.settings_dict.get('NAME')} "
+            f"(health checks: {'sí' if conexion.settings_dict.get('CONN_HEALTH_CHECKS') else 'no'}, "
+            f"cursores del servidor: {'no' if conexion.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS') else 'sí'})"
+        )
+
+        original = conexion.settings_dict.get('CONN_MAX_AGE', 0)
+        try:
+            resultados = [
+                ('Sin reutilización (CONN_MAX_AGE=0)', self._medir(conexion, 0, peticiones, consultas)),
+                (f'Con reutilización (CONN_MAX_AGE={configurado})', self._medir(conexion, configurado, peticiones, consultas)),
+            ]
+        finally:
+            conexion.settings_dict['CONN_MAX_AGE'] = original
+
+        for nombre, latencias in resultados:
+            self.stdout.write(
+                f"{nombre}: p50 {_percentil(latencias, 50):.2f} ms · p99 {_percentil(latencias, 99):.2f} ms "
+                f"({peticiones} peticiones × {consultas} consultas)"
+            )
+        p50_sin, p50_con = _percentil(resultados[0][1], 50), _percentil(resultados[1][1], 50)
+        self.stdout.write(self.style.SUCCESS(f"✅ Reutilizar la conexión: p50 {p50_sin / max(p50_con, 1e-6):.1f}x más rápido"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from example.resumen import reconstruir_resumen
+
+from ._utils import fecha_argumento
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el resumen diario de horas (ResumenHorasDiario) a partir de asistencias y ajustes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha-inicio', help="Fecha inicial (YYYY-MM-DD). Por defecto: todo el histórico")
+        parser.add_argument('--fecha-fin', help="Fecha final (YYYY-MM-DD). Por defecto: todo el histórico")
+
+    def handle(self, *args, **options):
+        fecha_inicio = fecha_argumento(options['fecha_inicio'])
+        fecha_fin = fecha_argumento(options['fecha_fin'])
+
+        filas = reconstruir_resumen(fecha_inicio, fecha_fin)
+        self.stdout.write(self.style.SUCCESS(f"✅ Resumen reconstruido: {filas} filas"))
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Lo que hace un arranque en frío antes de ejecutar la primera vista: importar el
+# punto de entrada WSGI (settings, apps, middlewares) y cargar las URLs
+CODIGO_ARRANQUE = """
+import time
+inicio = time.perf_counter()
+import {entrada}
+from django.urls import get_resolver
+get_resolver().url_patterns
+{importaciones}
+print((time.perf_counter() - inicio) * 1000)
+"""
+
+
+def _arrancar(codigo, importtime=False):
+    """
+    Ejecuta `codigo` en un intérprete nuevo (sin módulos ya importados) y retorna
+    (milisegundos, líneas de -X importtime).
+    """
+    comando = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', codigo]
+    resultado = subprocess.run(comando, cwd=settings.BASE_DIR, env=os.environ.copy(), capture_output=True, text=True)
+    if resultado.returncode != 0:
+        raise CommandError(f"El arranque falló:\n{resultado.stderr.strip()}")
+    return float(resultado.stdout.strip().splitlines()[-1]), resultado.stderr.splitlines()
+
+
+def _costos_por_modulo(lineas):
+    """[(módulo, propio_us, acumulado_us)] a partir de la salida de -X importtime."""
+    costos = []
+    for linea in lineas:
+        if not linea.startswith('import time:'):
+            continue
+        propio, acumulado, modulo = linea[len('import time:'):].split('|')
+        if not propio.strip().isdigit():
+            continue  # Encabezado
+        costos.append((modulo.strip(), int(propio), int(acumulado)))
+    return costos
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el arranque en frío (punto de entrada WSGI + URLs) en un intérprete nuevo, "
+        "reporta el costo de importación por módulo y termina con error si supera el presupuesto"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--presupuesto-ms', type=float, default=settings.ARRANQUE_PRESUPUESTO_MS,
+                            help="Máximo de milisegundos permitido (por defecto ARRANQUE_PRESUPUESTO_MS)")
+        parser.add_argument('--repeticiones', type=int, default=3, help="Arranques a medir; se compara el mejor")
+        parser.add_argument('--top', type=int, default=15, help="Módulos más costosos a listar (por defecto 15)")
+        parser.add_argument('--modulo', action='append', default=[],
+                            help="Módulo adicional a importar en la medición (p. ej. example.views para "
+                                 "incluir la primera petición); se puede repetir")
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1 or options['top'] < 0:
+            raise CommandError("--repeticiones debe ser mayor que 0 y --top no puede ser negativo")
+
+        entrada = settings.WSGI_APPLICATION.rsplit('.', 1)[0]
+        codigo = CODIGO_ARRANQUE.format(
+            entrada=entrada,
+            importaciones='\n'.join(f"import {modulo}" for modulo in options['modulo'])
+        )
+        self.stdout.write(
+            f"Arranque: {entrada} + URLs{''.join(f' + {m}' for m in options['modulo'])} "
+            f"(settings: {os.environ.get('DJANGO_SETTINGS_MODULE')})"
+        )
+
+        # Costo por módulo: un arranque con -X importtime (que agrega su propia sobrecarga)
+        _, lineas = _arrancar(codigo, importtime=True)
+        costos = _costos_por_modulo(lineas)
+
+        por_paquete = defaultdict(int)
+        for modulo, propio, _ in costos:
+            por_paquete[modulo.split('.')[0]] += propio
+        self.stdout.write("\nPor paquete (tiempo propio de sus módulos):")
+        for paquete, propio in sorted(por_paquete.items(), key=lambda item: item[1], reverse=True)[:options['top']]:
+            self.stdout.write(f"  {propio / 1000:8.1f} ms  {paquete}")
+
+        self.stdout.write("\nMódulos más costosos (acumulado, incluye lo que importan):")
+        for modulo, propio, acumulado in sorted(costos, key=lambda costo: costo[2], reverse=True)[:options['top']]:
+            self.stdout.write(f"  {acumulado / 1000:8.1f} ms  (propio {propio / 1000:6.1f} ms)  {modulo}")
+
+        # Presupuesto: arranques sin -X importtime, se toma el mejor
+        mejor = min(_arrancar(codigo)[0] for _ in range(options['repeticiones']))
+        presupuesto = options['presupuesto_ms']
+        self.stdout.write(f"\nArranque: {mejor:.1f} ms (mejor de {options['repeticiones']}) · presupuesto {presupuesto:.0f} ms")
+        if mejor > presupuesto:
+            raise CommandError(f"El arranque en frío ({mejor:.1f} ms) supera el presupuesto de {presupuesto:.0f} ms")
+        self.stdout.write(self.style.SUCCESS("✅ Arranque dentro del presupuesto"))
@@ -0,0 +1,122 @@
+import json
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+from example.authentication import generar_token
+from example.models import UsuarioPersonalizado
+
+
+# Tablas que crecen con el semestre: un Seq Scan sobre ellas es una regresión
+TABLAS_GRANDES = ['example_asistencia', 'example_ajustehoras', 'example_resumenhorasdiario']
+
+# (nombre de la url, kwargs, query string, rol del token)
+ENDPOINTS = [
+    ('directivo_asistencias', {}, '', 'DIRECTIVO'),
+    ('directivo_asistencias_recuperables', {}, '', 'DIRECTIVO'),
+    ('directivo_ajustes_horas', {}, '', 'DIRECTIVO'),
+    ('directivo_ajustes_horas', {}, 'monitor_id={monitor_id}', 'DIRECTIVO'),
+    ('directivo_reporte_horas_monitor', {'monitor_id': '{monitor_id}'}, '', 'DIRECTIVO'),
+    ('directivo_reporte_horas_todos', {}, '', 'DIRECTIVO'),
+    ('directivo_finanzas_todos_monitores', {}, '', 'DIRECTIVO'),
+    ('directivo_finanzas_resumen_ejecutivo', {}, '', 'DIRECTIVO'),
+    ('directivo_finanzas_comparativa_semanas', {}, '', 'DIRECTIVO'),
+    ('monitor_mis_asistencias', {}, '', 'MONITOR'),
+]
+
+
+@contextmanager
+def capturar_consultas(consultas):
+    def wrapper(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith('SELECT'):
+            consultas.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield
+
+
+def nodos_del_plan(nodo):
+    yield nodo
+    for hijo in nodo.get('Plans', []):
+        yield from nodos_del_plan(hijo)
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los endpoints de consulta principales, hace EXPLAIN de cada SELECT "
+        "y falla si aparece un Seq Scan sobre una tabla grande (requiere PostgreSQL con datos)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--forzar-indices', action='store_true',
+            help="Desactiva enable_seqscan: un Seq Scan restante indica que no hay índice utilizable "
+                 "(útil con pocos datos, donde el planificador prefiere Seq Scan)"
+        )
+        parser.add_argument(
+            '--tablas', nargs='+', default=TABLAS_GRANDES,
+            help="Tablas en las que no se permite Seq Scan"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Este comando requiere una base de datos PostgreSQL")
+
+        directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
+        monitor = UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR').first()
+        if not directivo or not monitor:
+            raise CommandError("Se necesita al menos un DIRECTIVO y un MONITOR con datos")
+
+        tokens = {'DIRECTIVO': generar_token(directivo), 'MONITOR': generar_token(monitor)}
+        tablas = set(options['tablas'])
+        cliente = Client(SERVER_NAME='127.0.0.1')
+        regresiones = []
+
+        for nombre, kwargs, query, rol in ENDPOINTS:
+            kwargs = {clave: valor.format(monitor_id=monitor.id) for clave, valor in kwargs.items()}
+            url = reverse(nombre, kwargs=kwargs)
+            if query:
+                url = f"{url}?{query.format(monitor_id=monitor.id)}"
+
+            consultas = []
+            with capturar_consultas(consultas):
+                respuesta = cliente.get(url, HTTP_AUTHORIZATION=f"Bearer {tokens[rol]}")
+            if respuesta.status_code != 200:
+                raise CommandError(f"{url} respondió {respuesta.status_code}")
+
+            seq_scans = []
+            for sql, params in consultas:
+                for tabla in self._seq_scans(sql, params, options['forzar_indices']):
+                    if tabla in tablas:
+                        seq_scans.append((tabla, sql))
+
+            if seq_scans:
+                regresiones.extend((url, tabla, sql) for tabla, sql in seq_scans)
+                self.stdout.write(self.style.ERROR(f"❌ {url}: Seq Scan en {', '.join(sorted({t for t, _ in seq_scans}))}"))
+            else:
+                self.stdout.write(f"✅ {url} ({len(consultas)} consultas)")
+
+        if regresiones:
+            for url, tabla, sql in regresiones:
+                self.stderr.write(f"\n{url} · {tabla}\n{sql}")
+            raise CommandError(f"{len(regresiones)} consultas con Seq Scan sobre tablas grandes")
+
+        self.stdout.write(self.style.SUCCESS("✅ Ningún endpoint hace Seq Scan sobre tablas grandes"))
+
+    def _seq_scans(self, sql, params, forzar_indices):
+        with transaction.atomic(), connection.cursor() as cursor:
+            if forzar_indices:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return [
+            nodo.get('Relation Name')
+            for nodo in nodos_del_plan(plan[0]['Plan'])
+            if nodo['Node Type'] == 'Seq Scan'
+        ]
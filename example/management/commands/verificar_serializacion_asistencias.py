@@ -0,0 +1,66 @@
+import time
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from example.models import Asistencia
+from example.serializers import AsistenciaSerializer, filas_asistencias, serializar_asistencias
+
+
+def _medir(funcion, repeticiones):
+    """Mejor tiempo (segundos) de `repeticiones` ejecuciones de funcion()."""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica que serializar_asistencias() produzca exactamente el mismo JSON que "
+        "AsistenciaSerializer y compara el tiempo de ambos sobre N filas"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=10000, help="Filas a serializar en la medición (por defecto 10000)")
+        parser.add_argument('--repeticiones', type=int, default=5, help="Repeticiones por serializador; se reporta la mejor")
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+        if filas < 1 or options['repeticiones'] < 1:
+            raise CommandError("--filas y --repeticiones deben ser mayores que 0")
+
+        asistencias_qs = Asistencia.objects.order_by('id')[:filas]
+        instancias = list(asistencias_qs.select_related('usuario', 'horario__usuario'))
+        if not instancias:
+            raise CommandError("No hay asistencias en la base de datos")
+        tuplas = list(filas_asistencias(asistencias_qs))
+        if len(tuplas) != len(instancias):
+            raise CommandError("Las consultas de comparación retornaron cantidades distintas de filas")
+
+        # Paridad: mismo JSON byte a byte (incluye orden de claves y formato de fechas/decimales)
+        renderer = JSONRenderer()
+        diferencias = 0
+        for instancia, rapida in zip(instancias, serializar_asistencias(tuplas)):
+            if renderer.render(AsistenciaSerializer(instancia).data) != renderer.render(rapida):
+                diferencias += 1
+                if diferencias <= 5:
+                    self.stderr.write(f"Asistencia {instancia.id}: la serialización rápida difiere")
+        if diferencias:
+            raise CommandError(f"{diferencias} de {len(instancias)} asistencias difieren de AsistenciaSerializer")
+        self.stdout.write(self.style.SUCCESS(f"✅ Paridad verificada en {len(instancias)} asistencias"))
+
+        # Medición: solo la serialización, con las filas ya en memoria (se repiten si hay menos de N)
+        instancias = list(islice(cycle(instancias), filas))
+        tuplas = list(islice(cycle(tuplas), filas))
+        repeticiones = options['repeticiones']
+        tiempo_drf = _medir(lambda: AsistenciaSerializer(instancias, many=True).data, repeticiones)
+        tiempo_rapido = _medir(lambda: serializar_asistencias(tuplas), repeticiones)
+
+        self.stdout.write(f"AsistenciaSerializer:     {tiempo_drf * 1000:.1f} ms para {filas} filas")
+        self.stdout.write(f"serializar_asistencias(): {tiempo_rapido * 1000:.1f} ms para {filas} filas")
+        self.stdout.write(self.style.SUCCESS(f"✅ {tiempo_drf / tiempo_rapido:.1f}x más rápido"))
@@ -0,0 +1,42 @@
+# Generated by Django 4.1.3 on 2026-10-17 20:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def poblar_resumen(apps, schema_editor):
+    from example.resumen import reconstruir_resumen
+    reconstruir_resumen(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0007_alter_asistencia_estado_autorizacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenHorasDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('sede', models.CharField(blank=True, default='', max_length=2)),
+                ('jornada', models.CharField(blank=True, default='', max_length=1)),
+                ('horas_asistencias', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('horas_ajustes', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('total_asistencias', models.PositiveIntegerField(default=0)),
+                ('total_ajustes', models.PositiveIntegerField(default=0)),
+                ('presentes', models.PositiveIntegerField(default=0)),
+                ('autorizadas', models.PositiveIntegerField(default=0)),
+                ('pendientes', models.PositiveIntegerField(default=0)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumen_horas', to='example.usuariopersonalizado')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Horas',
+                'verbose_name_plural': 'Resúmenes Diarios de Horas',
+                'unique_together': {('usuario', 'fecha', 'sede', 'jornada')},
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
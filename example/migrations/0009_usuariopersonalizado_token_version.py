@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-17 20:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0008_resumenhorasdiario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usuariopersonalizado',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text='Versión de los tokens JWT del usuario; al incrementarla se revocan los emitidos antes'),
+        ),
+    ]
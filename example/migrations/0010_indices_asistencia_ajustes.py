@@ -0,0 +1,34 @@
+# Generated by Django 4.1.3 on 2026-10-17 20:58
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0009_usuariopersonalizado_token_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ajustehoras',
+            index=models.Index(fields=['usuario', 'fecha'], name='ajuste_usuario_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ajustehoras',
+            index=models.Index(fields=['fecha'], name='ajuste_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['fecha', 'horario'], name='asistencia_fecha_horario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(condition=models.Q(('estado_autorizacion', 'pendiente')), fields=['-fecha', 'usuario'], name='asistencia_pendiente_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['fecha'], name='asistencia_fecha_brin'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.1.3 on 2026-10-17 21:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0010_indices_asistencia_ajustes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionCambios',
+            fields=[
+                ('tabla', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Versión de Cambios',
+                'verbose_name_plural': 'Versiones de Cambios',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.3 on 2026-10-17 22:30
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def desde_registro_del_usuario(apps, schema_editor):
+    # Los horarios existentes rigen desde el registro de su usuario
+    HorarioFijo = apps.get_model('example', 'HorarioFijo')
+    for horario in HorarioFijo.objects.select_related('usuario'):
+        horario.vigente_desde = timezone.localdate(horario.usuario.date_joined)
+        horario.save(update_fields=['vigente_desde'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0011_versioncambios'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='horariofijo',
+            name='vigente_desde',
+            field=models.DateField(default=timezone.localdate, help_text='Primer día en que rige el horario; antes de esa fecha no tiene asistencias pendientes'),
+        ),
+        migrations.RunPython(desde_registro_del_usuario, migrations.RunPython.noop),
+    ]
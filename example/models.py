@@ -1,8 +1,129 @@
-from django.db import models
+from decimal import Decimal
+from django.db import models, transaction
+from django.db.models import OuterRef, Subquery, Sum, Count, Q, F, Value, ExpressionWrapper
+from django.db.models.functions import Coalesce
 from django.contrib.auth.hashers import make_password, check_password
+from django.contrib.postgres.indexes import BrinIndex
 from django.conf import settings
+from django.utils import timezone
 
-class UsuarioPersonalizado(models.Model):
+
+HORAS_POR_JORNADA = 4
+
+
+def _subconsulta_por_usuario(queryset, expresion, output_field):
+    """
+    Convierte un agregado sobre `queryset` (filtrado por usuario=OuterRef('pk'))
+    en una subconsulta escalar que vale 0 cuando el usuario no tiene filas.
+    """
+    subconsulta = queryset.order_by().values('usuario').annotate(valor=expresion).values('valor')
+    return Coalesce(Subquery(subconsulta, output_field=output_field), Value(0), output_field=output_field)
+
+
+class HorasQuerySet(models.QuerySet):
+    """
+    QuerySet de usuarios con anotaciones de horas, jornadas y costos.
+    Cada anotación es una subconsulta correlacionada, de modo que los totales
+    de todos los monitores se obtienen en una sola sentencia SQL.
+    """
+
+    def with_horas(self, fecha_inicio, fecha_fin, sede=None, jornada=None):
+        """
+        Anota horas_asistencias, horas_ajustes, horas_totales, total_asistencias,
+        total_ajustes, asistencias_presentes y asistencias_autorizadas del período.
+        Los filtros de sede y jornada aplican solo a las asistencias.
+        Lee del resumen diario (ResumenHorasDiario) en lugar de las filas crudas.
+        """
+        decimal_horas = models.DecimalField(max_digits=12, decimal_places=2)
+        entero = models.IntegerField()
+
+        resumen = ResumenHorasDiario.objects.filter(
+            usuario=OuterRef('pk'),
+            fecha__gte=fecha_inicio,
+            fecha__lte=fecha_fin
+        )
+        resumen_asistencias = resumen
+        if sede:
+            resumen_asistencias = resumen_asistencias.filter(sede=sede)
+        if jornada:
+            resumen_asistencias = resumen_asistencias.filter(jornada=jornada)
+
+        return self.annotate(
+            horas_asistencias=_subconsulta_por_usuario(resumen_asistencias, Sum('horas_asistencias'), decimal_horas),
+            horas_ajustes=_subconsulta_por_usuario(resumen, Sum('horas_ajustes'), decimal_horas),
+            total_asistencias=_subconsulta_por_usuario(resumen_asistencias, Sum('total_asistencias'), entero),
+            total_ajustes=_subconsulta_por_usuario(resumen, Sum('total_ajustes'), entero),
+            asistencias_presentes=_subconsulta_por_usuario(resumen_asistencias, Sum('presentes'), entero),
+            asistencias_autorizadas=_subconsulta_por_usuario(resumen_asistencias, Sum('autorizadas'), entero),
+        ).annotate(
+            horas_totales=ExpressionWrapper(F('horas_asistencias') + F('horas_ajustes'), output_field=decimal_horas)
+        )
+
+    def with_jornadas_semanales(self):
+        """
+        Anota jornadas_semanales (cantidad de HorarioFijo) y horas_semanales
+        (cada jornada equivale a HORAS_POR_JORNADA horas).
+        """
+        entero = models.IntegerField()
+        horarios = HorarioFijo.objects.filter(usuario=OuterRef('pk'))
+        return self.annotate(
+            jornadas_semanales=_subconsulta_por_usuario(horarios, Count('id'), entero)
+        ).annotate(
+            horas_semanales=ExpressionWrapper(F('jornadas_semanales') * HORAS_POR_JORNADA, output_field=entero)
+        )
+
+    def with_costo(self, costo_por_hora):
+        """
+        Anota costo_total = horas_totales * costo_por_hora.
+        Requiere haber llamado antes a with_horas().
+        """
+        return self.annotate(
+            costo_total=ExpressionWrapper(
+                F('horas_totales') * Value(Decimal(str(costo_por_hora))),
+                output_field=models.DecimalField(max_digits=16, decimal_places=2)
+            )
+        )
+
+
+class CamposCargadosMixin:
+    """
+    Recuerda los valores con los que se cargó la instancia desde la base
+    (from_db, sin costo al construir instancias nuevas) para que las señales
+    sepan qué cambió al guardar, p. ej. el día de una asistencia movida.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._valores_cargados = dict(zip(field_names, values))
+        return instancia
+
+    def valor_cargado(self, campo):
+        """Valor de `campo` (attname) al cargarse o guardarse por última vez; None si no se conoce."""
+        return getattr(self, '_valores_cargados', {}).get(campo)
+
+    def campos_modificados(self, campos):
+        """
+        Campos de `campos` cuyo valor cambió desde que se cargó la instancia.
+        Si no se cargó de la base (instancia nueva o construida a mano) se
+        consideran todos modificados.
+        """
+        cargados = getattr(self, '_valores_cargados', None)
+        if cargados is None:
+            return set(campos)
+        return {
+            campo for campo in campos
+            if (campo in cargados and cargados[campo] != getattr(self, campo))
+            or (campo not in cargados and campo in self.__dict__)
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Las señales post_save ya compararon contra los valores anteriores
+        self._valores_cargados = {campo.attname: getattr(self, campo.attname) for campo in self._meta.concrete_fields}
+
+
+class UsuarioPersonalizado(CamposCargadosMixin, models.Model):
     """
     Modelo de usuario completamente personalizado, independiente de Django
     """
@@ -18,15 +139,45 @@ class UsuarioPersonalizado(models.Model):
     is_active = models.BooleanField(default=True)
     date_joined = models.DateTimeField(auto_now_add=True)
     last_login = models.DateTimeField(null=True, blank=True)
+    token_version = models.PositiveIntegerField(
+        default=0,
+        help_text="Versión de los tokens JWT del usuario; al incrementarla se revocan los emitidos antes"
+    )
     
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['nombre']
+
+    # Campos del usuario que muestran las respuestas (UsuarioSerializer)
+    CAMPOS_VISIBLES = ('username', 'nombre', 'tipo_usuario')
+    # Campos que, al cambiar, revocan los tokens emitidos (sus claims o su acceso quedan desactualizados)
+    CAMPOS_SESION = ('tipo_usuario', 'is_active', 'password')
+
+    objects = HorasQuerySet.as_manager()
     
     def save(self, *args, **kwargs):
         # Hashear la contraseña solo si no está ya hasheada
         if not self.password.startswith('pbkdf2_sha256$'):
             self.password = make_password(self.password)
-        super().save(*args, **kwargs)
+
+        # Solo se comparan los campos que se van a guardar de una instancia cargada de la base
+        update_fields = kwargs.get('update_fields')
+        campos = self.CAMPOS_SESION if update_fields is None else set(self.CAMPOS_SESION) & set(update_fields)
+        if self._state.adding or self.valor_cargado('id') is None or not self.campos_modificados(campos):
+            super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic():
+            self.token_version = self._siguiente_version_token()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+            super().save(*args, **kwargs)
+
+    def _siguiente_version_token(self):
+        # Bloquea la fila para que dos revocaciones simultáneas no calculen la misma versión
+        actual = UsuarioPersonalizado.objects.select_for_update().values_list(
+            'token_version', flat=True
+        ).get(pk=self.pk)
+        return actual + 1
     
     def set_password(self, raw_password):
         """Establecer la contraseña hasheada"""
@@ -39,6 +190,12 @@ class UsuarioPersonalizado(models.Model):
     def is_authenticated(self):
         """Verificar si el usuario está autenticado"""
         return True
+
+    def revocar_tokens(self):
+        """Invalida todos los tokens JWT emitidos hasta ahora para el usuario"""
+        with transaction.atomic():
+            self.token_version = self._siguiente_version_token()
+            self.save(update_fields=['token_version'])
     
     def __str__(self):
         return f"{self.nombre} ({self.username}) - {self.get_tipo_usuario_display()}"
@@ -53,7 +210,7 @@ class UsuarioPersonalizado(models.Model):
 
 # Los modelos HorarioFijo y Asistencia se conectan directamente al UsuarioPersonalizado
 
-class HorarioFijo(models.Model):
+class HorarioFijo(CamposCargadosMixin, models.Model):
     """
     Plantilla que el usuario define UNA sola vez.
     Puede tener varias jornadas el mismo día, incluso en sedes distintas.
@@ -82,6 +239,10 @@ class HorarioFijo(models.Model):
     dia_semana = models.IntegerField(choices=DIAS)
     jornada = models.CharField(max_length=1, choices=JORNADAS)
     sede = models.CharField(max_length=2, choices=SEDES)
+    vigente_desde = models.DateField(
+        default=timezone.localdate,
+        help_text="Primer día en que rige el horario; antes de esa fecha no tiene asistencias pendientes"
+    )
 
     class Meta:
         unique_together = ("usuario", "dia_semana", "jornada")
@@ -90,7 +251,7 @@ class HorarioFijo(models.Model):
         return f"{self.usuario} - {self.get_dia_semana_display()} {self.get_jornada_display()} ({self.get_sede_display()})"
 
 
-class Asistencia(models.Model):
+class Asistencia(CamposCargadosMixin, models.Model):
     """
     Asistencia semanal basada en el HorarioFijo.
     """
@@ -109,13 +270,25 @@ class Asistencia(models.Model):
 
     class Meta:
         unique_together = ("usuario", "fecha", "horario")
+        indexes = [
+            # Asistencias del día por horario (directivo_asistencias, generación)
+            models.Index(fields=["fecha", "horario"], name="asistencia_fecha_horario_idx"),
+            # Pendientes de fechas pasadas (directivo_asistencias_recuperables)
+            models.Index(
+                fields=["-fecha", "usuario"],
+                name="asistencia_pendiente_idx",
+                condition=Q(estado_autorizacion="pendiente"),
+            ),
+            # Rangos amplios de fechas (reportes); las filas se insertan en orden de fecha
+            BrinIndex(fields=["fecha"], name="asistencia_fecha_brin"),
+        ]
 
     def __str__(self):
         estado = "Presente" if self.presente else "Pendiente"
         return f"{self.usuario} - {self.fecha} - {self.horario} [{estado} | {self.estado_autorizacion}]"
 
 
-class AjusteHoras(models.Model):
+class AjusteHoras(CamposCargadosMixin, models.Model):
     """
     Modelo para ajustes manuales de horas realizados por directivos.
     Permite agregar o restar horas a monitores con trazabilidad completa.
@@ -154,6 +327,10 @@ class AjusteHoras(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['usuario', 'fecha'], name='ajuste_usuario_fecha_idx'),
+            models.Index(fields=['fecha'], name='ajuste_fecha_idx'),
+        ]
         verbose_name = "Ajuste de Horas"
         verbose_name_plural = "Ajustes de Horas"
 
@@ -162,6 +339,35 @@ class AjusteHoras(models.Model):
         return f"{self.usuario.nombre} - {self.fecha} - {signo}{self.cantidad_horas}h - {self.motivo[:50]}"
 
 
+class ResumenHorasDiario(models.Model):
+    """
+    Resumen diario de horas por monitor, fecha, sede y jornada.
+    Se mantiene al día desde las señales de Asistencia, AjusteHoras y HorarioFijo
+    (ver example/resumen.py) y se reconstruye con el comando reconstruir_resumen_horas.
+    Los ajustes de horas no tienen sede ni jornada: se acumulan en la fila con
+    sede y jornada vacías.
+    """
+    usuario = models.ForeignKey(UsuarioPersonalizado, on_delete=models.CASCADE, related_name="resumen_horas")
+    fecha = models.DateField()
+    sede = models.CharField(max_length=2, blank=True, default="")
+    jornada = models.CharField(max_length=1, blank=True, default="")
+    horas_asistencias = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    horas_ajustes = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    total_asistencias = models.PositiveIntegerField(default=0)
+    total_ajustes = models.PositiveIntegerField(default=0)
+    presentes = models.PositiveIntegerField(default=0)
+    autorizadas = models.PositiveIntegerField(default=0)
+    pendientes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("usuario", "fecha", "sede", "jornada")
+        verbose_name = "Resumen Diario de Horas"
+        verbose_name_plural = "Resúmenes Diarios de Horas"
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.fecha} {self.sede}/{self.jornada}: {self.horas_asistencias}h + {self.horas_ajustes}h"
+
+
 class ConfiguracionSistema(models.Model):
     """
     Modelo para configuraciones del sistema que pueden ser editadas por directivos.
@@ -225,4 +431,20 @@ class ConfiguracionSistema(models.Model):
             return self.valor
 
     def __str__(self):
-        return f"{self.clave}: {self.valor} ({self.tipo_dato})"
\ No newline at end of file
+        return f"{self.clave}: {self.valor} ({self.tipo_dato})"
+
+class VersionCambios(models.Model):
+    """
+    Contador de cambios por tabla. Se incrementa en cada escritura desde las
+    señales (ver example/versiones.py) y alimenta los ETag de los endpoints de
+    consulta, de modo que un GET condicional sin cambios cuesta una consulta.
+    """
+    tabla = models.CharField(max_length=64, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Versión de Cambios"
+        verbose_name_plural = "Versiones de Cambios"
+
+    def __str__(self):
+        return f"{self.tabla}: v{self.version}"
@@ -0,0 +1,237 @@
+"""
+Paginación por cursor (keyset) para los endpoints de listado.
+
+En lugar de OFFSET, cada página continúa después de la última fila de la
+anterior: el cursor guarda los valores de las columnas de orden de esa fila y
+la siguiente consulta filtra con una comparación lexicográfica sobre ellas.
+Así una página profunda cuesta lo mismo que la primera. El orden siempre
+termina en `id` para que la clave sea única. Las columnas de orden no deben
+admitir NULL. Los valores del cursor se convierten y validan con el tipo de
+cada columna del modelo, así que un cursor alterado responde 400 en lugar de
+llegar a la consulta. paginar_combinado() intercala en la página filas que no
+están en la base de datos (p. ej. virtuales), con el mismo cursor.
+"""
+import base64
+import json
+from datetime import date, datetime
+from functools import cmp_to_key
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+
+
+class ParametrosPaginacionInvalidos(ValueError):
+    pass
+
+
+def _valor_cursor(valor):
+    return valor.isoformat() if isinstance(valor, (date, datetime)) else valor
+
+
+def _codificar(valores):
+    texto = json.dumps([_valor_cursor(v) for v in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def _campo(modelo, columna):
+    """Campo de `modelo` de una columna de orden (con relaciones 'a__b'); para FK, el campo referido."""
+    *relaciones, nombre = columna.lstrip('-').split('__')
+    for relacion in relaciones:
+        modelo = modelo._meta.get_field(relacion).related_model
+    campo = modelo._meta.get_field(nombre)
+    return campo.target_field if campo.is_relation else campo
+
+
+def _decodificar(cursor, campos):
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ParametrosPaginacionInvalidos('cursor inválido')
+    if not isinstance(valores, list) or len(valores) != len(campos):
+        raise ParametrosPaginacionInvalidos('cursor inválido')
+
+    # Cada valor debe ser un escalar válido para el tipo de su columna
+    convertidos = []
+    for campo, valor in zip(campos, valores):
+        if not isinstance(valor, (str, int, float, bool)):
+            raise ParametrosPaginacionInvalidos('cursor inválido')
+        try:
+            valor = campo.to_python(valor)
+        except (ValidationError, TypeError, ValueError):
+            raise ParametrosPaginacionInvalidos('cursor inválido')
+        if valor is None:
+            raise ParametrosPaginacionInvalidos('cursor inválido')
+        convertidos.append(valor)
+    return convertidos
+
+
+def _orden_con_desempate(orden):
+    orden = list(orden)
+    if orden[-1].lstrip('-') != 'id':
+        orden.append('-id' if orden[-1].startswith('-') else 'id')
+    return orden
+
+
+def parametros_paginacion(query_params, modelo, orden):
+    """
+    Lee `limite`, `cursor` y `totales` de la query para un listado de `modelo`
+    ordenado por `orden` (campos con prefijo '-' para orden descendente). La
+    paginación es opcional: retorna None si no se pidió (ni limite ni cursor),
+    o un dict con los parámetros validados para paginar().
+    """
+    limite = query_params.get('limite')
+    cursor = query_params.get('cursor')
+    if limite is None and cursor is None:
+        return None
+
+    if limite is None:
+        limite = LIMITE_POR_DEFECTO
+    else:
+        try:
+            limite = int(limite)
+        except ValueError:
+            raise ParametrosPaginacionInvalidos('limite debe ser un número entero')
+        if limite < 1 or limite > LIMITE_MAXIMO:
+            raise ParametrosPaginacionInvalidos(f'limite debe estar entre 1 y {LIMITE_MAXIMO}')
+
+    orden = _orden_con_desempate(orden)
+    return {
+        'orden': orden,
+        'limite': limite,
+        'despues_de': _decodificar(cursor, [_campo(modelo, columna) for columna in orden]) if cursor else None,
+        'incluir_totales': query_params.get('totales', '').lower() in ['true', '1', 'si'],
+    }
+
+
+def _despues_de(queryset, orden, valores):
+    """`queryset` ordenado por `orden` y, con `valores`, solo las filas posteriores a ellos."""
+    alias = {}
+    ordenamiento = []
+    for i, campo in enumerate(orden):
+        nombre = f'_cursor_{i}'
+        alias[nombre] = F(campo.lstrip('-'))
+        ordenamiento.append(f'-{nombre}' if campo.startswith('-') else nombre)
+
+    queryset = queryset.annotate(**alias).order_by(*ordenamiento)
+
+    if valores:
+        # (a, b, c) > (va, vb, vc) respetando la dirección de cada columna
+        condicion = Q()
+        for i, campo in enumerate(orden):
+            paso = Q(**{f'_cursor_{j}': valores[j] for j in range(i)})
+            lookup = 'lt' if campo.startswith('-') else 'gt'
+            paso &= Q(**{f'_cursor_{i}__{lookup}': valores[i]})
+            condicion |= paso
+        queryset = queryset.filter(condicion)
+    return queryset
+
+
+def _valores_de(fila, orden):
+    if isinstance(fila, tuple):
+        # values_list(): las columnas del cursor quedan al final de la tupla
+        return list(fila[-len(orden):])
+    if isinstance(fila, dict):
+        return [fila[f'_cursor_{i}'] for i in range(len(orden))]
+    return [getattr(fila, f'_cursor_{i}') for i in range(len(orden))]
+
+
+def paginar(queryset, paginacion):
+    """
+    Retorna (filas, siguiente_cursor) de la página pedida de `queryset`.
+    siguiente_cursor es None en la última página.
+    """
+    orden = paginacion['orden']
+    limite = paginacion['limite']
+
+    filas = list(_despues_de(queryset, orden, paginacion['despues_de'])[:limite + 1])
+    if len(filas) <= limite:
+        return filas, None
+
+    filas = filas[:limite]
+    return filas, _codificar(_valores_de(filas[-1], orden))
+
+
+def iterar_por_lotes(queryset, orden, tamano):
+    """
+    Recorre `queryset` ordenado por `orden` con una consulta de `tamano` filas
+    por lote, cada una después de la última fila del anterior. A diferencia de
+    QuerySet.iterator(), la memoria queda acotada aunque los cursores del lado
+    del servidor estén desactivados (DISABLE_SERVER_SIDE_CURSORS), caso en que
+    el driver carga el resultado completo. Las filas de values() y
+    values_list() se entregan sin las columnas del cursor.
+    """
+    orden = _orden_con_desempate(orden)
+    valores = None
+    while True:
+        filas = list(_despues_de(queryset, orden, valores)[:tamano])
+        for fila in filas:
+            if isinstance(fila, tuple):
+                yield fila[:-len(orden)]
+            elif isinstance(fila, dict):
+                yield {clave: valor for clave, valor in fila.items() if not clave.startswith('_cursor_')}
+            else:
+                yield fila
+        if len(filas) < tamano:
+            return
+        valores = _valores_de(filas[-1], orden)
+
+
+def _comparar(a, b, orden):
+    """-1, 0 o 1 según si la fila con valores `a` va antes, junto o después de `b`."""
+    for campo, valor_a, valor_b in zip(orden, a, b):
+        valor_a, valor_b = _valor_cursor(valor_a), _valor_cursor(valor_b)
+        if valor_a != valor_b:
+            resultado = -1 if valor_a < valor_b else 1
+            return -resultado if campo.startswith('-') else resultado
+    return 0
+
+
+def ordenar_lista(filas, orden, valores):
+    """Ordena filas en memoria por `orden`; `valores(fila)` retorna los valores de esas columnas."""
+    clave = cmp_to_key(lambda a, b: _comparar(a, b, orden))
+    return sorted(filas, key=lambda fila: clave(valores(fila)))
+
+
+def paginar_combinado(queryset, paginacion, adicionales, valores):
+    """
+    Como paginar(), intercalando con las filas de `queryset` las de
+    `adicionales`: un iterable de filas que no están en la base de datos,
+    entregadas en el orden de la primera columna de paginacion['orden'].
+    `valores(fila)` retorna los valores de las columnas de orden de cualquier
+    fila. Solo se consumen las adicionales que pueden quedar en la página.
+    """
+    orden = paginacion['orden']
+    limite = paginacion['limite']
+    despues_de = paginacion['despues_de']
+
+    filas = list(_despues_de(queryset, orden, despues_de)[:limite + 1])
+    # Las adicionales posteriores a la última fila leída de la base de datos no entran en la página
+    tope = valores(filas[-1]) if len(filas) > limite else None
+
+    candidatas = []
+    for fila in adicionales:
+        actuales = valores(fila)
+        if tope is not None and _comparar(actuales[:1], tope[:1], orden) > 0:
+            break
+        if len(candidatas) > limite and _comparar(actuales[:1], valores(candidatas[-1])[:1], orden) > 0:
+            break
+        if despues_de is None or _comparar(actuales, despues_de, orden) > 0:
+            candidatas.append(fila)
+
+    filas = ordenar_lista(filas + candidatas, orden, valores)
+    if len(filas) <= limite:
+        return filas, None
+    filas = filas[:limite]
+    return filas, _codificar(valores(filas[-1]))
+
+
+def datos_paginacion(paginacion, siguiente_cursor):
+    return {
+        'limite': paginacion['limite'],
+        'siguiente_cursor': siguiente_cursor,
+        'hay_mas': siguiente_cursor is not None,
+    }
@@ -0,0 +1,15 @@
+from rest_framework.exceptions import NotAuthenticated
+from rest_framework.permissions import BasePermission
+
+
+class EsDirectivo(BasePermission):
+    """
+    Permite el acceso solo a usuarios autenticados de tipo DIRECTIVO.
+    """
+    message = 'Solo directivos pueden acceder a este endpoint'
+
+    def has_permission(self, request, view):
+        usuario = request.user
+        if not usuario or not getattr(usuario, 'tipo_usuario', None):
+            raise NotAuthenticated('Token de autenticación requerido')
+        return usuario.tipo_usuario == 'DIRECTIVO'
@@ -0,0 +1,36 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Habilita ?format=ndjson. Los reportes responden con streaming; este
+    renderer solo se usa para las respuestas normales (p. ej. errores).
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        filas = data if isinstance(data, list) else [data]
+        return ''.join(json.dumps(fila, ensure_ascii=False) + '\n' for fila in filas).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Habilita ?format=csv. Igual que NDJSONRenderer, solo se usa para las
+    respuestas que no son streaming (p. ej. errores).
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            return ''.join(f'{clave},{valor}\n' for clave, valor in data.items()).encode(self.charset)
+        return str(data).encode(self.charset)
@@ -0,0 +1,146 @@
+"""
+Mantenimiento del resumen diario de horas (ResumenHorasDiario).
+
+El resumen se recalcula por (usuario, fecha): cada vez que cambia una
+asistencia o un ajuste se vuelven a agregar las filas crudas de ese día y
+se actualizan (upsert) las filas del resumen correspondientes, eliminando
+las que ya no tienen datos. Las señales solo acumulan los pares afectados
+y el recálculo corre una vez por transacción al confirmarla
+(programar_recalculo). Las operaciones masivas que no disparan señales
+(QuerySet.update, bulk_create) deben llamar a programar_recalculo() o a
+recalcular_resumen() con los pares afectados.
+"""
+from functools import reduce
+from operator import or_
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Sum, Count, Q, F
+
+from .transacciones import al_confirmar
+
+# Columnas de la restricción única (Django 4.1 usa los nombres tal cual en ON CONFLICT)
+CAMPOS_CLAVE = ['usuario_id', 'fecha', 'sede', 'jornada']
+CAMPOS_TOTALES = [
+    'horas_asistencias', 'horas_ajustes', 'total_asistencias', 'total_ajustes',
+    'presentes', 'autorizadas', 'pendientes',
+]
+
+
+def _modelos(apps):
+    return (
+        apps.get_model('example', 'Asistencia'),
+        apps.get_model('example', 'AjusteHoras'),
+        apps.get_model('example', 'ResumenHorasDiario'),
+    )
+
+
+def _recalcular(filtro, apps=global_apps, usuarios=None):
+    """
+    Deja las filas del resumen que cumplen `filtro` (un Q sobre usuario_id y
+    fecha) iguales a la agregación actual de asistencias y ajustes. Con
+    `usuarios` se bloquean esas filas de usuario mientras tanto, de modo que
+    dos recálculos simultáneos de los mismos días se ejecuten uno tras otro
+    y el último escriba el estado más reciente.
+    """
+    Asistencia, AjusteHoras, ResumenHorasDiario = _modelos(apps)
+    UsuarioPersonalizado = apps.get_model('example', 'UsuarioPersonalizado')
+
+    with transaction.atomic():
+        if usuarios:
+            list(UsuarioPersonalizado.objects.select_for_update().filter(pk__in=usuarios).order_by('pk').values_list('pk'))
+        return _reemplazar(filtro, Asistencia, AjusteHoras, ResumenHorasDiario)
+
+
+def _reemplazar(filtro, Asistencia, AjusteHoras, ResumenHorasDiario):
+    filas = {}
+
+    asistencias = Asistencia.objects.filter(filtro).values(
+        'usuario_id', 'fecha', sede=F('horario__sede'), jornada=F('horario__jornada')
+    ).annotate(
+        suma_horas=Sum('horas'),
+        cantidad=Count('id'),
+        presentes=Count('id', filter=Q(presente=True)),
+        autorizadas=Count('id', filter=Q(estado_autorizacion='autorizado')),
+        pendientes=Count('id', filter=Q(estado_autorizacion='pendiente'))
+    ).order_by()
+
+    for fila in asistencias:
+        clave = (fila['usuario_id'], fila['fecha'], fila['sede'], fila['jornada'])
+        filas[clave] = ResumenHorasDiario(
+            usuario_id=fila['usuario_id'],
+            fecha=fila['fecha'],
+            sede=fila['sede'],
+            jornada=fila['jornada'],
+            horas_asistencias=fila['suma_horas'] or 0,
+            total_asistencias=fila['cantidad'],
+            presentes=fila['presentes'],
+            autorizadas=fila['autorizadas'],
+            pendientes=fila['pendientes']
+        )
+
+    ajustes = AjusteHoras.objects.filter(filtro).values('usuario_id', 'fecha').annotate(
+        suma_horas=Sum('cantidad_horas'),
+        cantidad=Count('id')
+    ).order_by()
+
+    for fila in ajustes:
+        clave = (fila['usuario_id'], fila['fecha'], '', '')
+        filas[clave] = ResumenHorasDiario(
+            usuario_id=fila['usuario_id'],
+            fecha=fila['fecha'],
+            horas_ajustes=fila['suma_horas'] or 0,
+            total_ajustes=fila['cantidad']
+        )
+
+    # Filas que ya no tienen datos; el resto se inserta o actualiza en su lugar
+    obsoletas = [
+        id_ for id_, *clave in ResumenHorasDiario.objects.filter(filtro).values_list(
+            'id', 'usuario_id', 'fecha', 'sede', 'jornada'
+        )
+        if tuple(clave) not in filas
+    ]
+    if obsoletas:
+        ResumenHorasDiario.objects.filter(id__in=obsoletas).delete()
+    ResumenHorasDiario.objects.bulk_create(
+        filas.values(),
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=CAMPOS_CLAVE,
+        update_fields=CAMPOS_TOTALES
+    )
+
+    return len(filas)
+
+
+def recalcular_resumen(pares, apps=global_apps):
+    """
+    Recalcula el resumen de los pares (usuario_id, fecha) indicados.
+    """
+    pares = {(usuario_id, fecha) for usuario_id, fecha in pares if usuario_id and fecha}
+    if not pares:
+        return 0
+    filtro = reduce(or_, (Q(usuario_id=usuario_id, fecha=fecha) for usuario_id, fecha in pares))
+    return _recalcular(filtro, apps, usuarios={usuario_id for usuario_id, _ in pares})
+
+
+def programar_recalculo(pares):
+    """
+    Recalcula los pares (usuario_id, fecha) una sola vez cuando se confirme la
+    transacción en curso, junto con los demás pares acumulados en ella.
+    """
+    pares = {(usuario_id, fecha) for usuario_id, fecha in pares if usuario_id and fecha}
+    if pares:
+        al_confirmar(recalcular_resumen, pares)
+
+
+def reconstruir_resumen(fecha_inicio=None, fecha_fin=None, apps=global_apps):
+    """
+    Reconstruye el resumen completo, o solo el rango de fechas indicado.
+    """
+    filtro = Q()
+    if fecha_inicio:
+        filtro &= Q(fecha__gte=fecha_inicio)
+    if fecha_fin:
+        filtro &= Q(fecha__lte=fecha_fin)
+    return _recalcular(filtro, apps)
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from .models import UsuarioPersonalizado, HorarioFijo, Asistencia, AjusteHoras, ConfiguracionSistema
 
@@ -169,25 +171,268 @@ class AsistenciaSerializer(serializers.ModelSerializer):
         fields = ['id', 'usuario', 'fecha', 'horario', 'presente', 'estado_autorizacion', 'estado_autorizacion_display', 'horas']
         read_only_fields = ['id']
 
+# Serialización rápida de listados de asistencias: mismo JSON que
+# AsistenciaSerializer, construido desde tuplas de values_list() sin instanciar
+# modelos ni árboles de campos de DRF por fila.
+CAMPOS_ASISTENCIA = (
+    'id', 'fecha', 'presente', 'estado_autorizacion', 'horas',
+    'usuario_id', 'usuario__username', 'usuario__nombre', 'usuario__tipo_usuario',
+    'horario_id', 'horario__dia_semana', 'horario__jornada', 'horario__sede',
+    'horario__usuario_id', 'horario__usuario__username', 'horario__usuario__nombre',
+    'horario__usuario__tipo_usuario',
+)
+
+_TIPOS_USUARIO = dict(UsuarioPersonalizado.TIPOS_USUARIO)
+_DIAS = dict(HorarioFijo.DIAS)
+_JORNADAS = dict(HorarioFijo.JORNADAS)
+_SEDES = dict(HorarioFijo.SEDES)
+_ESTADOS_AUTORIZACION = dict(Asistencia.ESTADOS_AUTORIZACION)
+_CENTESIMAS = Decimal('0.01')
+
+
+def filas_asistencias(queryset):
+    """values_list() de `queryset` con las columnas que usa serializar_asistencias()."""
+    return queryset.values_list(*CAMPOS_ASISTENCIA)
+
+
+def _usuario(id_, username, nombre, tipo_usuario):
+    return {
+        'id': id_,
+        'username': username,
+        'nombre': nombre,
+        'tipo_usuario': tipo_usuario,
+        'tipo_usuario_display': _TIPOS_USUARIO.get(tipo_usuario, tipo_usuario),
+    }
+
+
+def serializar_asistencias(filas):
+    """
+    Equivalente a AsistenciaSerializer(..., many=True).data para filas de
+    filas_asistencias(). Las columnas extra al final de cada tupla (p. ej. las
+    del cursor de paginación) se ignoran.
+    """
+    datos = []
+    for (id_, fecha, presente, estado, horas,
+         usuario_id, username, nombre, tipo_usuario,
+         horario_id, dia_semana, jornada, sede,
+         horario_usuario_id, horario_username, horario_nombre, horario_tipo_usuario,
+         *_) in filas:
+        usuario = _usuario(usuario_id, username, nombre, tipo_usuario)
+        if horario_usuario_id == usuario_id:
+            horario_usuario = dict(usuario)
+        else:
+            horario_usuario = _usuario(horario_usuario_id, horario_username, horario_nombre, horario_tipo_usuario)
+        datos.append({
+            'id': id_,
+            'usuario': usuario,
+            'fecha': fecha.isoformat(),
+            'horario': {
+                'id': horario_id,
+                'usuario': horario_usuario,
+                'dia_semana': dia_semana,
+                'dia_semana_display': _DIAS.get(dia_semana, dia_semana),
+                'jornada': jornada,
+                'jornada_display': _JORNADAS.get(jornada, jornada),
+                'sede': sede,
+                'sede_display': _SEDES.get(sede, sede),
+            },
+            'presente': presente,
+            'estado_autorizacion': estado,
+            'estado_autorizacion_display': _ESTADOS_AUTORIZACION.get(estado, estado),
+            # DecimalField de DRF: cuantizado a 2 decimales y como texto
+            'horas': '{:f}'.format(Decimal(horas).quantize(_CENTESIMAS)),
+        })
+    return datos
+
+
+def fila_de_asistencia(asistencia):
+    """
+    Tupla con las columnas de filas_asistencias() para una instancia (guardada
+    o virtual) con `usuario` y `horario.usuario` ya cargados.
+    """
+    usuario = asistencia.usuario
+    horario = asistencia.horario
+    return (
+        asistencia.id, asistencia.fecha, asistencia.presente, asistencia.estado_autorizacion, asistencia.horas,
+        usuario.id, usuario.username, usuario.nombre, usuario.tipo_usuario,
+        horario.id, horario.dia_semana, horario.jornada, horario.sede,
+        horario.usuario.id, horario.usuario.username, horario.usuario.nombre, horario.usuario.tipo_usuario,
+    )
+
+
+class Incluidos:
+    """
+    Bloque `included` de una respuesta normalizada: cada usuario, horario (y
+    asistencia, en los ajustes) referenciado por las filas aparece una sola vez.
+    """
+
+    def __init__(self, asistencias=False):
+        self.usuarios = {}
+        self.horarios = {}
+        self.asistencias = {} if asistencias else None
+
+    def usuario(self, id_, username, nombre, tipo_usuario):
+        if id_ not in self.usuarios:
+            self.usuarios[id_] = _usuario(id_, username, nombre, tipo_usuario)
+        return id_
+
+    def horario(self, id_, usuario_id, dia_semana, jornada, sede):
+        if id_ not in self.horarios:
+            self.horarios[id_] = {
+                'id': id_,
+                'usuario_id': usuario_id,
+                'dia_semana': dia_semana,
+                'dia_semana_display': _DIAS.get(dia_semana, dia_semana),
+                'jornada': jornada,
+                'jornada_display': _JORNADAS.get(jornada, jornada),
+                'sede': sede,
+                'sede_display': _SEDES.get(sede, sede),
+            }
+        return id_
+
+    def datos(self):
+        datos = {
+            'usuarios': list(self.usuarios.values()),
+            'horarios': list(self.horarios.values()),
+        }
+        if self.asistencias is not None:
+            datos['asistencias'] = list(self.asistencias.values())
+        return datos
+
+
+def serializar_asistencias_normalizadas(filas, incluidos):
+    """
+    Como serializar_asistencias(), pero cada fila referencia `usuario_id` y
+    `horario_id`; los objetos se agregan una vez a `incluidos`.
+    """
+    datos = []
+    for (id_, fecha, presente, estado, horas,
+         usuario_id, username, nombre, tipo_usuario,
+         horario_id, dia_semana, jornada, sede,
+         horario_usuario_id, horario_username, horario_nombre, horario_tipo_usuario,
+         *_) in filas:
+        incluidos.usuario(usuario_id, username, nombre, tipo_usuario)
+        incluidos.usuario(horario_usuario_id, horario_username, horario_nombre, horario_tipo_usuario)
+        incluidos.horario(horario_id, horario_usuario_id, dia_semana, jornada, sede)
+        datos.append({
+            'id': id_,
+            'usuario_id': usuario_id,
+            'fecha': fecha.isoformat(),
+            'horario_id': horario_id,
+            'presente': presente,
+            'estado_autorizacion': estado,
+            'estado_autorizacion_display': _ESTADOS_AUTORIZACION.get(estado, estado),
+            'horas': '{:f}'.format(Decimal(horas).quantize(_CENTESIMAS)),
+        })
+    return datos
+
 class AsistenciaCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Asistencia
         fields = ['fecha', 'horario', 'presente']
 
 
+class AsistenciaLoteSerializer(serializers.Serializer):
+    """
+    Serializer para autorizar, rechazar o recuperar varias asistencias en una
+    sola petición: por lista de ids o por filtro (fecha y opcionalmente sede,
+    jornada y estado actual).
+    """
+    accion = serializers.ChoiceField(choices=['autorizar', 'rechazar', 'recuperar'])
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        min_length=1,
+        max_length=1000  # Máximo 1000 asistencias por petición
+    )
+    fecha = serializers.DateField(required=False)
+    sede = serializers.ChoiceField(choices=HorarioFijo.SEDES, required=False)
+    jornada = serializers.ChoiceField(choices=HorarioFijo.JORNADAS, required=False)
+    estado = serializers.ChoiceField(choices=Asistencia.ESTADOS_AUTORIZACION, required=False)
+
+    def validate(self, data):
+        """Exactamente uno de los dos modos: ids o filtro por fecha"""
+        filtros = [campo for campo in ('fecha', 'sede', 'jornada', 'estado') if campo in data]
+        if 'ids' in data and filtros:
+            raise serializers.ValidationError("Envía 'ids' o un filtro por fecha, no ambos.")
+        if 'ids' not in data and 'fecha' not in data:
+            raise serializers.ValidationError("Se requiere 'ids' o 'fecha'.")
+        return data
+
+
 class AjusteHorasSerializer(serializers.ModelSerializer):
     usuario = UsuarioSerializer(read_only=True)
     creado_por = UsuarioSerializer(read_only=True)
     asistencia = AsistenciaSerializer(read_only=True)
-    
+
+    RELACIONES = ('usuario', 'creado_por', 'asistencia')
+
     class Meta:
         model = AjusteHoras
         fields = [
-            'id', 'usuario', 'fecha', 'cantidad_horas', 'motivo', 
+            'id', 'usuario', 'fecha', 'cantidad_horas', 'motivo',
             'asistencia', 'creado_por', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+    def __init__(self, *args, campos=None, expandir=None, **kwargs):
+        """
+        campos: si se indica, solo se serializan esos campos.
+        expandir: si se indica, las relaciones que no estén en la lista se
+        serializan como su id en lugar del objeto anidado.
+        """
+        super().__init__(*args, **kwargs)
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+        if expandir is not None:
+            for relacion in self.RELACIONES:
+                if relacion in self.fields and relacion not in expandir:
+                    self.fields[relacion] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    @classmethod
+    def relaciones_select_related(cls, campos=None, expandir=None):
+        """Argumentos de select_related() para las relaciones que se serializarán completas."""
+        rutas = {
+            'usuario': ['usuario'],
+            'creado_por': ['creado_por'],
+            'asistencia': ['asistencia__usuario', 'asistencia__horario__usuario'],
+        }
+        return [
+            ruta
+            for relacion in cls.RELACIONES
+            if (campos is None or relacion in campos) and (expandir is None or relacion in expandir)
+            for ruta in rutas[relacion]
+        ]
+
+
+
+def serializar_ajustes_normalizados(ajustes, incluidos, campos=None):
+    """
+    Ajustes con `usuario_id`, `creado_por_id` y `asistencia_id` en lugar de los
+    objetos anidados; usuarios y asistencias (con sus horarios) se cargan en
+    dos consultas y se agregan una vez a `incluidos` (creado con asistencias=True).
+    """
+    datos = [
+        {(f'{clave}_id' if clave in AjusteHorasSerializer.RELACIONES else clave): valor for clave, valor in ajuste.items()}
+        for ajuste in AjusteHorasSerializer(ajustes, many=True, campos=campos, expandir=[]).data
+    ]
+
+    asistencia_ids = {ajuste['asistencia_id'] for ajuste in datos if ajuste.get('asistencia_id')}
+    if asistencia_ids:
+        filas = filas_asistencias(Asistencia.objects.filter(id__in=asistencia_ids).order_by('id'))
+        for asistencia in serializar_asistencias_normalizadas(filas, incluidos):
+            incluidos.asistencias[asistencia['id']] = asistencia
+
+    usuario_ids = {
+        ajuste[clave] for ajuste in datos for clave in ('usuario_id', 'creado_por_id') if ajuste.get(clave)
+    } - set(incluidos.usuarios)
+    if usuario_ids:
+        usuarios = UsuarioPersonalizado.objects.filter(id__in=usuario_ids).order_by('id')
+        for usuario in usuarios.values_list('id', 'username', 'nombre', 'tipo_usuario'):
+            incluidos.usuario(*usuario)
+    return datos
+
 
 class AjusteHorasCreateSerializer(serializers.ModelSerializer):
     monitor_id = serializers.IntegerField(write_only=True, help_text="ID del monitor al que se le ajustan las horas")
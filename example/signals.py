@@ -0,0 +1,73 @@
+"""
+Señales que mantienen al día el resumen diario de horas, el registro de
+configuraciones, la caché de usuarios autenticados y las versiones de
+cambios por tabla.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import UsuarioPersonalizado, Asistencia, AjusteHoras, HorarioFijo, ConfiguracionSistema
+from .authentication import cache_usuarios, versiones_token
+from .configuracion import registro as registro_configuracion
+from .resumen import programar_recalculo
+from . import versiones
+
+
+@receiver(post_save, sender=Asistencia)
+@receiver(post_save, sender=AjusteHoras)
+@receiver(post_delete, sender=Asistencia)
+@receiver(post_delete, sender=AjusteHoras)
+def actualizar_resumen_dia(sender, instance, **kwargs):
+    # Si se cambió el usuario o la fecha, también hay que recalcular el día anterior
+    pares = [
+        (instance.usuario_id, instance.fecha),
+        (instance.valor_cargado('usuario_id'), instance.valor_cargado('fecha')),
+    ]
+    programar_recalculo(pares)
+
+
+@receiver(post_save, sender=HorarioFijo)
+def actualizar_resumen_horario(sender, instance, created, **kwargs):
+    # Las asistencias se agrupan por la sede y jornada del horario
+    if not created and instance.campos_modificados(('sede', 'jornada')):
+        pares = instance.asistencias.values_list('usuario_id', 'fecha')
+        programar_recalculo(pares)
+
+
+@receiver(post_save, sender=ConfiguracionSistema)
+@receiver(post_delete, sender=ConfiguracionSistema)
+def invalidar_registro_configuracion(sender, instance, **kwargs):
+    registro_configuracion.invalidar()
+
+
+@receiver(post_save, sender=UsuarioPersonalizado)
+def actualizar_cache_usuario(sender, instance, **kwargs):
+    cache_usuarios.invalidar(instance.pk)
+    versiones_token.actualizar(instance)
+
+
+@receiver(post_delete, sender=UsuarioPersonalizado)
+def eliminar_cache_usuario(sender, instance, **kwargs):
+    cache_usuarios.invalidar(instance.pk)
+    versiones_token.eliminar(instance.pk)
+
+
+@receiver(post_save, sender=HorarioFijo)
+@receiver(post_save, sender=Asistencia)
+@receiver(post_save, sender=AjusteHoras)
+@receiver(post_save, sender=ConfiguracionSistema)
+@receiver(post_delete, sender=UsuarioPersonalizado)
+@receiver(post_delete, sender=HorarioFijo)
+@receiver(post_delete, sender=Asistencia)
+@receiver(post_delete, sender=AjusteHoras)
+@receiver(post_delete, sender=ConfiguracionSistema)
+def incrementar_version(sender, **kwargs):
+    # Se acumula por transacción: una eliminación en cascada incrementa cada tabla una sola vez
+    versiones.incrementar(sender)
+
+
+@receiver(post_save, sender=UsuarioPersonalizado)
+def incrementar_version_usuario(sender, instance, created, **kwargs):
+    # Login, contraseña o revocación de tokens no cambian lo que muestran las respuestas
+    if created or instance.campos_modificados(UsuarioPersonalizado.CAMPOS_VISIBLES):
+        versiones.incrementar(sender)
@@ -0,0 +1,785 @@
+import base64
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from . import urls, views
+from .authentication import generar_token, versiones_token
+from .cache_respuestas import cache_respuestas
+from .concurrencia import _ejecutar
+from .configuracion import registro as registro_configuracion
+from .management.commands.verificar_arranque import CODIGO_ARRANQUE, _arrancar, _costos_por_modulo
+from .management.commands.verificar_planes_consulta import (
+    ENDPOINTS, TABLAS_GRANDES, Command as VerificarPlanesConsulta, capturar_consultas
+)
+from .models import (
+    UsuarioPersonalizado, HorarioFijo, Asistencia, AjusteHoras, ConfiguracionSistema, ResumenHorasDiario, HORAS_POR_JORNADA
+)
+from .resumen import recalcular_resumen
+from .serializers import AsistenciaSerializer, filas_asistencias, serializar_asistencias, fila_de_asistencia
+
+
+def _crear_datos():
+    """Un directivo y dos monitores con horarios, asistencias en todos los estados y ajustes."""
+    directivo = UsuarioPersonalizado.objects.create(
+        username='directivo', nombre='Directiva Pérez', password='clave123', tipo_usuario='DIRECTIVO'
+    )
+    monitores = [
+        UsuarioPersonalizado.objects.create(username=f'monitor{i}', nombre=f'Monitor Ñandú {i}', password='clave123')
+        for i in range(2)
+    ]
+    estados = [estado for estado, _ in Asistencia.ESTADOS_AUTORIZACION]
+    lunes = date.today() - timedelta(days=date.today().weekday() + 14)
+    for i, monitor in enumerate(monitores):
+        for dia, jornada, sede in [(0, 'M', 'SA'), (0, 'T', 'BA'), (2, 'M', 'BA')]:
+            horario = HorarioFijo.objects.create(usuario=monitor, dia_semana=dia, jornada=jornada, sede=sede)
+            for semana in range(2):
+                estado = estados[(semana + dia + i) % len(estados)]
+                Asistencia.objects.create(
+                    usuario=monitor,
+                    fecha=lunes + timedelta(days=dia + 7 * semana),
+                    horario=horario,
+                    presente=semana == 0,
+                    estado_autorizacion=estado,
+                    horas=Decimal('4.00') if semana == 0 and estado in ('autorizado', 'recuperado') else Decimal('0')
+                )
+        AjusteHoras.objects.create(
+            usuario=monitor, fecha=lunes, cantidad_horas=Decimal('1.50'), motivo='Ajuste de prueba', creado_por=directivo
+        )
+    # Asistencia cuyo horario es de otro usuario: el serializador anida dos usuarios distintos
+    Asistencia.objects.create(
+        usuario=monitores[0], fecha=lunes + timedelta(days=2), horario=HorarioFijo.objects.filter(usuario=monitores[1]).last(),
+        presente=True, estado_autorizacion='autorizado', horas=Decimal('4.00')
+    )
+    return directivo, monitores
+
+
+class SerializacionAsistenciasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        _crear_datos()
+
+    def test_mismo_json_que_asistencia_serializer(self):
+        asistencias_qs = Asistencia.objects.order_by('id')
+        instancias = list(asistencias_qs.select_related('usuario', 'horario__usuario'))
+        renderer = JSONRenderer()
+
+        esperado = renderer.render(AsistenciaSerializer(instancias, many=True).data)
+        self.assertEqual(renderer.render(serializar_asistencias(filas_asistencias(asistencias_qs))), esperado)
+
+    def test_asistencia_virtual(self):
+        horario = HorarioFijo.objects.select_related('usuario').first()
+        virtual = Asistencia(
+            usuario=horario.usuario, fecha=date.today(), horario=horario,
+            presente=False, estado_autorizacion='pendiente', horas=0
+        )
+        renderer = JSONRenderer()
+
+        self.assertEqual(
+            renderer.render(serializar_asistencias([fila_de_asistencia(virtual)])),
+            renderer.render(AsistenciaSerializer([virtual], many=True).data)
+        )
+
+
+def _recorridos_completos(sql, params):
+    """Tablas que el plan de `sql` recorre completas, sin índice."""
+    if connection.vendor == 'postgresql':
+        # Con enable_seqscan desactivado, un Seq Scan restante indica que no hay índice utilizable
+        return VerificarPlanesConsulta()._seq_scans(sql, params, forzar_indices=True)
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        detalles = [fila[-1] for fila in cursor.fetchall()]
+    # "SCAN tabla" (o "SCAN TABLE tabla" en versiones anteriores) sin "USING ... INDEX"
+    return [
+        detalle.replace('SCAN TABLE ', 'SCAN ').split()[1]
+        for detalle in detalles
+        if detalle.startswith('SCAN ') and 'INDEX' not in detalle
+    ]
+
+
+@skipUnless(connection.vendor in ('postgresql', 'sqlite'), "Requiere PostgreSQL o SQLite para leer el plan")
+class PlanesConsultaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.directivo, monitores = _crear_datos()
+        cls.monitor = monitores[0]
+
+    def test_endpoints_usan_indices_en_tablas_grandes(self):
+        tokens = {'DIRECTIVO': generar_token(self.directivo), 'MONITOR': generar_token(self.monitor)}
+        cliente = Client(SERVER_NAME='127.0.0.1')
+
+        for nombre, kwargs, query, rol in ENDPOINTS:
+            kwargs = {clave: valor.format(monitor_id=self.monitor.id) for clave, valor in kwargs.items()}
+            url = reverse(nombre, kwargs=kwargs)
+            if query:
+                url = f"{url}?{query.format(monitor_id=self.monitor.id)}"
+
+            with self.subTest(url=url):
+                consultas = []
+                with capturar_consultas(consultas):
+                    respuesta = cliente.get(url, HTTP_AUTHORIZATION=f"Bearer {tokens[rol]}")
+                self.assertEqual(respuesta.status_code, 200)
+
+                recorridos = [
+                    tabla
+                    for sql, params in consultas
+                    for tabla in _recorridos_completos(sql, params)
+                    if tabla in TABLAS_GRANDES
+                ]
+                self.assertEqual(recorridos, [])
+
+
+class ConsultasConcurrentesTests(TransactionTestCase):
+    # Sin la transacción de TestCase: dentro de una, consultar_en_paralelo ejecuta todo en orden
+
+    def setUp(self):
+        self.directivo, monitores = _crear_datos()
+        self.monitor = monitores[0]
+
+    def test_reportes_iguales_en_paralelo_y_en_orden(self):
+        cliente = Client(SERVER_NAME='127.0.0.1')
+        token = generar_token(self.directivo)
+        urls = [
+            reverse('directivo_reporte_horas_monitor', kwargs={'monitor_id': self.monitor.id}),
+            reverse('directivo_reporte_horas_todos'),
+            reverse('directivo_finanzas_monitor_individual', kwargs={'monitor_id': self.monitor.id}),
+            reverse('directivo_finanzas_comparativa_semanas'),
+        ]
+
+        for url in urls:
+            with self.subTest(url=url):
+                respuestas = {}
+                for concurrentes in (False, True):
+                    cache_respuestas.invalidar()
+                    with override_settings(CONSULTAS_CONCURRENTES=concurrentes), \
+                            mock.patch('example.concurrencia._ejecutar', wraps=_ejecutar) as ejecutar:
+                        respuesta = cliente.get(url, HTTP_AUTHORIZATION=f"Bearer {token}")
+                    self.assertEqual(respuesta.status_code, 200)
+                    self.assertEqual(ejecutar.called, concurrentes)
+                    respuestas[concurrentes] = respuesta.content
+                self.assertEqual(respuestas[True], respuestas[False])
+
+
+class SemanasSemestreTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.directivo, monitores = _crear_datos()
+        cls.monitor = monitores[0]
+
+    def setUp(self):
+        cache_respuestas.invalidar()
+
+    def test_semanas_semestre_cero_responde_400(self):
+        ConfiguracionSistema.objects.create(
+            clave='semanas_semestre', valor='0', tipo_dato='entero', creado_por=self.directivo
+        )
+        # El rollback del TestCase no pasa por las señales que invalidan el registro
+        self.addCleanup(registro_configuracion.invalidar)
+        cliente = Client(SERVER_NAME='127.0.0.1')
+        token = generar_token(self.directivo)
+        urls_finanzas = [
+            reverse('directivo_finanzas_monitor_individual', kwargs={'monitor_id': self.monitor.id}),
+            reverse('directivo_finanzas_todos_monitores'),
+            reverse('directivo_finanzas_resumen_ejecutivo'),
+            reverse('directivo_finanzas_comparativa_semanas'),
+        ]
+
+        for url in urls_finanzas:
+            with self.subTest(url=url):
+                respuesta = cliente.get(url, {'semanas_trabajadas': 0}, HTTP_AUTHORIZATION=f"Bearer {token}")
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertEqual(respuesta.json()['detail'], views.ERROR_SEMANAS_SEMESTRE)
+
+
+def _cursor(valor):
+    """Cursor con cualquier contenido JSON, codificado como los de paginacion.py."""
+    return base64.urlsafe_b64encode(json.dumps(valor).encode()).decode().rstrip('=')
+
+
+class PaginacionCursorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.directivo, _ = _crear_datos()
+
+    def setUp(self):
+        self.cliente = Client(SERVER_NAME='127.0.0.1', HTTP_AUTHORIZATION=f"Bearer {generar_token(self.directivo)}")
+        self.url = reverse('directivo_horarios_monitores')
+
+    def test_paginas_recorren_el_listado_completo_sin_repetir(self):
+        completo = [horario['id'] for horario in self.cliente.get(self.url).json()['horarios']]
+
+        paginados, parametros, paginas = [], {'limite': 4}, 0
+        while True:
+            respuesta = self.cliente.get(self.url, parametros)
+            self.assertEqual(respuesta.status_code, 200)
+            datos = respuesta.json()
+            self.assertLessEqual(len(datos['horarios']), 4)
+            paginados += [horario['id'] for horario in datos['horarios']]
+            paginas += 1
+            if not datos['paginacion']['hay_mas']:
+                self.assertIsNone(datos['paginacion']['siguiente_cursor'])
+                break
+            parametros = {'limite': 4, 'cursor': datos['paginacion']['siguiente_cursor']}
+
+        self.assertEqual(paginados, completo)
+        self.assertEqual(paginas, 2)
+
+    def test_recuperables_intercala_virtuales_en_las_paginas(self):
+        # Horarios vigentes desde hace tres semanas: días sin asistencia que salen como virtuales
+        HorarioFijo.objects.update(vigente_desde=date.today() - timedelta(weeks=3))
+        url = reverse('directivo_asistencias_recuperables')
+        completo = self.cliente.get(url).json()['asistencias']
+        self.assertTrue(any(item['virtual'] for item in completo))
+        self.assertTrue(any(not item['virtual'] for item in completo))
+
+        paginados, parametros = [], {'limite': 3}
+        while True:
+            datos = self.cliente.get(url, parametros).json()
+            paginados += datos['asistencias']
+            if not datos['paginacion']['hay_mas']:
+                break
+            parametros = {'limite': 3, 'cursor': datos['paginacion']['siguiente_cursor']}
+
+        self.assertEqual(paginados, completo)
+
+    def test_cursor_o_limite_invalido_responde_400(self):
+        invalidos = {
+            'no es base64': {'cursor': '%%%'},
+            'no es una lista': {'cursor': _cursor({'a': 1})},
+            'columnas de menos': {'cursor': _cursor(['Ana', 0])},
+            'tipo de columna': {'cursor': _cursor(['Ana', 'lunes', 'M', 1])},
+            'valor nulo': {'cursor': _cursor(['Ana', 0, 'M', None])},
+            'limite no numérico': {'limite': 'diez'},
+            'limite fuera de rango': {'limite': 0},
+        }
+        for caso, parametros in invalidos.items():
+            with self.subTest(caso=caso):
+                respuesta = self.cliente.get(self.url, parametros)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn('detail', respuesta.json())
+
+
+def _horas_desde_filas(usuario, fecha_inicio, fecha_fin, sede=None, jornada=None):
+    """Los totales de with_horas() agregados directamente de asistencias y ajustes."""
+    asistencias = Asistencia.objects.filter(usuario=usuario, fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+    if sede:
+        asistencias = asistencias.filter(horario__sede=sede)
+    if jornada:
+        asistencias = asistencias.filter(horario__jornada=jornada)
+    de_asistencias = asistencias.aggregate(
+        horas_asistencias=Coalesce(Sum('horas'), Decimal('0')),
+        total_asistencias=Count('id'),
+        asistencias_presentes=Count('id', filter=Q(presente=True)),
+        asistencias_autorizadas=Count('id', filter=Q(estado_autorizacion='autorizado')),
+    )
+    de_ajustes = AjusteHoras.objects.filter(usuario=usuario, fecha__gte=fecha_inicio, fecha__lte=fecha_fin).aggregate(
+        horas_ajustes=Coalesce(Sum('cantidad_horas'), Decimal('0')),
+        total_ajustes=Count('id'),
+    )
+    return {
+        **de_asistencias, **de_ajustes,
+        'horas_totales': de_asistencias['horas_asistencias'] + de_ajustes['horas_ajustes'],
+    }
+
+
+class ResumenHorasTests(TestCase):
+    # El resumen se recalcula al confirmar la transacción: en un TestCase eso se
+    # simula con captureOnCommitCallbacks(execute=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.directivo, cls.monitores = _crear_datos()
+        cls.fecha_inicio = date.today() - timedelta(weeks=4)
+        cls.fecha_fin = date.today()
+
+    def assertResumenIgualAFilas(self):
+        for sede, jornada in [(None, None), ('SA', None), ('BA', 'M'), (None, 'T')]:
+            monitores = UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR').with_horas(
+                self.fecha_inicio, self.fecha_fin, sede, jornada
+            )
+            for monitor in monitores:
+                with self.subTest(monitor=monitor.username, sede=sede, jornada=jornada):
+                    esperado = _horas_desde_filas(monitor, self.fecha_inicio, self.fecha_fin, sede, jornada)
+                    self.assertEqual({campo: getattr(monitor, campo) for campo in esperado}, esperado)
+
+    def test_resumen_igual_a_las_filas(self):
+        self.assertTrue(ResumenHorasDiario.objects.exists())
+        self.assertResumenIgualAFilas()
+
+    def test_escrituras_recalculan_el_resumen_al_confirmar(self):
+        monitor = self.monitores[0]
+        asistencia = Asistencia.objects.filter(usuario=monitor, horas__gt=0).first()
+        horario_tarde = HorarioFijo.objects.get(usuario=monitor, jornada='T')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            # Cambio de fecha: se recalculan el día nuevo y el anterior
+            asistencia.fecha -= timedelta(days=1)
+            asistencia.save()
+            AjusteHoras.objects.filter(usuario=monitor).delete()
+            AjusteHoras.objects.create(
+                usuario=self.monitores[1], fecha=date.today(), cantidad_horas=Decimal('-2.25'),
+                motivo='Descuento', creado_por=self.directivo
+            )
+        self.assertResumenIgualAFilas()
+
+        # Cambio de sede del horario: sus asistencias se reagrupan
+        with self.captureOnCommitCallbacks(execute=True):
+            horario_tarde.sede = 'SA'
+            horario_tarde.save()
+        self.assertResumenIgualAFilas()
+
+    def test_savepoint_revertido_no_se_recalcula(self):
+        asistencias = Asistencia.objects.filter(usuario=self.monitores[0])
+        confirmada = asistencias.earliest('fecha', 'id')
+        revertida = asistencias.exclude(fecha=confirmada.fecha).earliest('fecha', 'id')
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            confirmada.horas = Decimal('2.00')
+            confirmada.save()
+            try:
+                with transaction.atomic():
+                    revertida.horas = Decimal('3.00')
+                    revertida.save()
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+
+        pares = set().union(*(
+            callback.elementos for callback in callbacks if getattr(callback, 'aplicar', None) is recalcular_resumen
+        ))
+        self.assertEqual(pares, {(self.monitores[0].id, confirmada.fecha)})
+        self.assertResumenIgualAFilas()
+
+
+class GetCondicionalTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.directivo, cls.monitores = _crear_datos()
+
+    def setUp(self):
+        self.cliente = Client(SERVER_NAME='127.0.0.1', HTTP_AUTHORIZATION=f"Bearer {generar_token(self.directivo)}")
+        self.asistencia = Asistencia.objects.filter(estado_autorizacion='pendiente').earliest('fecha', 'id')
+        self.url = reverse('directivo_asistencias')
+        self.parametros = {'fecha': self.asistencia.fecha.isoformat()}
+
+    def _etag(self):
+        respuesta = self.cliente.get(self.url, self.parametros)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta['ETag']
+
+    def test_304_mientras_no_cambien_las_tablas(self):
+        etag = self._etag()
+        respuesta = self.cliente.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta['ETag'], etag)
+        self.assertEqual(respuesta.content, b'')
+
+        # Otra URL (otros parámetros) tiene su propio ETag
+        respuesta = self.cliente.get(self.url, {**self.parametros, 'jornada': 'M'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+
+        # Una tabla de la que no depende el endpoint no lo invalida
+        with self.captureOnCommitCallbacks(execute=True):
+            AjusteHoras.objects.create(
+                usuario=self.monitores[0], fecha=date.today(), cantidad_horas=Decimal('1.00'),
+                motivo='Ajuste de prueba', creado_por=self.directivo
+            )
+        respuesta = self.cliente.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_escritura_incrementa_la_version_y_cambia_el_etag(self):
+        etag = self._etag()
+        url_autorizar = reverse('directivo_autorizar_asistencia', kwargs={'pk': self.asistencia.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.cliente.post(url_autorizar).status_code, 200)
+
+        respuesta = self.cliente.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+        estados = {item['id']: item['estado_autorizacion'] for item in respuesta.json()}
+        self.assertEqual(estados[self.asistencia.id], 'autorizado')
+
+    def test_escritura_revertida_no_cambia_el_etag(self):
+        etag = self._etag()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.asistencia.save()
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+        self.assertEqual(callbacks, [])
+        respuesta = self.cliente.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+
+
+class CacheRespuestasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.directivo, cls.monitores = _crear_datos()
+
+    def setUp(self):
+        # La caché es del proceso y las versiones vuelven atrás con el rollback de cada test
+        cache_respuestas.invalidar()
+        self.addCleanup(cache_respuestas.invalidar)
+        self.cliente = Client(SERVER_NAME='127.0.0.1', HTTP_AUTHORIZATION=f"Bearer {generar_token(self.directivo)}")
+        self.url = reverse('directivo_total_horas_horarios')
+
+    def _get(self, cache, **parametros):
+        respuesta = self.cliente.get(self.url, parametros)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['X-Cache'], cache)
+        return respuesta.json()
+
+    def _crear_horario(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            HorarioFijo.objects.create(usuario=self.monitores[0], dia_semana=4, jornada='T', sede='SA')
+
+    def test_hit_hasta_que_cambia_una_tabla(self):
+        antes = self._get('MISS')
+        self.assertEqual(self._get('HIT'), antes)
+        # Otros parámetros son otra entrada
+        self._get('MISS', sede='SA')
+
+        self._crear_horario()
+        despues = self._get('MISS')
+        self.assertEqual(
+            despues['estadisticas_generales']['total_horarios'], antes['estadisticas_generales']['total_horarios'] + 1
+        )
+        self.assertEqual(self._get('HIT'), despues)
+
+    def test_cambio_de_configuracion_invalida(self):
+        self.addCleanup(registro_configuracion.invalidar)
+        self.assertEqual(self._get('MISS')['configuracion']['total_semanas_semestre'], 14)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.cliente.post(
+                reverse('directivo_configuraciones_crear'),
+                {'clave': 'semanas_semestre', 'valor': '16', 'tipo_dato': 'entero', 'descripcion': 'Semanas del semestre'},
+                content_type='application/json'
+            )
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(self._get('MISS')['configuracion']['total_semanas_semestre'], 16)
+
+    def test_escritura_revertida_no_invalida(self):
+        self._get('MISS')
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    HorarioFijo.objects.create(usuario=self.monitores[0], dia_semana=4, jornada='T', sede='SA')
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+        self._get('HIT')
+
+    def test_copia_desactualizada_mientras_otra_peticion_recalcula(self):
+        antes = self._get('MISS')
+        clave, = cache_respuestas._entradas
+        self._crear_horario()
+
+        calculo = cache_respuestas._lock_calculo(clave)
+        calculo.acquire()
+        try:
+            self.assertEqual(self._get('STALE'), antes)
+        finally:
+            calculo.release()
+        self.assertNotEqual(self._get('MISS'), antes)
+
+
+class AsistenciasLoteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.directivo, cls.monitores = _crear_datos()
+
+    def setUp(self):
+        self.cliente = Client(SERVER_NAME='127.0.0.1', HTTP_AUTHORIZATION=f"Bearer {generar_token(self.directivo)}")
+        self.url = reverse('directivo_asistencias_lote')
+
+    def _lote(self, **datos):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.cliente.post(self.url, datos, content_type='application/json')
+
+    def test_por_ids_en_el_orden_pedido(self):
+        asistencias = list(Asistencia.objects.order_by('id'))
+        ids = [asistencias[2].id, 999999, asistencias[0].id, asistencias[2].id, asistencias[1].id]
+
+        respuesta = self._lote(accion='autorizar', ids=ids)
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        self.assertEqual([resultado['id'] for resultado in datos['resultados']], [ids[0], 999999, ids[2], ids[4]])
+        self.assertEqual((datos['total'], datos['actualizadas'], datos['no_encontradas']), (4, 3, 1))
+
+        # Mismas horas que la autorización individual (calcular_horas_asistencia)
+        for asistencia in Asistencia.objects.filter(id__in=ids):
+            with self.subTest(asistencia=asistencia.id):
+                self.assertEqual(asistencia.estado_autorizacion, 'autorizado')
+                self.assertEqual(asistencia.horas, Decimal('4.00') if asistencia.presente else Decimal('0'))
+        # El UPDATE no dispara señales: el resumen se recalcula explícitamente
+        for monitor in UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR').with_horas(
+            date.today() - timedelta(weeks=4), date.today()
+        ):
+            with self.subTest(monitor=monitor.username):
+                esperado = _horas_desde_filas(monitor, date.today() - timedelta(weeks=4), date.today())
+                self.assertEqual(monitor.horas_totales, esperado['horas_totales'])
+
+    def test_recuperar_solo_pendientes_de_fechas_pasadas(self):
+        pendiente = Asistencia.objects.filter(estado_autorizacion='pendiente').first()
+        rechazada = Asistencia.objects.filter(estado_autorizacion='rechazado').first()
+        futura = Asistencia.objects.create(
+            usuario=pendiente.usuario, fecha=date.today() + timedelta(days=7), horario=pendiente.horario
+        )
+
+        datos = self._lote(accion='recuperar', ids=[pendiente.id, rechazada.id, futura.id]).json()
+        resultados = {resultado['id']: resultado['resultado'] for resultado in datos['resultados']}
+        self.assertEqual(resultados, {
+            pendiente.id: 'actualizada', rechazada.id: 'no_aplicable', futura.id: 'no_aplicable'
+        })
+        self.assertEqual(Asistencia.objects.get(id=rechazada.id).estado_autorizacion, 'rechazado')
+        self.assertEqual(Asistencia.objects.get(id=futura.id).estado_autorizacion, 'pendiente')
+
+    def test_por_fecha_materializa_las_virtuales_del_filtro(self):
+        HorarioFijo.objects.update(vigente_desde=date.today() - timedelta(weeks=5))
+        # Un lunes sin asistencias: los horarios de ese día son todos virtuales
+        lunes = date.today() - timedelta(days=date.today().weekday() + 28)
+        self.assertFalse(Asistencia.objects.filter(fecha=lunes).exists())
+
+        datos = self._lote(accion='rechazar', fecha=lunes.isoformat(), sede='SA').json()
+        horarios = HorarioFijo.objects.filter(dia_semana=0, sede='SA')
+        self.assertEqual(len(horarios), 2)
+        self.assertEqual(datos['actualizadas'], 2)
+        self.assertEqual(
+            set(Asistencia.objects.filter(fecha=lunes).values_list('horario_id', 'estado_autorizacion')),
+            {(horario.id, 'rechazado') for horario in horarios}
+        )
+
+    def test_parametros_invalidos_responden_400(self):
+        invalidos = {
+            'sin ids ni fecha': {'accion': 'autorizar'},
+            'ids y fecha': {'accion': 'autorizar', 'ids': [1], 'fecha': date.today().isoformat()},
+            'acción desconocida': {'accion': 'borrar', 'ids': [1]},
+            'lista vacía': {'accion': 'autorizar', 'ids': []},
+        }
+        for caso, datos in invalidos.items():
+            with self.subTest(caso=caso):
+                self.assertEqual(self._lote(**datos).status_code, 400)
+
+
+class RevocacionTokensTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.directivo, cls.monitores = _crear_datos()
+
+    def setUp(self):
+        # versiones_token es del proceso: el rollback de cada test no deshace lo que le aplicaron las señales
+        versiones_token.invalidar()
+        self.addCleanup(versiones_token.invalidar)
+        self.cliente = Client(SERVER_NAME='127.0.0.1')
+        self.url_monitor = reverse('monitor_mis_asistencias')
+        self.url_directivo = reverse('directivo_horarios_monitores')
+
+    def _get(self, url, token):
+        return self.cliente.get(url, HTTP_AUTHORIZATION=f"Bearer {token}").status_code
+
+    def _login(self, username):
+        respuesta = self.cliente.post(
+            reverse('login_usuario'), {'nombre_de_usuario': username, 'password': 'clave123'},
+            content_type='application/json'
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.json()['token']
+
+    def test_revocar_invalida_los_tokens_emitidos(self):
+        monitor = self.monitores[0]
+        token = self._login(monitor.username)
+        token_otro = self._login(self.monitores[1].username)
+        self.assertEqual(self._get(self.url_monitor, token), 200)
+
+        url_revocar = reverse('directivo_revocar_tokens_usuario', kwargs={'usuario_id': monitor.id})
+        respuesta = self.cliente.post(url_revocar, HTTP_AUTHORIZATION=f"Bearer {generar_token(self.directivo)}")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['token_version'], monitor.token_version + 1)
+
+        self.assertEqual(self._get(self.url_monitor, token), 401)
+        self.assertEqual(self._get(self.url_monitor, token_otro), 200)
+        self.assertEqual(self._get(self.url_monitor, self._login(monitor.username)), 200)
+
+    def test_cambio_de_rol_o_desactivacion_revoca(self):
+        token = self._login(self.directivo.username)
+        self.assertEqual(self._get(self.url_directivo, token), 200)
+
+        # El token trae el rol como claim: al cambiarlo deja de valer
+        directivo = UsuarioPersonalizado.objects.get(id=self.directivo.id)
+        directivo.tipo_usuario = 'MONITOR'
+        directivo.save()
+        self.assertEqual(self._get(self.url_directivo, token), 401)
+        self.assertEqual(self._get(self.url_directivo, self._login(directivo.username)), 403)
+
+        token = self._login(self.monitores[0].username)
+        monitor = UsuarioPersonalizado.objects.get(id=self.monitores[0].id)
+        monitor.is_active = False
+        monitor.save()
+        self.assertEqual(self._get(self.url_monitor, token), 401)
+
+    def test_revocacion_desde_otro_proceso_se_ve_al_recargar(self):
+        monitor = self.monitores[0]
+        token = self._login(monitor.username)
+        self.assertEqual(self._get(self.url_monitor, token), 200)
+
+        # Sin señales (p. ej. otro proceso): vale hasta la próxima recarga de versiones_token
+        UsuarioPersonalizado.objects.filter(id=monitor.id).update(token_version=F('token_version') + 1)
+        self.assertEqual(self._get(self.url_monitor, token), 200)
+        with mock.patch.object(versiones_token, 'intervalo', 0):
+            self.assertEqual(self._get(self.url_monitor, token), 401)
+
+
+def _finanzas_en_python(fecha_inicio, fecha_fin, semanas_trabajadas):
+    """Detalle por monitor como lo calculaban las vistas antes de MotorFinanzas: un monitor a la vez."""
+    total_semanas = views.obtener_semanas_semestre()
+    monitores = []
+    for monitor in UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR').order_by('id'):
+        calculo_horas = views.calcular_horas_totales_monitor(monitor.id, fecha_inicio, fecha_fin)
+        costo_actual = views.calcular_costo_total_monitor(monitor.id, fecha_inicio, fecha_fin)
+        proyeccion = views.calcular_costo_proyectado_monitor(monitor.id, semanas_trabajadas, total_semanas)
+        if proyeccion['horas_semanales'] == 0:
+            continue
+        monitores.append({
+            'monitor': {'id': monitor.id, 'username': monitor.username, 'nombre': monitor.nombre},
+            'horarios_semanales': {
+                'horas_por_semana': proyeccion['horas_semanales'],
+                'jornadas_por_semana': proyeccion['horas_semanales'] // HORAS_POR_JORNADA
+            },
+            'finanzas_actuales': {'horas_trabajadas': calculo_horas['horas_totales'], 'costo_total': costo_actual},
+            'proyeccion_semestre': {
+                'semanas_trabajadas': proyeccion['semanas_trabajadas'],
+                'semanas_faltantes': proyeccion['semanas_faltantes'],
+                'costo_total_proyectado': proyeccion['costo_total_proyectado'],
+                'costo_trabajado_proyectado': proyeccion['costo_trabajado_proyectado'],
+                'porcentaje_completado': round((proyeccion['semanas_trabajadas'] / total_semanas) * 100, 2)
+            },
+            'estadisticas': {
+                'total_asistencias': calculo_horas['total_asistencias'],
+                'total_ajustes': calculo_horas['total_ajustes']
+            },
+            '_horas_proyectadas': proyeccion['horas_totales_proyectadas'],
+        })
+    monitores.sort(key=lambda dato: dato['finanzas_actuales']['costo_total'], reverse=True)
+    return monitores
+
+
+class FinanzasVectorizadasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.directivo, monitores = _crear_datos()
+            # Más monitores con horas distintas (y un empate) para el orden y el top 5; uno sin horarios
+            for i, (jornadas, horas_ajuste) in enumerate([(1, '3.50'), (2, '12.25'), (4, '3.50'), (1, '0.75'), (3, '-1.00'), (0, '8.00')]):
+                monitor = UsuarioPersonalizado.objects.create(
+                    username=f'extra{i}', nombre=f'Monitor Extra {i}', password='clave123'
+                )
+                for dia in range(jornadas):
+                    HorarioFijo.objects.create(usuario=monitor, dia_semana=dia, jornada='T', sede='SA')
+                AjusteHoras.objects.create(
+                    usuario=monitor, fecha=date.today() - timedelta(days=3), cantidad_horas=Decimal(horas_ajuste),
+                    motivo='Ajuste de prueba', creado_por=cls.directivo
+                )
+
+    def setUp(self):
+        cache_respuestas.invalidar()
+        self.cliente = Client(SERVER_NAME='127.0.0.1', HTTP_AUTHORIZATION=f"Bearer {generar_token(self.directivo)}")
+        self.fecha_inicio = date.today() - timedelta(days=30)
+        self.fecha_fin = date.today()
+        self.parametros = {
+            'fecha_inicio': self.fecha_inicio.isoformat(), 'fecha_fin': self.fecha_fin.isoformat(), 'semanas_trabajadas': 3
+        }
+        self.esperado = _finanzas_en_python(self.fecha_inicio, self.fecha_fin, 3)
+
+    def test_todos_monitores_igual_al_calculo_por_monitor(self):
+        datos = self.cliente.get(reverse('directivo_finanzas_todos_monitores'), self.parametros).json()
+
+        esperado = [{clave: valor for clave, valor in dato.items() if clave != '_horas_proyectadas'} for dato in self.esperado]
+        self.assertEqual(datos['monitores'], esperado)
+
+        costo_actual = sum(dato['finanzas_actuales']['costo_total'] for dato in self.esperado)
+        costo_proyectado = sum(dato['proyeccion_semestre']['costo_total_proyectado'] for dato in self.esperado)
+        horas_actuales = sum(dato['finanzas_actuales']['horas_trabajadas'] for dato in self.esperado)
+        dias = (self.fecha_fin - self.fecha_inicio).days + 1
+        self.assertEqual(datos['estadisticas_generales'], {
+            'total_monitores': len(self.esperado),
+            'costo_total_actual': round(costo_actual, 2),
+            'costo_total_proyectado': round(costo_proyectado, 2),
+            'costo_promedio_por_monitor': round(costo_actual / len(self.esperado), 2),
+            'horas_totales_actuales': round(horas_actuales, 2),
+            'horas_totales_proyectadas': round(sum(dato['_horas_proyectadas'] for dato in self.esperado), 2),
+            'horas_promedio_por_monitor': round(horas_actuales / len(self.esperado), 2),
+            'costo_por_hora': views.obtener_costo_por_hora(),
+        })
+        self.assertEqual(datos['resumen_financiero'], {
+            'diferencia_proyeccion_vs_actual': round(costo_proyectado - costo_actual, 2),
+            'porcentaje_ejecutado': round(costo_actual / costo_proyectado * 100, 2),
+            'costo_semanal_promedio': round(costo_actual / dias * 7, 2),
+        })
+
+    def test_top_por_costo_igual_al_orden_completo(self):
+        datos = self.cliente.get(reverse('directivo_finanzas_resumen_ejecutivo'), self.parametros).json()
+        self.assertEqual(datos['top_monitores']['por_costo'], [
+            {
+                'monitor': {'id': dato['monitor']['id'], 'nombre': dato['monitor']['nombre'], 'username': dato['monitor']['username']},
+                'costo_actual': dato['finanzas_actuales']['costo_total'],
+                'horas_trabajadas': dato['finanzas_actuales']['horas_trabajadas'],
+            }
+            for dato in self.esperado[:5]
+        ])
+        self.assertEqual(datos['top_monitores']['total_considerados'], len(self.esperado))
+
+
+class ArranqueTests(SimpleTestCase):
+    # Se verifica qué se importa en el arranque y no cuánto tarda: el tiempo depende de la
+    # máquina. El presupuesto en milisegundos queda para verificar_arranque.
+    # -X importtime registra las sentencias import (no importlib.import_module); estos
+    # módulos entrarían por una de ellas si example.urls volviera a importar las vistas.
+    DIFERIDOS = (
+        'example.views', 'example.serializers', 'example.finanzas', 'example.exportacion',
+        'rest_framework.views', 'rest_framework.decorators', 'numpy',
+    )
+
+    def test_arranque_en_frio_no_importa_vistas_ni_numpy(self):
+        codigo = CODIGO_ARRANQUE.format(entrada=settings.WSGI_APPLICATION.rsplit('.', 1)[0], importaciones='')
+        _, lineas = _arrancar(codigo, importtime=True)
+        importados = {modulo for modulo, _, _ in _costos_por_modulo(lineas)}
+
+        self.assertIn('example.authentication', importados)
+        for modulo in self.DIFERIDOS:
+            with self.subTest(modulo=modulo):
+                self.assertNotIn(modulo, importados)
+
+
+class VistasDiferidasTests(SimpleTestCase):
+
+    def test_vistas_existen_en_views(self):
+        for nombre in urls.VISTAS:
+            with self.subTest(vista=nombre):
+                self.assertTrue(callable(getattr(views, nombre, None)))
+
+    def test_nombre_desconocido_falla_al_cargar_urls(self):
+        with self.assertRaises(AttributeError):
+            urls.views.vista_inexistente
@@ -0,0 +1,49 @@
+"""
+Trabajo diferido hasta que se confirma la transacción en curso.
+
+Las señales de cada fila (guardar o eliminar asistencias, ajustes, horarios...)
+solo acumulan lo que hay que recalcular; el trabajo se hace una sola vez por
+transacción al confirmarla (transaction.on_commit), así una eliminación en
+cascada o un lote de escrituras no repite consultas por fila ni mantiene
+bloqueos hasta el commit. Si la transacción se revierte no se hace nada.
+Fuera de una transacción el trabajo se hace de inmediato.
+"""
+from django.db import transaction
+
+
+class _Pendiente:
+
+    def __init__(self, aplicar):
+        self.aplicar = aplicar
+        self.elementos = set()
+        self.aplicado = False
+
+    def __call__(self):
+        self.aplicado = True
+        self.aplicar(self.elementos)
+
+
+def al_confirmar(aplicar, elementos):
+    """
+    Agrega `elementos` al conjunto pendiente de `aplicar` en la transacción en
+    curso; al confirmarla se llama una vez a aplicar(conjunto).
+    """
+    conexion = transaction.get_connection()
+    if not hasattr(conexion, '_pendientes_al_confirmar'):
+        conexion._pendientes_al_confirmar = {}
+    pendiente = conexion._pendientes_al_confirmar.get(aplicar)
+
+    # Se reutiliza el pendiente ya registrado si sigue esperando el commit de esta transacción
+    # y se registró en el mismo savepoint: uno de un nivel exterior sobreviviría al rollback
+    # del savepoint actual y aplicaría elementos que se revirtieron. Uno ya aplicado tampoco
+    # (captureOnCommitCallbacks(execute=True) los ejecuta sin quitarlos de run_on_commit)
+    savepoints = set(conexion.savepoint_ids)
+    if conexion.in_atomic_block and pendiente is not None and not pendiente.aplicado and any(
+        registro[1] is pendiente and registro[0] == savepoints for registro in conexion.run_on_commit
+    ):
+        pendiente.elementos.update(elementos)
+        return
+
+    pendiente = conexion._pendientes_al_confirmar[aplicar] = _Pendiente(aplicar)
+    pendiente.elementos.update(elementos)
+    transaction.on_commit(pendiente)
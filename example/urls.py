@@ -1,5 +1,59 @@
+from importlib import import_module
+
 from django.urls import path
-from . import views
+
+
+def _vista_diferida(nombre):
+    """
+    Vista que importa example.views (DRF, serializers, simplejwt...) recién en
+    la primera petición que la usa, no al cargar las URLs: en un arranque en
+    frío las peticiones que no llegan a una vista (preflight CORS, 404) no
+    pagan esa importación.
+    """
+    def vista(request, *args, **kwargs):
+        return getattr(import_module('example.views'), nombre)(request, *args, **kwargs)
+    vista.__name__ = vista.__qualname__ = nombre
+    vista.__module__ = 'example.views'
+    # Todas las vistas de example.views son de DRF (@api_view), que las exime de CSRF
+    vista.csrf_exempt = True
+    return vista
+
+
+class _VistasDiferidas:
+    """
+    Acceso diferido a las vistas de example.views. Solo se aceptan los nombres
+    de `nombres`: un nombre mal escrito falla al cargar las URLs y no en la
+    primera petición. VistasDiferidasTests verifica que todos existan en example.views.
+    """
+
+    def __init__(self, nombres):
+        self.nombres = frozenset(nombres)
+
+    def __getattr__(self, nombre):
+        if nombre not in self.nombres:
+            raise AttributeError(f"example.urls: '{nombre}' no está en VISTAS")
+        return _vista_diferida(nombre)
+
+
+VISTAS = (
+    'login_usuario', 'registro_usuario', 'obtener_usuario_actual',
+    'horarios_fijos', 'horarios_fijos_multiple', 'horarios_fijos_edit_multiple', 'horario_fijo_detalle',
+    'asistencias', 'asistencia_detalle',
+    'directivo_horarios_monitores', 'directivo_asistencias', 'directivo_asistencias_recuperables',
+    'directivo_asistencias_lote', 'directivo_autorizar_asistencia', 'directivo_rechazar_asistencia',
+    'directivo_recuperar_asistencia',
+    'directivo_reporte_horas_monitor', 'directivo_reporte_horas_todos',
+    'monitor_mis_asistencias', 'monitor_marcar',
+    'directivo_ajustes_horas', 'directivo_ajuste_horas_detalle',
+    'directivo_buscar_monitores', 'directivo_revocar_tokens_usuario',
+    'directivo_finanzas_monitor_individual', 'directivo_finanzas_todos_monitores',
+    'directivo_finanzas_resumen_ejecutivo', 'directivo_finanzas_comparativa_semanas',
+    'directivo_total_horas_horarios',
+    'directivo_configuraciones', 'directivo_configuraciones_crear', 'directivo_configuraciones_inicializar',
+    'directivo_configuraciones_detalle', 'directivo_configuraciones_detalle_por_id',
+)
+
+views = _VistasDiferidas(VISTAS)
 
 urlpatterns = [
     # Autenticación
@@ -21,9 +75,13 @@ urlpatterns = [
     path('directivo/horarios/', views.directivo_horarios_monitores, name='directivo_horarios_monitores'),
     path('directivo/asistencias/', views.directivo_asistencias, name='directivo_asistencias'),
     path('directivo/asistencias/recuperables/', views.directivo_asistencias_recuperables, name='directivo_asistencias_recuperables'),
+    path('directivo/asistencias/lote/', views.directivo_asistencias_lote, name='directivo_asistencias_lote'),
     path('directivo/asistencias/<int:pk>/autorizar/', views.directivo_autorizar_asistencia, name='directivo_autorizar_asistencia'),
     path('directivo/asistencias/<int:pk>/rechazar/', views.directivo_rechazar_asistencia, name='directivo_rechazar_asistencia'),
     path('directivo/asistencias/<int:pk>/recuperar/', views.directivo_recuperar_asistencia, name='directivo_recuperar_asistencia'),
+    path('directivo/asistencias/virtual/<int:horario_id>/<str:fecha>/autorizar/', views.directivo_autorizar_asistencia, name='directivo_autorizar_asistencia_virtual'),
+    path('directivo/asistencias/virtual/<int:horario_id>/<str:fecha>/rechazar/', views.directivo_rechazar_asistencia, name='directivo_rechazar_asistencia_virtual'),
+    path('directivo/asistencias/virtual/<int:horario_id>/<str:fecha>/recuperar/', views.directivo_recuperar_asistencia, name='directivo_recuperar_asistencia_virtual'),
     
     # Reportes
     path('directivo/reportes/horas-monitor/<int:monitor_id>/', views.directivo_reporte_horas_monitor, name='directivo_reporte_horas_monitor'),
@@ -39,6 +97,7 @@ urlpatterns = [
     
     # Búsqueda de Monitores
     path('directivo/buscar-monitores/', views.directivo_buscar_monitores, name='directivo_buscar_monitores'),
+    path('directivo/usuarios/<int:usuario_id>/revocar-tokens/', views.directivo_revocar_tokens_usuario, name='directivo_revocar_tokens_usuario'),
     
     # Finanzas
     path('directivo/finanzas/monitor/<int:monitor_id>/', views.directivo_finanzas_monitor_individual, name='directivo_finanzas_monitor_individual'),
@@ -0,0 +1,105 @@
+"""
+Versiones de cambios por tabla y GET condicional (ETag / If-None-Match).
+
+Cada escritura sobre las tablas de las que dependen los endpoints de consulta
+marca su tabla como modificada (desde las señales); el contador en
+VersionCambios se incrementa una sola vez por tabla y por transacción, al
+confirmarla (transaction.on_commit), así las escrituras no quedan
+serializadas sobre la fila del contador ni una eliminación en cascada hace
+un UPDATE por fila. El ETag de una respuesta se deriva de la URL,
+el Accept, la fecha actual y las versiones de sus tablas, así que se calcula
+con una sola consulta antes de evaluar ningún queryset: si coincide con
+If-None-Match se responde 304 sin ejecutar la vista.
+
+Las operaciones masivas que no disparan señales (QuerySet.update,
+bulk_create) deben llamar a incrementar() con los modelos afectados.
+"""
+import hashlib
+from datetime import date
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import VersionCambios
+from .transacciones import al_confirmar
+
+
+def _incrementar_tabla(tabla):
+    if VersionCambios.objects.filter(tabla=tabla).update(version=F('version') + 1):
+        return
+    try:
+        with transaction.atomic():
+            VersionCambios.objects.create(tabla=tabla, version=1)
+    except IntegrityError:
+        # Otra petición creó el contador al mismo tiempo
+        VersionCambios.objects.filter(tabla=tabla).update(version=F('version') + 1)
+
+
+def _incrementar_tablas(tablas):
+    for tabla in sorted(tablas):
+        _incrementar_tabla(tabla)
+
+
+def incrementar(*modelos):
+    """
+    Marca como modificadas las tablas de `modelos`. Dentro de una transacción
+    se acumulan y se incrementan una vez al confirmarla (nada si se revierte);
+    fuera de una, de inmediato.
+    """
+    al_confirmar(_incrementar_tablas, {modelo._meta.db_table for modelo in modelos})
+
+
+def obtener(*modelos):
+    """Versiones actuales de las tablas de `modelos` (0 si nunca se modificaron)."""
+    tablas = [modelo._meta.db_table for modelo in modelos]
+    versiones = dict(VersionCambios.objects.filter(tabla__in=tablas).values_list('tabla', 'version'))
+    return [(tabla, versiones.get(tabla, 0)) for tabla in tablas]
+
+
+def calcular_etag(request, modelos):
+    # La fecha entra en el ETag porque varios endpoints usan "hoy" como valor por defecto
+    firma = '|'.join([
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        date.today().isoformat(),
+        ','.join(f'{tabla}:{version}' for tabla, version in obtener(*modelos)),
+    ])
+    return '"%s"' % hashlib.sha1(firma.encode()).hexdigest()
+
+
+def _coincide(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return etag in [valor.strip() for valor in if_none_match.split(',')]
+
+
+def con_etag(*modelos):
+    """
+    Decorador para vistas GET cuya respuesta depende solo de las tablas de
+    `modelos`. Va justo encima de la función (debajo de @permission_classes),
+    así el 304 solo se responde a peticiones autenticadas y autorizadas.
+    """
+    # DRF se importa al decorar las vistas y no al cargar este módulo, que las
+    # señales importan durante el arranque
+    from rest_framework import status
+    from rest_framework.response import Response
+
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return vista(request, *args, **kwargs)
+
+            etag = calcular_etag(request, modelos)
+            if _coincide(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+            respuesta = vista(request, *args, **kwargs)
+            if respuesta.status_code == status.HTTP_200_OK:
+                respuesta['ETag'] = etag
+            return respuesta
+        return envoltura
+    return decorador
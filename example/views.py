@@ -1,17 +1,27 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.decorators import api_view, permission_classes, authentication_classes, renderer_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.authentication import BaseAuthentication
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 import jwt
-from django.conf import settings
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from django.contrib.auth import authenticate
-from django.utils import timezone
-from datetime import datetime, date
-from .models import UsuarioPersonalizado, HorarioFijo, Asistencia, AjusteHoras, ConfiguracionSistema
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Count, Sum
+from datetime import datetime, date, timedelta
+from .models import UsuarioPersonalizado, HorarioFijo, Asistencia, AjusteHoras, ConfiguracionSistema, HORAS_POR_JORNADA
+from .generacion import (
+    DIAS_MAXIMOS_FALTANTES, asistencias_del_dia, asistencias_faltantes, obtener_asistencia_de_horario, generar_asistencias
+)
+from .configuracion import registro as registro_configuracion
+from .resumen import programar_recalculo
+from . import versiones
+from .authentication import UsuarioPersonalizadoJWTAuthentication, generar_token
+from .permissions import EsDirectivo
+from .paginacion import (
+    ParametrosPaginacionInvalidos, parametros_paginacion, paginar, paginar_combinado, ordenar_lista, datos_paginacion
+)
+from .exportacion import filas_reporte_horas, monitores_reporte_horas, respuesta_streaming
+from .renderers import NDJSONRenderer, CSVRenderer
 
 def calcular_horas_asistencia(asistencia):
     """
@@ -31,85 +41,44 @@ def calcular_horas_totales_monitor(monitor_id, fecha_inicio, fecha_fin, sede=Non
     Calcula las horas totales de un monitor incluyendo asistencias y ajustes de horas.
     Retorna diccionario con horas_asistencias, horas_ajustes, horas_totales
     """
-    # Horas de asistencias
-    asistencias_qs = Asistencia.objects.filter(
-        usuario_id=monitor_id,
-        fecha__gte=fecha_inicio,
-        fecha__lte=fecha_fin
-    ).select_related('horario')
-    
-    # Aplicar filtros adicionales si se proporcionan
-    if sede:
-        asistencias_qs = asistencias_qs.filter(horario__sede=sede)
-    if jornada:
-        asistencias_qs = asistencias_qs.filter(horario__jornada=jornada)
-    
-    horas_asistencias = sum(float(asistencia.horas) for asistencia in asistencias_qs)
-    
-    # Horas de ajustes
-    ajustes_qs = AjusteHoras.objects.filter(
-        usuario_id=monitor_id,
-        fecha__gte=fecha_inicio,
-        fecha__lte=fecha_fin
-    )
-    
-    horas_ajustes = sum(float(ajuste.cantidad_horas) for ajuste in ajustes_qs)
-    
+    totales = UsuarioPersonalizado.objects.filter(pk=monitor_id).with_horas(
+        fecha_inicio, fecha_fin, sede, jornada
+    ).values('horas_asistencias', 'horas_ajustes', 'horas_totales', 'total_asistencias', 'total_ajustes').first()
+
+    if totales is None:
+        return {
+            'horas_asistencias': 0.0,
+            'horas_ajustes': 0.0,
+            'horas_totales': 0.0,
+            'total_asistencias': 0,
+            'total_ajustes': 0
+        }
+
     return {
-        'horas_asistencias': horas_asistencias,
-        'horas_ajustes': horas_ajustes,
-        'horas_totales': horas_asistencias + horas_ajustes,
-        'total_asistencias': asistencias_qs.count(),
-        'total_ajustes': ajustes_qs.count()
+        'horas_asistencias': float(totales['horas_asistencias']),
+        'horas_ajustes': float(totales['horas_ajustes']),
+        'horas_totales': float(totales['horas_totales']),
+        'total_asistencias': totales['total_asistencias'],
+        'total_ajustes': totales['total_ajustes']
     }
 from .serializers import (
-    LoginSerializer, TokenSerializer, UsuarioSerializer, UsuarioCreateSerializer,
+    LoginSerializer, UsuarioSerializer, UsuarioCreateSerializer,
     HorarioFijoSerializer, HorarioFijoCreateSerializer, HorarioFijoMultipleSerializer, HorarioFijoEditMultipleSerializer,
-    AsistenciaSerializer, AsistenciaCreateSerializer, AjusteHorasSerializer, AjusteHorasCreateSerializer,
-    ConfiguracionSistemaSerializer, ConfiguracionSistemaCreateSerializer
+    AsistenciaSerializer, AsistenciaCreateSerializer, AsistenciaLoteSerializer, AjusteHorasSerializer, AjusteHorasCreateSerializer,
+    ConfiguracionSistemaSerializer, ConfiguracionSistemaCreateSerializer,
+    CAMPOS_ASISTENCIA, filas_asistencias, serializar_asistencias, fila_de_asistencia, Incluidos,
+    serializar_asistencias_normalizadas, serializar_ajustes_normalizados
 )
+from .campos import SeleccionCampos, CamposInvalidos
+from .versiones import con_etag
+from .cache_respuestas import cache_respuesta
+from .autorizacion import aplicar_accion_en_lote
+from .concurrencia import consultar_en_paralelo
 
-# Autenticación personalizada para JWT con nuestro modelo
-class UsuarioPersonalizadoJWTAuthentication(BaseAuthentication):
-    def authenticate(self, request):
-        auth_header = request.META.get('HTTP_AUTHORIZATION')
-        print(f"🔍 AUTH DEBUG - Header: {auth_header}")
-        
-        if not auth_header or not auth_header.startswith('Bearer '):
-            print("❌ AUTH DEBUG - No Bearer token found")
-            return None
-        
-        token = auth_header.split(' ')[1]
-        print(f"🔍 AUTH DEBUG - Token: {token[:50]}...")
-        
-        try:
-            # Decodificar token JWT
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            print(f"🔍 AUTH DEBUG - Payload: {payload}")
-            
-            user_id = payload.get('user_id')
-            print(f"🔍 AUTH DEBUG - User ID: {user_id}")
-            
-            if not user_id:
-                print("❌ AUTH DEBUG - No user_id in payload")
-                return None
-            
-            # Buscar usuario personalizado
-            usuario = UsuarioPersonalizado.objects.get(pk=user_id)
-            print(f"✅ AUTH DEBUG - Usuario encontrado: {usuario.username} (ID: {usuario.id})")
-            
-            return (usuario, token)
-            
-        except jwt.InvalidTokenError as e:
-            print(f"❌ AUTH DEBUG - JWT Error: {e}")
-            return None
-        except UsuarioPersonalizado.DoesNotExist as e:
-            print(f"❌ AUTH DEBUG - Usuario no existe: {e}")
-            return None
-        except Exception as e:
-            print(f"❌ AUTH DEBUG - Error general: {e}")
-            return None
+# Tablas de las que dependen los reportes financieros y de totales (caché de respuestas)
+MODELOS_FINANZAS = (Asistencia, AjusteHoras, HorarioFijo, ConfiguracionSistema, UsuarioPersonalizado)
 
+# Autenticación personalizada para JWT con nuestro modelo
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login_usuario(request):
@@ -138,17 +107,13 @@ def login_usuario(request):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        # Generar token JWT que no expira
-        refresh = RefreshToken.for_user(usuario)
-        access_token = refresh.access_token
-        
-        # Configurar el token para que no expire
-        access_token.set_exp(lifetime=None)
+        # Generar token JWT que no expira, con los datos del usuario como claims
+        access_token = generar_token(usuario)
         
         # Crear respuesta con token y datos del usuario usando el serializer
         usuario_serializer = UsuarioSerializer(usuario)
         response_data = {
-            'token': str(access_token),
+            'token': access_token,
             'usuario': usuario_serializer.data
         }
         
@@ -170,16 +135,14 @@ def registro_usuario(request):
         usuario = serializer.save()
         
         # Generar token JWT automáticamente para el usuario recién creado
-        refresh = RefreshToken.for_user(usuario)
-        access_token = refresh.access_token
-        access_token.set_exp(lifetime=None)
+        access_token = generar_token(usuario)
         
         # Serializar datos del usuario para la respuesta
         usuario_serializer = UsuarioSerializer(usuario)
         
         response_data = {
             'mensaje': 'Usuario registrado exitosamente',
-            'token': str(access_token),
+            'token': access_token,
             'usuario': usuario_serializer.data
         }
         
@@ -291,15 +254,6 @@ def horarios_fijos_multiple(request):
     """
     Crear múltiples horarios fijos en una sola petición
     """
-    print("=== INICIO DE VISTA horarios_fijos_multiple ===")
-    print(f"Método HTTP: {request.method}")
-    print(f"URL: {request.path}")
-    print(f"Headers completos: {dict(request.headers)}")
-    print(f"Headers de autorización: {request.headers.get('Authorization', 'No presente')}")
-    print(f"Content-Type: {request.headers.get('Content-Type', 'No especificado')}")
-    print(f"Body de la petición: {request.body}")
-    print(f"Data de la petición: {request.data}")
-    
     # Verificar autenticación manualmente y obtener usuario desde el token
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
@@ -323,36 +277,47 @@ def horarios_fijos_multiple(request):
     
     if serializer.is_valid():
         horarios_data = serializer.validated_data['horarios']
-        horarios_creados = []
         errores = []
-        
+
+        # Combinaciones (dia_semana, jornada) que el usuario ya tiene, en una sola consulta;
+        # también cuentan como existentes las repetidas dentro de la misma petición
+        ocupadas = set(HorarioFijo.objects.filter(usuario=usuario).values_list('dia_semana', 'jornada'))
+        nuevos = []
+        posiciones = {}  # horario nuevo -> número en la petición, para reportar conflictos
         for i, horario_data in enumerate(horarios_data):
+            horario = HorarioFijo(
+                usuario=usuario,
+                dia_semana=int(horario_data['dia_semana']),
+                jornada=horario_data['jornada'],
+                sede=horario_data['sede']
+            )
+            if (horario.dia_semana, horario.jornada) in ocupadas:
+                errores.append(f"Horario {i+1}: Ya existe un horario para {horario.get_dia_semana_display()} {horario.get_jornada_display()}")
+                continue
+            ocupadas.add((horario.dia_semana, horario.jornada))
+            nuevos.append(horario)
+            posiciones[id(horario)] = i + 1
+
+        # Crear los horarios nuevos en un solo INSERT (bulk_create no dispara señales). Si otra
+        # petición creó alguno después de la consulta, se reportan esos y se reintenta con los
+        # demás; cada reintento descarta al menos uno, así que el ciclo termina
+        while nuevos:
             try:
-                # Verificar si ya existe un horario con la misma combinación
-                horario_existente = HorarioFijo.objects.filter(
-                    usuario=usuario,
-                    dia_semana=horario_data['dia_semana'],
-                    jornada=horario_data['jornada']
-                ).first()
-                
-                if horario_existente:
-                    errores.append(f"Horario {i+1}: Ya existe un horario para {horario_existente.get_dia_semana_display()} {horario_existente.get_jornada_display()}")
-                    continue
-                
-                # Crear el horario fijo
-                horario = HorarioFijo.objects.create(
-                    usuario=usuario,
-                    dia_semana=horario_data['dia_semana'],
-                    jornada=horario_data['jornada'],
-                    sede=horario_data['sede']
-                )
-                
-                # Serializar el horario creado
-                horario_serializado = HorarioFijoSerializer(horario).data
-                horarios_creados.append(horario_serializado)
-                
-            except Exception as e:
-                errores.append(f"Horario {i+1}: Error al crear - {str(e)}")
+                with transaction.atomic():
+                    HorarioFijo.objects.bulk_create(nuevos)
+                break
+            except IntegrityError:
+                ocupadas = set(HorarioFijo.objects.filter(usuario=usuario).values_list('dia_semana', 'jornada'))
+                conflictos = [horario for horario in nuevos if (horario.dia_semana, horario.jornada) in ocupadas]
+                if not conflictos:
+                    raise
+                for horario in conflictos:
+                    errores.append(f"Horario {posiciones[id(horario)]}: Ya existe un horario para {horario.get_dia_semana_display()} {horario.get_jornada_display()}")
+                nuevos = [horario for horario in nuevos if (horario.dia_semana, horario.jornada) not in ocupadas]
+        if nuevos:
+            versiones.incrementar(HorarioFijo)
+
+        horarios_creados = HorarioFijoSerializer(nuevos, many=True).data
         
         # Preparar respuesta
         response_data = {
@@ -372,10 +337,8 @@ def horarios_fijos_multiple(request):
             response_data['mensaje'] += f", {len(errores)} con errores"
             return Response(response_data, status=status.HTTP_207_MULTI_STATUS)
         
-        print(f"✅ Respuesta exitosa: {response_data}")
         return Response(response_data, status=status.HTTP_201_CREATED)
     
-    print(f"❌ Errores de validación: {serializer.errors}")
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['PUT', 'POST'])  # Permitir tanto PUT como POST
@@ -384,17 +347,12 @@ def horarios_fijos_multiple(request):
 def horarios_fijos_edit_multiple(request):
     """
     Editar múltiples horarios fijos en una sola petición
-    Esta funcionalidad reemplaza TODOS los horarios existentes del usuario con los nuevos
-    """
-    print("=== INICIO DE VISTA horarios_fijos_edit_multiple ===")
-    print(f"Método HTTP: {request.method}")
-    print(f"URL: {request.path}")
-    print(f"Headers completos: {dict(request.headers)}")
-    print(f"Headers de autorización: {request.headers.get('Authorization', 'No presente')}")
-    print(f"Content-Type: {request.headers.get('Content-Type', 'No especificado')}")
-    print(f"Body de la petición: {request.body}")
-    print(f"Data de la petición: {request.data}")
-    
+    Los horarios enviados pasan a ser TODOS los horarios del usuario: se crean los nuevos,
+    se actualiza la sede de los existentes y se eliminan los que no se enviaron.
+    Eliminar un horario elimina en cascada todas sus asistencias (también las pasadas
+    ya autorizadas), así que su historial y sus horas dejan de contar en los reportes;
+    los ajustes de horas que las referenciaban se conservan sin asistencia.
+    """
     # Verificar autenticación manualmente y obtener usuario desde el token
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
@@ -418,40 +376,65 @@ def horarios_fijos_edit_multiple(request):
     
     if serializer.is_valid():
         horarios_data = serializer.validated_data['horarios']
-        
-        # Eliminar todos los horarios existentes del usuario
-        horarios_eliminados = HorarioFijo.objects.filter(usuario=usuario).count()
-        HorarioFijo.objects.filter(usuario=usuario).delete()
-        print(f"Eliminados {horarios_eliminados} horarios existentes")
-        
-        # Crear los nuevos horarios
-        horarios_creados = []
         errores = []
-        
+
+        # Diferencia contra los horarios existentes, por (dia_semana, jornada). Los horarios
+        # que se mantienen conservan su id y sus asistencias; solo se eliminan los que ya
+        # no están en la petición (y con ellos, en cascada, sus asistencias).
+        existentes = {
+            (horario.dia_semana, horario.jornada): horario
+            for horario in HorarioFijo.objects.filter(usuario=usuario)
+        }
+        resultado = []  # horarios finales en el orden de la petición
+        nuevos, actualizados, vistos = [], [], set()
         for i, horario_data in enumerate(horarios_data):
-            try:
-                # Crear el horario fijo
-                horario = HorarioFijo.objects.create(
-                    usuario=usuario,
-                    dia_semana=horario_data['dia_semana'],
-                    jornada=horario_data['jornada'],
-                    sede=horario_data['sede']
+            clave = (int(horario_data['dia_semana']), horario_data['jornada'])
+            if clave in vistos:
+                errores.append(f"Horario {i+1}: Error al crear - horario repetido en la petición")
+                continue
+            vistos.add(clave)
+
+            horario = existentes.get(clave)
+            if horario is None:
+                horario = HorarioFijo(usuario=usuario, dia_semana=clave[0], jornada=clave[1], sede=horario_data['sede'])
+                nuevos.append(horario)
+            elif horario.sede != horario_data['sede']:
+                horario.sede = horario_data['sede']
+                actualizados.append(horario)
+            resultado.append(horario)
+        eliminados = [horario.id for clave, horario in existentes.items() if clave not in vistos]
+
+        with transaction.atomic():
+            if eliminados:
+                HorarioFijo.objects.filter(id__in=eliminados).delete()
+            if actualizados:
+                HorarioFijo.objects.bulk_update(actualizados, ['sede'])
+            if nuevos:
+                HorarioFijo.objects.bulk_create(nuevos)
+            # bulk_update/bulk_create no disparan señales: las asistencias de los horarios
+            # que cambiaron de sede se reagrupan en el resumen diario
+            if actualizados:
+                programar_recalculo(
+                    Asistencia.objects.filter(horario__in=actualizados).values_list('usuario_id', 'fecha')
                 )
-                
-                # Serializar el horario creado
-                horario_serializado = HorarioFijoSerializer(horario).data
-                horarios_creados.append(horario_serializado)
-                
-            except Exception as e:
-                errores.append(f"Horario {i+1}: Error al crear - {str(e)}")
+            if actualizados or nuevos:
+                versiones.incrementar(HorarioFijo)
+
+        horarios_creados = HorarioFijoSerializer(resultado, many=True).data
         
         # Preparar respuesta
         response_data = {
             'mensaje': f"Se editaron los horarios exitosamente para {usuario.username}",
-            'horarios_eliminados': horarios_eliminados,
+            'horarios_eliminados': len(eliminados),
             'horarios_creados': horarios_creados,
             'total_solicitados': len(horarios_data),
             'total_creados': len(horarios_creados),
+            'cambios': {
+                'creados': len(nuevos),
+                'actualizados': len(actualizados),
+                'eliminados': len(eliminados),
+                'sin_cambios': len(resultado) - len(nuevos) - len(actualizados)
+            },
             'usuario': {
                 'id': usuario.id,
                 'username': usuario.username,
@@ -462,13 +445,10 @@ def horarios_fijos_edit_multiple(request):
         if errores:
             response_data['errores'] = errores
             response_data['mensaje'] += f", {len(errores)} con errores"
-            print(f"⚠️ Respuesta con errores: {response_data}")
             return Response(response_data, status=status.HTTP_207_MULTI_STATUS)
         
-        print(f"✅ Respuesta exitosa: {response_data}")
         return Response(response_data, status=status.HTTP_200_OK)
     
-    print(f"❌ Errores de validación: {serializer.errors}")
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # Vistas para Asistencia
@@ -481,8 +461,20 @@ def asistencias(request):
     """
     if request.method == 'GET':
         asistencias = Asistencia.objects.filter(usuario=request.user)
-        serializer = AsistenciaSerializer(asistencias, many=True)
-        return Response(serializer.data)
+
+        # Paginación por cursor (opcional), de la más reciente a la más antigua
+        try:
+            paginacion = parametros_paginacion(request.query_params, Asistencia, ['-fecha', 'horario__jornada'])
+        except ParametrosPaginacionInvalidos as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if paginacion:
+            pagina, siguiente_cursor = paginar(filas_asistencias(asistencias), paginacion)
+            return Response({
+                'asistencias': serializar_asistencias(pagina),
+                'paginacion': datos_paginacion(paginacion, siguiente_cursor)
+            })
+
+        return Response(serializar_asistencias(filas_asistencias(asistencias)))
     
     elif request.method == 'POST':
         serializer = AsistenciaCreateSerializer(data=request.data)
@@ -529,29 +521,56 @@ def _parse_fecha(fecha_str: str | None) -> date:
     except Exception:
         return date.today()
 
+def _parse_fecha_estricta(fecha_str) -> date:
+    # A diferencia de _parse_fecha, una fecha mal formada no se reemplaza por hoy: lanza ValueError
+    try:
+        return datetime.strptime(fecha_str, "%Y-%m-%d").date()
+    except TypeError:
+        raise ValueError(f"fecha inválida: {fecha_str!r}")
+
 def _dia_semana_de_fecha(fecha_obj: date) -> int:
     # Python: Monday=0 ... Sunday=6; coincide con nuestro enum
     return fecha_obj.weekday()
 
+def _serializar_asistencias_del_dia(asistencias):
+    # Marca las asistencias que todavía no existen en la base de datos
+    data = AsistenciaSerializer(asistencias, many=True).data
+    for item, asistencia in zip(data, asistencias):
+        item['virtual'] = asistencia.pk is None
+    return data
+
+def _normalizar(request):
+    # ?normalizar=true: filas con ids y bloque `included` con cada usuario/horario una vez
+    return request.query_params.get('normalizar', '').lower() in ['true', '1', 'si']
+
+def _obtener_asistencia(pk=None, horario_id=None, fecha=None):
+    """
+    Asistencia por id, o por horario y fecha (asistencia virtual). En el segundo
+    caso, si la asistencia no existe se crea pendiente antes de aplicarle la
+    acción. Retorna None si no corresponde a ninguna.
+    """
+    if pk is not None:
+        return Asistencia.objects.filter(pk=pk).first()
+
+    try:
+        fecha_obj = datetime.strptime(fecha, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+    horario = HorarioFijo.objects.filter(pk=horario_id).first()
+    if not horario or horario.dia_semana != _dia_semana_de_fecha(fecha_obj):
+        return None
+    return obtener_asistencia_de_horario(horario, fecha_obj)
+
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+@con_etag(HorarioFijo, UsuarioPersonalizado)
 def directivo_horarios_monitores(request):
     """
     Listar todos los horarios fijos de todos los monitores.
     Filtros opcionales: usuario_id, dia_semana, jornada, sede
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     # Parámetros de filtrado
     usuario_id = request.query_params.get('usuario_id')  # ID específico de monitor
     dia_semana = request.query_params.get('dia_semana')  # 0-6
@@ -588,6 +607,22 @@ def directivo_horarios_monitores(request):
             return Response({'detail': 'sede debe ser SA o BA'}, status=status.HTTP_400_BAD_REQUEST)
         horarios_qs = horarios_qs.filter(sede=sede)
 
+    # Paginación por cursor (opcional)
+    try:
+        paginacion = parametros_paginacion(request.query_params, HorarioFijo, ['usuario__nombre', 'dia_semana', 'jornada'])
+    except ParametrosPaginacionInvalidos as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if paginacion:
+        horarios, siguiente_cursor = paginar(horarios_qs.select_related('usuario'), paginacion)
+        response_data = {
+            'horarios': HorarioFijoSerializer(horarios, many=True).data,
+            'paginacion': datos_paginacion(paginacion, siguiente_cursor)
+        }
+        if paginacion['incluir_totales']:
+            response_data.update(_totales_horarios(horarios_qs))
+        return Response(response_data)
+
     # Ordenar por usuario, día y jornada para mejor presentación
     horarios_qs = horarios_qs.order_by('usuario__nombre', 'dia_semana', 'jornada')
     
@@ -596,33 +631,34 @@ def directivo_horarios_monitores(request):
     
     # Agregar información de conteo
     response_data = {
-        'total_horarios': horarios_qs.count(),
-        'total_monitores': horarios_qs.values('usuario').distinct().count(),
+        **_totales_horarios(horarios_qs),
         'horarios': serializer.data
     }
     
     return Response(response_data)
 
+def _totales_horarios(horarios_qs):
+    totales = horarios_qs.aggregate(
+        total_horarios=Count('id'),
+        total_monitores=Count('usuario', distinct=True)
+    )
+    return {
+        'total_horarios': totales['total_horarios'],
+        'total_monitores': totales['total_monitores']
+    }
+
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+@con_etag(Asistencia, HorarioFijo, UsuarioPersonalizado)
 def directivo_asistencias(request):
     """
     Listar asistencias del día (por defecto hoy) para todos los monitores
-    con HorarioFijo del día de la semana. Genera en demanda las asistencias faltantes.
+    con HorarioFijo del día de la semana. Las asistencias que aún no existen se
+    devuelven como virtuales (id=null, virtual=true) sin crearlas en la base de datos.
     Filtros: fecha, estado, jornada, sede
-    Acceso: solo DIRECTIVO (temporal: usamos el primer DIRECTIVO hasta integrar JWT)
+    Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     # Parámetros
     fecha_str = request.query_params.get('fecha')
     estado = request.query_params.get('estado')  # pendiente|autorizado|rechazado|recuperado
@@ -639,44 +675,36 @@ def directivo_asistencias(request):
     if sede:
         horarios_qs = horarios_qs.filter(sede=sede)
 
-    # Generar asistencias si faltan
-    for h in horarios_qs:
-        Asistencia.objects.get_or_create(
-            usuario=h.usuario,
-            fecha=fecha_obj,
-            horario=h,
-            defaults={
-                'presente': False,
-                'estado_autorizacion': 'pendiente',
-                'horas': 0.00
-            }
-        )
-
-    asistencias_qs = Asistencia.objects.filter(fecha=fecha_obj, horario__in=horarios_qs)
+    # Las asistencias que aún no existen se devuelven como virtuales (sin escribir)
+    asistencias = asistencias_del_dia(fecha_obj, horarios_qs)
     if estado:
-        asistencias_qs = asistencias_qs.filter(estado_autorizacion=estado)
+        asistencias = [a for a in asistencias if a.estado_autorizacion == estado]
 
-    serializer = AsistenciaSerializer(asistencias_qs.select_related('usuario', 'horario'), many=True)
-    return Response(serializer.data)
+    if _normalizar(request):
+        incluidos = Incluidos()
+        data = serializar_asistencias_normalizadas([fila_de_asistencia(a) for a in asistencias], incluidos)
+        for item, asistencia in zip(data, asistencias):
+            item['virtual'] = asistencia.pk is None
+        return Response({'asistencias': data, 'included': incluidos.datos()})
+
+    return Response(_serializar_asistencias_del_dia(asistencias))
+
+def _valores_orden_recuperables(fila):
+    # Columnas de ORDEN_RECUPERABLES de una fila de filas_asistencias(); las virtuales aún no tienen id
+    valores = dict(zip(CAMPOS_ASISTENCIA, fila))
+    return [valores['fecha'], valores['usuario__nombre'], valores['horario__jornada'], valores['horario_id'], valores['id'] or 0]
 
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
 def directivo_asistencias_recuperables(request):
     """
     Listar asistencias que están pendientes y pueden ser recuperadas (fechas pasadas).
+    Los días pasados de un horario sin asistencia creada también están pendientes:
+    se devuelven como virtuales (id=null, virtual=true) sin crearlas, desde que rige
+    el horario (vigente_desde) y como máximo DIAS_MAXIMOS_FALTANTES días atrás.
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     # Parámetros de filtrado
     fecha_inicio_str = request.query_params.get('fecha_inicio')
     fecha_fin_str = request.query_params.get('fecha_fin')
@@ -702,12 +730,19 @@ def directivo_asistencias_recuperables(request):
     if sede and sede not in ['SA', 'BA']:
         return Response({'detail': 'sede debe ser SA o BA'}, status=status.HTTP_400_BAD_REQUEST)
 
+    # Ordenar por fecha descendente (más recientes primero); paginación por cursor opcional
+    try:
+        paginacion = parametros_paginacion(request.query_params, Asistencia, ORDEN_RECUPERABLES)
+        seleccion = SeleccionCampos(request.query_params, CAMPOS_RECUPERABLES)
+    except (ParametrosPaginacionInvalidos, CamposInvalidos) as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     # Query: asistencias pendientes en fechas pasadas
     asistencias_qs = Asistencia.objects.filter(
         estado_autorizacion='pendiente',
         fecha__gte=fecha_inicio,
         fecha__lt=date.today()  # Solo fechas pasadas
-    ).select_related('usuario', 'horario')
+    )
 
     # Aplicar filtros adicionales
     if monitor_id:
@@ -722,59 +757,95 @@ def directivo_asistencias_recuperables(request):
     if sede:
         asistencias_qs = asistencias_qs.filter(horario__sede=sede)
 
-    # Ordenar por fecha descendente (más recientes primero)
-    asistencias_qs = asistencias_qs.order_by('-fecha', 'usuario__nombre', 'horario__jornada')
+    # Las filas solo se consultan si se pide alguna de las dos secciones que las usan
+    incluir_filas = seleccion.incluye('asistencias') or seleccion.incluye('asistencias_por_fecha')
+    incluir_estadisticas = seleccion.incluye('estadisticas') and (not paginacion or paginacion['incluir_totales'])
 
-    serializer = AsistenciaSerializer(asistencias_qs, many=True)
-    
-    # Estadísticas
-    total_recuperables = asistencias_qs.count()
-    monitores_afectados = asistencias_qs.values('usuario').distinct().count()
+    # Días pasados de los horarios que aún no tienen asistencia (virtuales, sin escribir), desde que
+    # rige cada horario y como máximo DIAS_MAXIMOS_FALTANTES días atrás. Se generan de forma perezosa
+    ayer = date.today() - timedelta(days=1)
+    faltantes = iter(())
+    if incluir_filas or incluir_estadisticas:
+        horarios_qs = HorarioFijo.objects.all()
+        if monitor_id:
+            horarios_qs = horarios_qs.filter(usuario__id=monitor_id)
+        if jornada:
+            horarios_qs = horarios_qs.filter(jornada=jornada)
+        if sede:
+            horarios_qs = horarios_qs.filter(sede=sede)
+        desde = max(fecha_inicio, ayer - timedelta(days=DIAS_MAXIMOS_FALTANTES - 1))
+        faltantes = asistencias_faltantes(horarios_qs, desde, ayer)
+    # Las estadísticas necesitan todas las virtuales; la página, solo las que caben en ella
+    virtuales = list(faltantes) if incluir_estadisticas else None
+
+    asistencias_data = []
+    siguiente_cursor = None
+    incluidos = Incluidos() if _normalizar(request) else None
+    if incluir_filas:
+        filas_qs = filas_asistencias(asistencias_qs)
+        filas_virtuales = (fila_de_asistencia(a) for a in (faltantes if virtuales is None else virtuales))
+        if paginacion:
+            asistencias, siguiente_cursor = paginar_combinado(
+                filas_qs, paginacion, filas_virtuales, _valores_orden_recuperables
+            )
+        else:
+            asistencias = ordenar_lista(list(filas_qs) + list(filas_virtuales), ORDEN_RECUPERABLES, _valores_orden_recuperables)
+
+        if incluidos is not None:
+            asistencias_data = serializar_asistencias_normalizadas(asistencias, incluidos)
+        else:
+            asistencias_data = serializar_asistencias(asistencias)
+        for item in asistencias_data:
+            item['virtual'] = item['id'] is None
     
     # Agrupar por fecha para mejor visualización
     asistencias_por_fecha = {}
-    for asistencia in asistencias_qs:
-        fecha_str = asistencia.fecha.strftime('%Y-%m-%d')
-        if fecha_str not in asistencias_por_fecha:
-            asistencias_por_fecha[fecha_str] = []
-        asistencias_por_fecha[fecha_str].append(AsistenciaSerializer(asistencia).data)
+    for item in asistencias_data:
+        asistencias_por_fecha.setdefault(item['fecha'], []).append(item)
 
-    response_data = {
+    response_data = seleccion.filtrar({
         'periodo': {
             'fecha_inicio': str(fecha_inicio),
             'fecha_fin': str(fecha_fin)
         },
-        'estadisticas': {
-            'total_recuperables': total_recuperables,
-            'monitores_afectados': monitores_afectados,
-            'fechas_afectadas': len(asistencias_por_fecha)
-        },
         'filtros_aplicados': {
             'monitor_id': monitor_id,
             'jornada': jornada,
             'sede': sede
         },
         'asistencias_por_fecha': asistencias_por_fecha,
-        'asistencias': serializer.data
-    }
+        'asistencias': asistencias_data
+    })
+    if incluidos is not None:
+        response_data['included'] = incluidos.datos()
+
+    # Estadísticas (en modo paginado solo si se piden con totales=true)
+    if incluir_estadisticas and virtuales:
+        pares = list(asistencias_qs.values_list('usuario_id', 'fecha'))
+        pares += [(asistencia.usuario_id, asistencia.fecha) for asistencia in virtuales]
+        response_data['estadisticas'] = {
+            'total_recuperables': len(pares),
+            'monitores_afectados': len({usuario_id for usuario_id, _ in pares}),
+            'fechas_afectadas': len({fecha for _, fecha in pares})
+        }
+    elif incluir_estadisticas:
+        totales = asistencias_qs.aggregate(
+            total_recuperables=Count('id'),
+            monitores_afectados=Count('usuario', distinct=True),
+            fechas_afectadas=Count('fecha', distinct=True)
+        )
+        response_data['estadisticas'] = totales
+    if paginacion:
+        response_data['paginacion'] = datos_paginacion(paginacion, siguiente_cursor)
 
     return Response(response_data)
 
 @api_view(['POST'])
-@authentication_classes([])
-@permission_classes([AllowAny])
-def directivo_autorizar_asistencia(request, pk):
-    # Auth manual y rol DIRECTIVO
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
-    try:
-        asistencia = Asistencia.objects.get(pk=pk)
-    except Asistencia.DoesNotExist:
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+def directivo_autorizar_asistencia(request, pk=None, horario_id=None, fecha=None):
+    asistencia = _obtener_asistencia(pk, horario_id, fecha)
+    if asistencia is None:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
     asistencia.estado_autorizacion = 'autorizado'
@@ -783,20 +854,11 @@ def directivo_autorizar_asistencia(request, pk):
     return Response(AsistenciaSerializer(asistencia).data)
 
 @api_view(['POST'])
-@authentication_classes([])
-@permission_classes([AllowAny])
-def directivo_rechazar_asistencia(request, pk):
-    # Auth manual y rol DIRECTIVO
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
-    try:
-        asistencia = Asistencia.objects.get(pk=pk)
-    except Asistencia.DoesNotExist:
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+def directivo_rechazar_asistencia(request, pk=None, horario_id=None, fecha=None):
+    asistencia = _obtener_asistencia(pk, horario_id, fecha)
+    if asistencia is None:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
     asistencia.estado_autorizacion = 'rechazado'
@@ -805,9 +867,9 @@ def directivo_rechazar_asistencia(request, pk):
     return Response(AsistenciaSerializer(asistencia).data)
 
 @api_view(['POST'])
-@authentication_classes([])
-@permission_classes([AllowAny])
-def directivo_recuperar_asistencia(request, pk):
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+def directivo_recuperar_asistencia(request, pk=None, horario_id=None, fecha=None):
     """
     Recuperar una asistencia que estaba pendiente y ya pasó la fecha.
     Solo funciona si:
@@ -815,17 +877,8 @@ def directivo_recuperar_asistencia(request, pk):
     2. La fecha de la asistencia ya pasó
     3. La solicitud viene de un DIRECTIVO
     """
-    # Auth manual y rol DIRECTIVO
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
-    try:
-        asistencia = Asistencia.objects.get(pk=pk)
-    except Asistencia.DoesNotExist:
+    asistencia = _obtener_asistencia(pk, horario_id, fecha)
+    if asistencia is None:
         return Response({'detail': 'Asistencia no encontrada'}, status=status.HTTP_404_NOT_FOUND)
 
     # Validar que la asistencia esté en estado pendiente
@@ -853,33 +906,84 @@ def directivo_recuperar_asistencia(request, pk):
         'asistencia': AsistenciaSerializer(asistencia).data
     })
 
+@api_view(['POST'])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+def directivo_asistencias_lote(request):
+    """
+    Autorizar, rechazar o recuperar varias asistencias en una sola operación.
+    Body: {"accion": "autorizar|rechazar|recuperar", "ids": [1, 2, ...]}
+       o {"accion": ..., "fecha": "YYYY-MM-DD", "sede": "SA", "jornada": "M", "estado": "pendiente"}
+    Con filtro por fecha, las asistencias virtuales del día que coinciden con el filtro
+    se crean antes de aplicar la acción.
+    Acceso: solo DIRECTIVO
+    """
+    serializer = AsistenciaLoteSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    datos = serializer.validated_data
+    ids = datos.get('ids')
+
+    if ids is not None:
+        asistencias_qs = Asistencia.objects.filter(id__in=ids)
+    else:
+        asistencias_qs = Asistencia.objects.filter(fecha=datos['fecha'])
+        horarios_qs = HorarioFijo.objects.filter(dia_semana=_dia_semana_de_fecha(datos['fecha']))
+        if datos.get('sede'):
+            asistencias_qs = asistencias_qs.filter(horario__sede=datos['sede'])
+            horarios_qs = horarios_qs.filter(sede=datos['sede'])
+        if datos.get('jornada'):
+            asistencias_qs = asistencias_qs.filter(horario__jornada=datos['jornada'])
+            horarios_qs = horarios_qs.filter(jornada=datos['jornada'])
+        if datos.get('estado'):
+            asistencias_qs = asistencias_qs.filter(estado_autorizacion=datos['estado'])
+
+        # Las virtuales están pendientes: se materializan (solo las del filtro) para que el UPDATE las incluya
+        if datos.get('estado') in (None, 'pendiente'):
+            generar_asistencias(datos['fecha'], datos['fecha'], horarios_qs=horarios_qs)
+
+    resultados = aplicar_accion_en_lote(asistencias_qs, datos['accion'], ids)
+
+    conteo = {'actualizada': 0, 'no_aplicable': 0, 'no_encontrada': 0}
+    for resultado in resultados:
+        conteo[resultado['resultado']] += 1
+
+    return Response({
+        'accion': datos['accion'],
+        'total': len(resultados),
+        'actualizadas': conteo['actualizada'],
+        'no_aplicables': conteo['no_aplicable'],
+        'no_encontradas': conteo['no_encontrada'],
+        'resultados': resultados
+    })
+
 # ===== Endpoints para REPORTES =====
 
+# Formatos de exportación en streaming de los reportes (?format=ndjson|csv)
+FORMATOS_EXPORTACION = ('ndjson', 'csv')
+# Campos aceptados por ?fields= en los reportes y listados
+CAMPOS_RECUPERABLES = ['periodo', 'filtros_aplicados', 'asistencias_por_fecha', 'asistencias', 'estadisticas']
+ORDEN_RECUPERABLES = ['-fecha', 'usuario__nombre', 'horario__jornada', 'horario_id', 'id']
+CAMPOS_REPORTE_MONITOR = [
+    'monitor', 'periodo', 'estadisticas', 'filtros_aplicados', 'detalle_por_fecha', 'ajustes_por_fecha',
+]
+CAMPOS_REPORTE_TODOS = [
+    'monitor', 'horas_asistencias', 'horas_ajustes', 'total_horas', 'total_asistencias', 'total_ajustes',
+    'asistencias_presentes', 'asistencias_autorizadas', 'asistencias', 'ajustes',
+]
+RENDERERS_EXPORTACION = list(api_settings.DEFAULT_RENDERER_CLASSES) + [NDJSONRenderer, CSVRenderer]
+
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+@renderer_classes(RENDERERS_EXPORTACION)
 def directivo_reporte_horas_monitor(request, monitor_id):
     """
     Reporte de horas trabajadas por un monitor específico.
     Filtros: fecha_inicio, fecha_fin, sede, jornada
+    Con ?format=ndjson|csv responde en streaming una fila por asistencia/ajuste.
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
-    # Verificar que el monitor existe
-    try:
-        monitor = UsuarioPersonalizado.objects.get(id=monitor_id, tipo_usuario='MONITOR')
-    except UsuarioPersonalizado.DoesNotExist:
-        return Response({'detail': 'Monitor no encontrado'}, status=status.HTTP_404_NOT_FOUND)
-
     # Parámetros de filtrado
     fecha_inicio_str = request.query_params.get('fecha_inicio')
     fecha_fin_str = request.query_params.get('fecha_fin')
@@ -904,99 +1008,119 @@ def directivo_reporte_horas_monitor(request, monitor_id):
     if jornada and jornada not in ['M', 'T']:
         return Response({'detail': 'jornada debe ser M o T'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Calcular horas totales incluyendo ajustes
-    calculo_horas = calcular_horas_totales_monitor(monitor_id, fecha_inicio, fecha_fin, sede, jornada)
-
-    # Query asistencias para el detalle
-    asistencias_qs = Asistencia.objects.filter(
-        usuario=monitor,
-        fecha__gte=fecha_inicio,
-        fecha__lte=fecha_fin
-    ).select_related('horario')
+    # Secciones a incluir (?fields=) y relaciones expandidas de los ajustes (?expand=)
+    try:
+        seleccion = SeleccionCampos(request.query_params, CAMPOS_REPORTE_MONITOR, AjusteHorasSerializer.RELACIONES)
+    except CamposInvalidos as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Exportación en streaming: filas planas sin construir el reporte en memoria
+    if request.accepted_renderer.format in FORMATOS_EXPORTACION:
+        if not UsuarioPersonalizado.objects.filter(id=monitor_id, tipo_usuario='MONITOR').exists():
+            return Response({'detail': 'Monitor no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        return respuesta_streaming(
+            filas_reporte_horas(fecha_inicio, fecha_fin, sede, jornada, monitor_id=monitor_id),
+            request.accepted_renderer.format,
+            f"reporte_horas_monitor_{monitor_id}_{fecha_inicio}_{fecha_fin}"
+        )
 
-    # Aplicar filtros adicionales para asistencias
-    if sede:
-        asistencias_qs = asistencias_qs.filter(horario__sede=sede)
-    if jornada:
-        asistencias_qs = asistencias_qs.filter(horario__jornada=jornada)
+    # Monitor con sus totales (incluye ajustes) en una sola consulta
+    monitores_qs = UsuarioPersonalizado.objects.all()
+    if seleccion.incluye('estadisticas'):
+        monitores_qs = monitores_qs.with_horas(fecha_inicio, fecha_fin, sede, jornada)
+    consultas = {'monitor': lambda: monitores_qs.filter(id=monitor_id, tipo_usuario='MONITOR').first()}
+
+    if seleccion.incluye('detalle_por_fecha'):
+        # Query asistencias para el detalle
+        asistencias_qs = Asistencia.objects.filter(
+            usuario_id=monitor_id,
+            fecha__gte=fecha_inicio,
+            fecha__lte=fecha_fin
+        )
 
-    # Estadísticas de asistencias
-    asistencias_presentes = asistencias_qs.filter(presente=True).count()
-    asistencias_autorizadas = asistencias_qs.filter(estado_autorizacion='autorizado').count()
-    
-    # Agrupar asistencias por fecha para el detalle
-    asistencias_por_fecha = {}
-    for asistencia in asistencias_qs.order_by('fecha', 'horario__jornada'):
-        fecha_str = asistencia.fecha.strftime('%Y-%m-%d')
-        if fecha_str not in asistencias_por_fecha:
-            asistencias_por_fecha[fecha_str] = []
-        asistencias_por_fecha[fecha_str].append(AsistenciaSerializer(asistencia).data)
-
-    # Query ajustes para el detalle
-    ajustes_qs = AjusteHoras.objects.filter(
-        usuario=monitor,
-        fecha__gte=fecha_inicio,
-        fecha__lte=fecha_fin
-    ).select_related('creado_por', 'asistencia')
+        # Aplicar filtros adicionales para asistencias
+        if sede:
+            asistencias_qs = asistencias_qs.filter(horario__sede=sede)
+        if jornada:
+            asistencias_qs = asistencias_qs.filter(horario__jornada=jornada)
+        consultas['asistencias'] = lambda: list(filas_asistencias(asistencias_qs.order_by('fecha', 'horario__jornada')))
+
+    if seleccion.incluye('ajustes_por_fecha'):
+        # Query ajustes para el detalle
+        ajustes_qs = AjusteHoras.objects.filter(
+            usuario_id=monitor_id,
+            fecha__gte=fecha_inicio,
+            fecha__lte=fecha_fin
+        ).select_related(*AjusteHorasSerializer.relaciones_select_related(expandir=seleccion.expandir))
+        consultas['ajustes'] = lambda: list(ajustes_qs.order_by('fecha', 'created_at'))
+
+    # Totales y detalles no dependen entre sí: se consultan a la vez
+    consultas = consultar_en_paralelo(**consultas)
 
-    # Agrupar ajustes por fecha
-    ajustes_por_fecha = {}
-    for ajuste in ajustes_qs.order_by('fecha', 'created_at'):
-        fecha_str = ajuste.fecha.strftime('%Y-%m-%d')
-        if fecha_str not in ajustes_por_fecha:
-            ajustes_por_fecha[fecha_str] = []
-        ajustes_por_fecha[fecha_str].append(AjusteHorasSerializer(ajuste).data)
+    # Verificar que el monitor existe
+    monitor = consultas['monitor']
+    if monitor is None:
+        return Response({'detail': 'Monitor no encontrado'}, status=status.HTTP_404_NOT_FOUND)
 
-    # Respuesta
-    response_data = {
-        'monitor': {
+    # Respuesta; las secciones omitidas con ?fields= no se consultan
+    response_data = {}
+    if seleccion.incluye('monitor'):
+        response_data['monitor'] = {
             'id': monitor.id,
             'username': monitor.username,
             'nombre': monitor.nombre
-        },
-        'periodo': {
+        }
+    if seleccion.incluye('periodo'):
+        response_data['periodo'] = {
             'fecha_inicio': fecha_inicio.strftime('%Y-%m-%d'),
             'fecha_fin': fecha_fin.strftime('%Y-%m-%d')
-        },
-        'estadisticas': {
-            'horas_asistencias': round(calculo_horas['horas_asistencias'], 2),
-            'horas_ajustes': round(calculo_horas['horas_ajustes'], 2),
-            'total_horas': round(calculo_horas['horas_totales'], 2),
-            'total_asistencias': calculo_horas['total_asistencias'],
-            'total_ajustes': calculo_horas['total_ajustes'],
-            'asistencias_presentes': asistencias_presentes,
-            'asistencias_autorizadas': asistencias_autorizadas,
-            'promedio_horas_por_dia': round(calculo_horas['horas_totales'] / max(1, (fecha_fin - fecha_inicio).days + 1), 2)
-        },
-        'filtros_aplicados': {
+        }
+    if seleccion.incluye('estadisticas'):
+        horas_totales = float(monitor.horas_totales)
+        response_data['estadisticas'] = {
+            'horas_asistencias': round(float(monitor.horas_asistencias), 2),
+            'horas_ajustes': round(float(monitor.horas_ajustes), 2),
+            'total_horas': round(horas_totales, 2),
+            'total_asistencias': monitor.total_asistencias,
+            'total_ajustes': monitor.total_ajustes,
+            'asistencias_presentes': monitor.asistencias_presentes,
+            'asistencias_autorizadas': monitor.asistencias_autorizadas,
+            'promedio_horas_por_dia': round(horas_totales / max(1, (fecha_fin - fecha_inicio).days + 1), 2)
+        }
+    if seleccion.incluye('filtros_aplicados'):
+        response_data['filtros_aplicados'] = {
             'sede': sede,
             'jornada': jornada
-        },
-        'detalle_por_fecha': asistencias_por_fecha,
-        'ajustes_por_fecha': ajustes_por_fecha
-    }
+        }
+
+    if seleccion.incluye('detalle_por_fecha'):
+        # Agrupar asistencias por fecha para el detalle
+        asistencias_por_fecha = {}
+        for asistencia in serializar_asistencias(consultas['asistencias']):
+            asistencias_por_fecha.setdefault(asistencia['fecha'], []).append(asistencia)
+        response_data['detalle_por_fecha'] = asistencias_por_fecha
+
+    if seleccion.incluye('ajustes_por_fecha'):
+        # Agrupar ajustes por fecha
+        ajustes_por_fecha = {}
+        for ajuste in AjusteHorasSerializer(consultas['ajustes'], many=True, expandir=seleccion.expandir).data:
+            ajustes_por_fecha.setdefault(ajuste['fecha'], []).append(ajuste)
+        response_data['ajustes_por_fecha'] = ajustes_por_fecha
 
     return Response(response_data)
 
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+@renderer_classes(RENDERERS_EXPORTACION)
 def directivo_reporte_horas_todos(request):
     """
     Reporte de horas trabajadas por todos los monitores.
     Filtros: fecha_inicio, fecha_fin, sede, jornada
+    Con ?format=ndjson responde en streaming un monitor por línea, y con
+    ?format=csv una fila por asistencia/ajuste.
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     # Parámetros de filtrado
     fecha_inicio_str = request.query_params.get('fecha_inicio')
     fecha_fin_str = request.query_params.get('fecha_fin')
@@ -1021,65 +1145,107 @@ def directivo_reporte_horas_todos(request):
     if jornada and jornada not in ['M', 'T']:
         return Response({'detail': 'jornada debe ser M o T'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Obtener todos los monitores
-    monitores = UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR')
-    
+    # Campos de cada monitor (?fields=) y relaciones expandidas de los ajustes (?expand=)
+    try:
+        seleccion = SeleccionCampos(request.query_params, CAMPOS_REPORTE_TODOS, AjusteHorasSerializer.RELACIONES)
+    except CamposInvalidos as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Exportación en streaming: un monitor (NDJSON) o una fila (CSV) a la vez
+    formato = request.accepted_renderer.format
+    if formato in FORMATOS_EXPORTACION:
+        if formato == 'ndjson':
+            objetos = monitores_reporte_horas(fecha_inicio, fecha_fin, sede, jornada)
+        else:
+            objetos = filas_reporte_horas(fecha_inicio, fecha_fin, sede, jornada)
+        return respuesta_streaming(objetos, formato, f"reporte_horas_{fecha_inicio}_{fecha_fin}")
+
+    # Querysets del detalle del período
+    asistencias_periodo = Asistencia.objects.filter(
+        fecha__gte=fecha_inicio,
+        fecha__lte=fecha_fin
+    )
+    if sede:
+        asistencias_periodo = asistencias_periodo.filter(horario__sede=sede)
+    if jornada:
+        asistencias_periodo = asistencias_periodo.filter(horario__jornada=jornada)
+
+    ajustes_periodo = AjusteHoras.objects.filter(
+        fecha__gte=fecha_inicio,
+        fecha__lte=fecha_fin
+    )
+
+    # Totales por monitor en una sola consulta; solo monitores con datos en el período
+    monitores = UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR').with_horas(
+        fecha_inicio, fecha_fin, sede, jornada
+    ).filter(
+        Q(total_asistencias__gt=0) | Q(total_ajustes__gt=0)
+    ).order_by('id')
+    consultas = {'monitores': lambda: list(monitores)}
+
+    # Detalle del período solo si se pidió (?fields= puede omitir asistencias y ajustes);
+    # cada detalle es una sola consulta de todos los monitores, independiente de los totales
+    if seleccion.incluye('asistencias'):
+        consultas['asistencias'] = lambda: list(filas_asistencias(
+            asistencias_periodo.filter(usuario__tipo_usuario='MONITOR').order_by('fecha', 'horario__jornada')
+        ))
+    if seleccion.incluye('ajustes'):
+        consultas['ajustes'] = lambda: list(ajustes_periodo.filter(usuario__tipo_usuario='MONITOR').select_related(
+            *AjusteHorasSerializer.relaciones_select_related(expandir=seleccion.expandir)
+        ))
+
+    # Totales, asistencias y ajustes se consultan a la vez
+    consultas = consultar_en_paralelo(**consultas)
+    monitores = consultas['monitores']
+
+    # Detalles agrupados por monitor
+    asistencias_por_monitor = {}
+    if seleccion.incluye('asistencias'):
+        for asistencia in serializar_asistencias(consultas['asistencias']):
+            asistencias_por_monitor.setdefault(asistencia['usuario']['id'], []).append(asistencia)
+    ajustes_por_monitor = {}
+    if seleccion.incluye('ajustes'):
+        for ajuste in consultas['ajustes']:
+            ajustes_por_monitor.setdefault(ajuste.usuario_id, []).append(ajuste)
+
     # Calcular datos para cada monitor
     monitores_data = {}
     total_horas_general = 0.0
     total_asistencias_general = 0
     total_ajustes_general = 0
-    
-    for monitor in monitores:
-        # Calcular horas totales incluyendo ajustes
-        calculo_horas = calcular_horas_totales_monitor(monitor.id, fecha_inicio, fecha_fin, sede, jornada)
-        
-        # Solo incluir monitores que tienen datos en el período
-        if calculo_horas['total_asistencias'] > 0 or calculo_horas['total_ajustes'] > 0:
-            # Query asistencias para el detalle
-            asistencias_qs = Asistencia.objects.filter(
-                usuario=monitor,
-                fecha__gte=fecha_inicio,
-                fecha__lte=fecha_fin
-            ).select_related('horario')
-
-            # Aplicar filtros a asistencias
-            if sede:
-                asistencias_qs = asistencias_qs.filter(horario__sede=sede)
-            if jornada:
-                asistencias_qs = asistencias_qs.filter(horario__jornada=jornada)
-
-            asistencias_presentes = asistencias_qs.filter(presente=True).count()
-            asistencias_autorizadas = asistencias_qs.filter(estado_autorizacion='autorizado').count()
-
-            # Query ajustes para el detalle
-            ajustes_qs = AjusteHoras.objects.filter(
-                usuario=monitor,
-                fecha__gte=fecha_inicio,
-                fecha__lte=fecha_fin
-            ).select_related('creado_por', 'asistencia')
 
-            monitores_data[monitor.id] = {
-                'monitor': {
-                    'id': monitor.id,
-                    'username': monitor.username,
-                    'nombre': monitor.nombre
-                },
-                'horas_asistencias': round(calculo_horas['horas_asistencias'], 2),
-                'horas_ajustes': round(calculo_horas['horas_ajustes'], 2),
-                'total_horas': round(calculo_horas['horas_totales'], 2),
-                'total_asistencias': calculo_horas['total_asistencias'],
-                'total_ajustes': calculo_horas['total_ajustes'],
-                'asistencias_presentes': asistencias_presentes,
-                'asistencias_autorizadas': asistencias_autorizadas,
-                'asistencias': [AsistenciaSerializer(a).data for a in asistencias_qs],
-                'ajustes': [AjusteHorasSerializer(aj).data for aj in ajustes_qs]
-            }
-            
-            # Acumular estadísticas generales
-            total_horas_general += calculo_horas['horas_totales']
-            total_asistencias_general += calculo_horas['total_asistencias']
-            total_ajustes_general += calculo_horas['total_ajustes']
+    for monitor in monitores:
+        horas_asistencias = float(monitor.horas_asistencias)
+        horas_ajustes = float(monitor.horas_ajustes)
+        horas_totales = float(monitor.horas_totales)
+        total_asistencias = monitor.total_asistencias
+        total_ajustes = monitor.total_ajustes
+
+        monitores_data[monitor.id] = {
+            'monitor': {
+                'id': monitor.id,
+                'username': monitor.username,
+                'nombre': monitor.nombre
+            },
+            'horas_asistencias': round(horas_asistencias, 2),
+            'horas_ajustes': round(horas_ajustes, 2),
+            'total_horas': round(horas_totales, 2),
+            'total_asistencias': total_asistencias,
+            'total_ajustes': total_ajustes,
+            'asistencias_presentes': monitor.asistencias_presentes,
+            'asistencias_autorizadas': monitor.asistencias_autorizadas,
+        }
+        if seleccion.incluye('asistencias'):
+            monitores_data[monitor.id]['asistencias'] = asistencias_por_monitor.get(monitor.id, [])
+        if seleccion.incluye('ajustes'):
+            monitores_data[monitor.id]['ajustes'] = AjusteHorasSerializer(
+                ajustes_por_monitor.get(monitor.id, []), many=True, expandir=seleccion.expandir
+            ).data
+
+        # Acumular estadísticas generales
+        total_horas_general += horas_totales
+        total_asistencias_general += total_asistencias
+        total_ajustes_general += total_ajustes
 
     total_monitores = len(monitores_data)
 
@@ -1107,7 +1273,7 @@ def directivo_reporte_horas_todos(request):
             'sede': sede,
             'jornada': jornada
         },
-        'monitores': monitores_ordenados
+        'monitores': [seleccion.filtrar(datos) for datos in monitores_ordenados]
     }
 
     return Response(response_data)
@@ -1119,31 +1285,22 @@ def directivo_reporte_horas_todos(request):
 @permission_classes([IsAuthenticated])
 def monitor_mis_asistencias(request):
     """
-    Lista (y genera si faltan) las asistencias del usuario MONITOR para la fecha (por defecto hoy)
+    Lista las asistencias del usuario MONITOR para la fecha (por defecto hoy).
+    Los bloques sin asistencia creada se devuelven como virtuales (id=null, virtual=true).
     """
     usuario = request.user
-    print(f"=== MONITOR MIS ASISTENCIAS - Usuario autenticado: {usuario.username} (ID: {usuario.id}) ===")
-    
+
     if usuario.tipo_usuario != 'MONITOR':
         return Response({'detail': 'Solo monitores pueden acceder a este endpoint'}, status=status.HTTP_403_FORBIDDEN)
 
     fecha_obj = _parse_fecha(request.query_params.get('fecha'))
     dia_semana = _dia_semana_de_fecha(fecha_obj)
 
-    horarios_qs = HorarioFijo.objects.filter(usuario=usuario, dia_semana=dia_semana)
+    horarios_qs = HorarioFijo.objects.filter(usuario_id=usuario.id, dia_semana=dia_semana)
 
-    # Generar asistencias si faltan
-    for h in horarios_qs:
-        Asistencia.objects.get_or_create(
-            usuario=usuario,
-            fecha=fecha_obj,
-            horario=h,
-            defaults={'presente': False, 'estado_autorizacion': 'pendiente', 'horas': 0.00}
-        )
-
-    asistencias_qs = Asistencia.objects.filter(usuario=usuario, fecha=fecha_obj)
-    serializer = AsistenciaSerializer(asistencias_qs.select_related('usuario', 'horario'), many=True)
-    return Response(serializer.data)
+    # Las asistencias que aún no existen se devuelven como virtuales (sin escribir)
+    asistencias = asistencias_del_dia(fecha_obj, horarios_qs)
+    return Response(_serializar_asistencias_del_dia(asistencias))
 
 @api_view(['POST'])
 @authentication_classes([UsuarioPersonalizadoJWTAuthentication])
@@ -1161,8 +1318,7 @@ def monitor_marcar(request):
     - No se puede marcar fechas futuras
     """
     usuario = request.user
-    print(f"=== MONITOR MARCAR - Usuario autenticado: {usuario.username} (ID: {usuario.id}) ===")
-    
+
     if usuario.tipo_usuario != 'MONITOR':
         return Response({'detail': 'Solo monitores pueden marcar asistencia'}, status=status.HTTP_403_FORBIDDEN)
 
@@ -1181,20 +1337,16 @@ def monitor_marcar(request):
     # Buscar el horario fijo del usuario para ese día y jornada
     dia_semana = _dia_semana_de_fecha(fecha_obj)
     try:
-        horario = HorarioFijo.objects.get(usuario=usuario, dia_semana=dia_semana, jornada=jornada)
+        horario = HorarioFijo.objects.get(usuario_id=usuario.id, dia_semana=dia_semana, jornada=jornada)
     except HorarioFijo.DoesNotExist:
         return Response({'detail': 'No tienes horario asignado para esa jornada en este día'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Crear o obtener la asistencia
-    asistencia, created = Asistencia.objects.get_or_create(
-        usuario=usuario,
-        fecha=fecha_obj,
-        horario=horario,
-        defaults={'presente': False, 'estado_autorizacion': 'pendiente', 'horas': 0.00}
-    )
+    # Si la asistencia aún no existe es virtual (pendiente): no se crea hasta que un
+    # DIRECTIVO la autorice, así que tampoco se puede marcar
+    asistencia = Asistencia.objects.filter(usuario_id=usuario.id, fecha=fecha_obj, horario=horario).first()
 
     # Solo permite marcar si el bloque fue autorizado o recuperado por un DIRECTIVO
-    if asistencia.estado_autorizacion not in ['autorizado', 'recuperado']:
+    if asistencia is None or asistencia.estado_autorizacion not in ['autorizado', 'recuperado']:
         return Response(
             {
                 'detail': 'Esta jornada aún no ha sido autorizada por un directivo.',
@@ -1231,32 +1383,34 @@ def monitor_marcar(request):
 # ===== Endpoints para AJUSTES DE HORAS =====
 
 @api_view(['GET', 'POST'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
 def directivo_ajustes_horas(request):
     """
     GET: Listar ajustes de horas con filtros opcionales
     POST: Crear nuevo ajuste de horas
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     if request.method == 'GET':
         # Parámetros de filtrado
         monitor_id = request.query_params.get('monitor_id')
         fecha_inicio_str = request.query_params.get('fecha_inicio')
         fecha_fin_str = request.query_params.get('fecha_fin')
         
-        # Query base
-        ajustes_qs = AjusteHoras.objects.all().select_related('usuario', 'creado_por', 'asistencia')
+        # Campos de cada ajuste (?fields=) y relaciones expandidas (?expand=)
+        try:
+            seleccion = SeleccionCampos(
+                request.query_params, AjusteHorasSerializer.Meta.fields, AjusteHorasSerializer.RELACIONES
+            )
+        except CamposInvalidos as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Query base; solo se unen las relaciones que se serializan completas
+        # (en la respuesta normalizada ninguna: se cargan aparte en `included`)
+        normalizar = _normalizar(request)
+        ajustes_qs = AjusteHoras.objects.all().select_related(
+            *AjusteHorasSerializer.relaciones_select_related(seleccion.campos, [] if normalizar else seleccion.expandir)
+        )
         
         # Aplicar filtros
         if monitor_id:
@@ -1280,30 +1434,54 @@ def directivo_ajustes_horas(request):
         
         # Filtrar por rango de fechas
         ajustes_qs = ajustes_qs.filter(fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+
+        # Paginación por cursor (opcional), en el orden por defecto (más recientes primero)
+        try:
+            paginacion = parametros_paginacion(request.query_params, AjusteHoras, ['-created_at'])
+        except ParametrosPaginacionInvalidos as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if paginacion:
+            ajustes, siguiente_cursor = paginar(ajustes_qs, paginacion)
+        else:
+            ajustes = ajustes_qs
         
         # Serializar y responder
-        serializer = AjusteHorasSerializer(ajustes_qs, many=True)
-        
-        # Calcular estadísticas
-        total_ajustes = ajustes_qs.count()
-        total_horas_ajustadas = sum(float(ajuste.cantidad_horas) for ajuste in ajustes_qs)
-        monitores_afectados = ajustes_qs.values('usuario').distinct().count()
+        incluidos = Incluidos(asistencias=True) if normalizar else None
+        if incluidos is not None:
+            ajustes_data = serializar_ajustes_normalizados(ajustes, incluidos, seleccion.campos)
+        else:
+            ajustes_data = AjusteHorasSerializer(
+                ajustes, many=True, campos=seleccion.campos, expandir=seleccion.expandir
+            ).data
         
         response_data = {
             'periodo': {
                 'fecha_inicio': str(fecha_inicio),
                 'fecha_fin': str(fecha_fin)
             },
-            'estadisticas': {
-                'total_ajustes': total_ajustes,
-                'total_horas_ajustadas': total_horas_ajustadas,
-                'monitores_afectados': monitores_afectados
-            },
             'filtros_aplicados': {
                 'monitor_id': monitor_id
             },
-            'ajustes': serializer.data
+            'ajustes': ajustes_data
         }
+        if incluidos is not None:
+            response_data['included'] = incluidos.datos()
+
+        # Calcular estadísticas (en modo paginado solo si se piden con totales=true)
+        if not paginacion or paginacion['incluir_totales']:
+            totales = ajustes_qs.aggregate(
+                total_ajustes=Count('id'),
+                total_horas_ajustadas=Sum('cantidad_horas'),
+                monitores_afectados=Count('usuario', distinct=True)
+            )
+            response_data['estadisticas'] = {
+                'total_ajustes': totales['total_ajustes'],
+                'total_horas_ajustadas': float(totales['total_horas_ajustadas'] or 0),
+                'monitores_afectados': totales['monitores_afectados']
+            }
+        if paginacion:
+            response_data['paginacion'] = datos_paginacion(paginacion, siguiente_cursor)
         
         return Response(response_data)
     
@@ -1323,7 +1501,7 @@ def directivo_ajustes_horas(request):
                 cantidad_horas=serializer.validated_data['cantidad_horas'],
                 motivo=serializer.validated_data['motivo'],
                 asistencia=asistencia,
-                creado_por=usuario_directivo
+                creado_por_id=request.user.id
             )
             
             return Response(AjusteHorasSerializer(ajuste).data, status=status.HTTP_201_CREATED)
@@ -1332,24 +1510,14 @@ def directivo_ajustes_horas(request):
 
 
 @api_view(['GET', 'DELETE'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
 def directivo_ajuste_horas_detalle(request, pk):
     """
     GET: Obtener detalles de un ajuste específico
     DELETE: Eliminar ajuste de horas
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     # Verificar que el ajuste existe
     try:
         ajuste = AjusteHoras.objects.select_related('usuario', 'creado_por', 'asistencia').get(id=pk)
@@ -1366,23 +1534,13 @@ def directivo_ajuste_horas_detalle(request, pk):
 
 
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
 def directivo_buscar_monitores(request):
     """
     Buscar monitores por nombre o username.
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     # Parámetro de búsqueda
     busqueda = request.query_params.get('q', '').strip()
     
@@ -1417,19 +1575,35 @@ def directivo_buscar_monitores(request):
 
     return Response(response_data)
 
+@api_view(['POST'])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+def directivo_revocar_tokens_usuario(request, usuario_id):
+    """
+    Revoca todos los tokens emitidos para un usuario (debe volver a iniciar sesión).
+    Acceso: solo DIRECTIVO
+    """
+    try:
+        usuario = UsuarioPersonalizado.objects.get(id=usuario_id)
+    except UsuarioPersonalizado.DoesNotExist:
+        return Response({'detail': 'Usuario no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+    usuario.revocar_tokens()
+
+    return Response({
+        'mensaje': f'Tokens revocados para {usuario.username}',
+        'token_version': usuario.token_version
+    })
+
 
 # ===== Endpoints para FINANZAS =====
 
 def obtener_configuracion(clave, valor_por_defecto=None):
     """
-    Obtiene el valor de una configuración del sistema.
+    Obtiene el valor de una configuración del sistema desde el registro en memoria.
     Si no existe, retorna el valor por defecto.
     """
-    try:
-        config = ConfiguracionSistema.objects.get(clave=clave)
-        return config.get_valor_tipado()
-    except ConfiguracionSistema.DoesNotExist:
-        return valor_por_defecto
+    return registro_configuracion.obtener(clave, valor_por_defecto)
 
 def obtener_costo_por_hora():
     """
@@ -1445,33 +1619,40 @@ def obtener_semanas_semestre():
     """
     return obtener_configuracion('semanas_semestre', 14)
 
+# Los porcentajes de avance dividen por el total de semanas: un valor de 0 (o uno
+# no numérico, que get_valor_tipado convierte en 0) se rechaza con 400
+ERROR_SEMANAS_SEMESTRE = "La configuración 'semanas_semestre' debe ser un entero mayor o igual a 1"
+
 def calcular_horas_semanales_monitor(monitor_id):
     """
     Calcula las horas semanales que debe trabajar un monitor basado en sus horarios fijos.
     Cada jornada (M/T) = 4 horas.
     """
-    horarios = HorarioFijo.objects.filter(usuario_id=monitor_id)
-    total_horas_semana = horarios.count() * 4  # 4 horas por jornada
-    return total_horas_semana
+    horas_semanales = UsuarioPersonalizado.objects.filter(pk=monitor_id).with_jornadas_semanales().values_list(
+        'horas_semanales', flat=True
+    ).first()
+    return horas_semanales or 0
 
 def calcular_costo_total_monitor(monitor_id, fecha_inicio, fecha_fin):
     """
     Calcula el costo total que debe recibir un monitor en un período.
     Incluye horas de asistencias + ajustes de horas.
     """
-    calculo_horas = calcular_horas_totales_monitor(monitor_id, fecha_inicio, fecha_fin)
-    costo_por_hora = obtener_costo_por_hora()
-    costo_total = calculo_horas['horas_totales'] * costo_por_hora
-    return round(costo_total, 2)
+    costo_total = UsuarioPersonalizado.objects.filter(pk=monitor_id).with_horas(
+        fecha_inicio, fecha_fin
+    ).with_costo(obtener_costo_por_hora()).values_list('costo_total', flat=True).first()
+    return round(float(costo_total or 0), 2)
 
-def calcular_costo_proyectado_monitor(monitor_id, semanas_trabajadas, total_semanas=None):
+def calcular_costo_proyectado_monitor(monitor_id, semanas_trabajadas, total_semanas=None, horas_semanales=None):
     """
     Calcula el costo proyectado de un monitor basado en sus horarios fijos.
+    Si ya se conocen sus horas semanales se pueden pasar para no consultarlas.
     """
     if total_semanas is None:
         total_semanas = obtener_semanas_semestre()
     
-    horas_semanales = calcular_horas_semanales_monitor(monitor_id)
+    if horas_semanales is None:
+        horas_semanales = calcular_horas_semanales_monitor(monitor_id)
     horas_totales_proyectadas = horas_semanales * total_semanas
     horas_trabajadas_proyectadas = horas_semanales * semanas_trabajadas
     costo_por_hora = obtener_costo_por_hora()
@@ -1487,30 +1668,15 @@ def calcular_costo_proyectado_monitor(monitor_id, semanas_trabajadas, total_sema
     }
 
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+@cache_respuesta(*MODELOS_FINANZAS)
 def directivo_finanzas_monitor_individual(request, monitor_id):
     """
     Reporte financiero individual de un monitor específico.
     Incluye costo actual, proyectado, horas semanales, etc.
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
-    # Verificar que el monitor existe
-    try:
-        monitor = UsuarioPersonalizado.objects.get(id=monitor_id, tipo_usuario='MONITOR')
-    except UsuarioPersonalizado.DoesNotExist:
-        return Response({'detail': 'Monitor no encontrado'}, status=status.HTTP_404_NOT_FOUND)
-
     # Parámetros de filtrado
     fecha_inicio_str = request.query_params.get('fecha_inicio')
     fecha_fin_str = request.query_params.get('fecha_fin')
@@ -1528,24 +1694,41 @@ def directivo_finanzas_monitor_individual(request, monitor_id):
     else:
         fecha_fin = _parse_fecha(fecha_fin_str)
 
+    # Monitor, horas, costo, horas semanales y horarios no dependen entre sí: se consultan a la vez
+    consultas = consultar_en_paralelo(
+        monitor=lambda: UsuarioPersonalizado.objects.filter(id=monitor_id, tipo_usuario='MONITOR').first(),
+        calculo_horas=lambda: calcular_horas_totales_monitor(monitor_id, fecha_inicio, fecha_fin),
+        costo_actual=lambda: calcular_costo_total_monitor(monitor_id, fecha_inicio, fecha_fin),
+        horas_semanales=lambda: calcular_horas_semanales_monitor(monitor_id),
+        horarios=lambda: list(HorarioFijo.objects.filter(usuario_id=monitor_id))
+    )
+
+    # Verificar que el monitor existe
+    monitor = consultas['monitor']
+    if monitor is None:
+        return Response({'detail': 'Monitor no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
     # Validar semanas_trabajadas
     try:
         semanas_trabajadas = int(semanas_trabajadas)
         max_semanas = obtener_semanas_semestre()
+        if max_semanas < 1:
+            return Response({'detail': ERROR_SEMANAS_SEMESTRE}, status=status.HTTP_400_BAD_REQUEST)
         if semanas_trabajadas < 0 or semanas_trabajadas > max_semanas:
             return Response({'detail': f'semanas_trabajadas debe estar entre 0 y {max_semanas}'}, status=status.HTTP_400_BAD_REQUEST)
     except ValueError:
         return Response({'detail': 'semanas_trabajadas debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
 
     # Calcular horas y costos
-    calculo_horas = calcular_horas_totales_monitor(monitor_id, fecha_inicio, fecha_fin)
-    costo_actual = calcular_costo_total_monitor(monitor_id, fecha_inicio, fecha_fin)
-    proyeccion = calcular_costo_proyectado_monitor(monitor_id, semanas_trabajadas)
+    calculo_horas = consultas['calculo_horas']
+    costo_actual = consultas['costo_actual']
+    proyeccion = calcular_costo_proyectado_monitor(
+        monitor_id, semanas_trabajadas, max_semanas, horas_semanales=consultas['horas_semanales']
+    )
 
     # Información de horarios
-    horarios = HorarioFijo.objects.filter(usuario=monitor)
     horarios_por_dia = {}
-    for horario in horarios:
+    for horario in consultas['horarios']:
         dia = horario.get_dia_semana_display()
         if dia not in horarios_por_dia:
             horarios_por_dia[dia] = []
@@ -1585,7 +1768,7 @@ def directivo_finanzas_monitor_individual(request, monitor_id):
             'horas_trabajadas_proyectadas': proyeccion['horas_trabajadas_proyectadas'],
             'costo_total_proyectado': proyeccion['costo_total_proyectado'],
             'costo_trabajado_proyectado': proyeccion['costo_trabajado_proyectado'],
-            'porcentaje_completado': round((proyeccion['semanas_trabajadas'] / obtener_semanas_semestre()) * 100, 2)
+            'porcentaje_completado': round((proyeccion['semanas_trabajadas'] / max_semanas) * 100, 2)
         },
         'estadisticas': {
             'total_asistencias': calculo_horas['total_asistencias'],
@@ -1597,24 +1780,15 @@ def directivo_finanzas_monitor_individual(request, monitor_id):
     return Response(response_data)
 
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+@cache_respuesta(*MODELOS_FINANZAS)
 def directivo_finanzas_todos_monitores(request):
     """
     Reporte financiero consolidado de todos los monitores.
     Incluye costos totales, proyecciones, comparativas, etc.
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     # Parámetros de filtrado
     fecha_inicio_str = request.query_params.get('fecha_inicio')
     fecha_fin_str = request.query_params.get('fecha_fin')
@@ -1636,71 +1810,22 @@ def directivo_finanzas_todos_monitores(request):
     try:
         semanas_trabajadas = int(semanas_trabajadas)
         max_semanas = obtener_semanas_semestre()
+        if max_semanas < 1:
+            return Response({'detail': ERROR_SEMANAS_SEMESTRE}, status=status.HTTP_400_BAD_REQUEST)
         if semanas_trabajadas < 0 or semanas_trabajadas > max_semanas:
             return Response({'detail': f'semanas_trabajadas debe estar entre 0 y {max_semanas}'}, status=status.HTTP_400_BAD_REQUEST)
     except ValueError:
         return Response({'detail': 'semanas_trabajadas debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Obtener todos los monitores
-    monitores = UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR')
-    
-    # Calcular datos para cada monitor
-    monitores_data = []
-    total_costo_actual = 0.0
-    total_costo_proyectado = 0.0
-    total_horas_actuales = 0.0
-    total_horas_proyectadas = 0.0
-    
-    for monitor in monitores:
-        # Calcular horas y costos
-        calculo_horas = calcular_horas_totales_monitor(monitor.id, fecha_inicio, fecha_fin)
-        costo_actual = calcular_costo_total_monitor(monitor.id, fecha_inicio, fecha_fin)
-        proyeccion = calcular_costo_proyectado_monitor(monitor.id, semanas_trabajadas)
-        
-        # Solo incluir monitores que tienen horarios asignados
-        if proyeccion['horas_semanales'] > 0:
-            monitor_data = {
-                'monitor': {
-                    'id': monitor.id,
-                    'username': monitor.username,
-                    'nombre': monitor.nombre
-                },
-                'horarios_semanales': {
-                    'horas_por_semana': proyeccion['horas_semanales'],
-                    'jornadas_por_semana': proyeccion['horas_semanales'] // 4
-                },
-                'finanzas_actuales': {
-                    'horas_trabajadas': calculo_horas['horas_totales'],
-                    'costo_total': costo_actual
-                },
-                'proyeccion_semestre': {
-                    'semanas_trabajadas': proyeccion['semanas_trabajadas'],
-                    'semanas_faltantes': proyeccion['semanas_faltantes'],
-                    'costo_total_proyectado': proyeccion['costo_total_proyectado'],
-                    'costo_trabajado_proyectado': proyeccion['costo_trabajado_proyectado'],
-                    'porcentaje_completado': round((proyeccion['semanas_trabajadas'] / obtener_semanas_semestre()) * 100, 2)
-                },
-                'estadisticas': {
-                    'total_asistencias': calculo_horas['total_asistencias'],
-                    'total_ajustes': calculo_horas['total_ajustes']
-                }
-            }
-            
-            monitores_data.append(monitor_data)
-            
-            # Acumular totales
-            total_costo_actual += costo_actual
-            total_costo_proyectado += proyeccion['costo_total_proyectado']
-            total_horas_actuales += calculo_horas['horas_totales']
-            total_horas_proyectadas += proyeccion['horas_totales_proyectadas']
-
-    # Ordenar monitores por costo actual (descendente)
-    monitores_data.sort(key=lambda x: x['finanzas_actuales']['costo_total'], reverse=True)
+    # Horas y jornadas de todos los monitores en una sola carga, calculadas en forma vectorizada
+    # (el motor usa NumPy: se importa solo en los endpoints que lo necesitan)
+    from .finanzas import MotorFinanzas
+    costo_por_hora = obtener_costo_por_hora()
+    motor = MotorFinanzas(fecha_inicio, fecha_fin, semanas_trabajadas, costo_por_hora, max_semanas)
+    totales = motor.totales()
 
-    # Calcular estadísticas generales
-    total_monitores = len(monitores_data)
-    costo_promedio_por_monitor = total_costo_actual / max(1, total_monitores)
-    horas_promedio_por_monitor = total_horas_actuales / max(1, total_monitores)
+    # Monitores ordenados por costo actual (descendente)
+    monitores_data = motor.monitores_por_costo()
 
     # Respuesta
     response_data = {
@@ -1711,19 +1836,19 @@ def directivo_finanzas_todos_monitores(request):
         },
         'semanas_trabajadas': semanas_trabajadas,
         'estadisticas_generales': {
-            'total_monitores': total_monitores,
-            'costo_total_actual': round(total_costo_actual, 2),
-            'costo_total_proyectado': round(total_costo_proyectado, 2),
-            'costo_promedio_por_monitor': round(costo_promedio_por_monitor, 2),
-            'horas_totales_actuales': round(total_horas_actuales, 2),
-            'horas_totales_proyectadas': round(total_horas_proyectadas, 2),
-            'horas_promedio_por_monitor': round(horas_promedio_por_monitor, 2),
-            'costo_por_hora': obtener_costo_por_hora()
+            'total_monitores': totales['total_monitores'],
+            'costo_total_actual': round(totales['total_costo_actual'], 2),
+            'costo_total_proyectado': round(totales['total_costo_proyectado'], 2),
+            'costo_promedio_por_monitor': round(totales['costo_promedio_por_monitor'], 2),
+            'horas_totales_actuales': round(totales['total_horas_actuales'], 2),
+            'horas_totales_proyectadas': round(totales['total_horas_proyectadas'], 2),
+            'horas_promedio_por_monitor': round(totales['horas_promedio_por_monitor'], 2),
+            'costo_por_hora': costo_por_hora
         },
         'resumen_financiero': {
-            'diferencia_proyeccion_vs_actual': round(total_costo_proyectado - total_costo_actual, 2),
-            'porcentaje_ejecutado': round((total_costo_actual / max(1, total_costo_proyectado)) * 100, 2),
-            'costo_semanal_promedio': round(total_costo_actual / max(1, (fecha_fin - fecha_inicio).days + 1) * 7, 2)
+            'diferencia_proyeccion_vs_actual': round(totales['total_costo_proyectado'] - totales['total_costo_actual'], 2),
+            'porcentaje_ejecutado': round(totales['porcentaje_ejecutado'], 2),
+            'costo_semanal_promedio': round(totales['costo_semanal_promedio'], 2)
         },
         'monitores': monitores_data
     }
@@ -1731,24 +1856,15 @@ def directivo_finanzas_todos_monitores(request):
     return Response(response_data)
 
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+@cache_respuesta(*MODELOS_FINANZAS)
 def directivo_finanzas_resumen_ejecutivo(request):
     """
     Resumen ejecutivo financiero del sistema.
     Dashboard con métricas clave, tendencias y alertas.
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     # Parámetros de filtrado
     fecha_inicio_str = request.query_params.get('fecha_inicio')
     fecha_fin_str = request.query_params.get('fecha_fin')
@@ -1770,62 +1886,29 @@ def directivo_finanzas_resumen_ejecutivo(request):
     try:
         semanas_trabajadas = int(semanas_trabajadas)
         max_semanas = obtener_semanas_semestre()
+        if max_semanas < 1:
+            return Response({'detail': ERROR_SEMANAS_SEMESTRE}, status=status.HTTP_400_BAD_REQUEST)
         if semanas_trabajadas < 0 or semanas_trabajadas > max_semanas:
             return Response({'detail': f'semanas_trabajadas debe estar entre 0 y {max_semanas}'}, status=status.HTTP_400_BAD_REQUEST)
     except ValueError:
         return Response({'detail': 'semanas_trabajadas debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Obtener todos los monitores
-    monitores = UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR')
-    
-    # Calcular métricas generales
-    total_costo_actual = 0.0
-    total_costo_proyectado = 0.0
-    total_horas_actuales = 0.0
-    total_horas_proyectadas = 0.0
-    monitores_activos = 0
-    monitores_con_horarios = 0
-    
-    # Top monitores por costo
-    monitores_costo = []
-    
-    for monitor in monitores:
-        calculo_horas = calcular_horas_totales_monitor(monitor.id, fecha_inicio, fecha_fin)
-        costo_actual = calcular_costo_total_monitor(monitor.id, fecha_inicio, fecha_fin)
-        proyeccion = calcular_costo_proyectado_monitor(monitor.id, semanas_trabajadas)
-        
-        # Contar monitores con horarios
-        if proyeccion['horas_semanales'] > 0:
-            monitores_con_horarios += 1
-            
-            # Contar monitores activos (con horas trabajadas)
-            if calculo_horas['horas_totales'] > 0:
-                monitores_activos += 1
-            
-            # Acumular totales
-            total_costo_actual += costo_actual
-            total_costo_proyectado += proyeccion['costo_total_proyectado']
-            total_horas_actuales += calculo_horas['horas_totales']
-            total_horas_proyectadas += proyeccion['horas_totales_proyectadas']
-            
-            # Para top monitores
-            monitores_costo.append({
-                'monitor': {
-                    'id': monitor.id,
-                    'nombre': monitor.nombre,
-                    'username': monitor.username
-                },
-                'costo_actual': costo_actual,
-                'horas_trabajadas': calculo_horas['horas_totales']
-            })
+    # Horas y jornadas de todos los monitores en una sola carga, calculadas en forma vectorizada
+    # (el motor usa NumPy: se importa solo en los endpoints que lo necesitan)
+    from .finanzas import MotorFinanzas
+    costo_por_hora = obtener_costo_por_hora()
+    motor = MotorFinanzas(fecha_inicio, fecha_fin, semanas_trabajadas, costo_por_hora, max_semanas)
+    totales = motor.totales()
 
-    # Ordenar por costo y tomar top 5
-    monitores_costo.sort(key=lambda x: x['costo_actual'], reverse=True)
-    top_monitores = monitores_costo[:5]
+    monitores_con_horarios = totales['total_monitores']
+    monitores_activos = totales['monitores_activos']
+    total_costo_actual = totales['total_costo_actual']
+    total_costo_proyectado = totales['total_costo_proyectado']
+    porcentaje_ejecutado = totales['porcentaje_ejecutado']
+    costo_semanal_promedio = totales['costo_semanal_promedio']
 
-    # Calcular alertas y tendencias
-    porcentaje_ejecutado = (total_costo_actual / max(1, total_costo_proyectado)) * 100
-    costo_semanal_promedio = total_costo_actual / max(1, (fecha_fin - fecha_inicio).days + 1) * 7
+    # Top 5 monitores por costo
+    top_monitores = motor.top_por_costo(5)
     
     alertas = []
     if porcentaje_ejecutado > 80:
@@ -1853,11 +1936,11 @@ def directivo_finanzas_resumen_ejecutivo(request):
             'porcentaje_actividad': round((monitores_activos / max(1, monitores_con_horarios)) * 100, 2),
             'costo_total_actual': round(total_costo_actual, 2),
             'costo_total_proyectado': round(total_costo_proyectado, 2),
-            'horas_totales_actuales': round(total_horas_actuales, 2),
-            'horas_totales_proyectadas': round(total_horas_proyectadas, 2)
+            'horas_totales_actuales': round(totales['total_horas_actuales'], 2),
+            'horas_totales_proyectadas': round(totales['total_horas_proyectadas'], 2)
         },
         'indicadores_financieros': {
-            'costo_por_hora': obtener_costo_por_hora(),
+            'costo_por_hora': costo_por_hora,
             'costo_promedio_por_monitor': round(total_costo_actual / max(1, monitores_con_horarios), 2),
             'costo_semanal_promedio': round(costo_semanal_promedio, 2),
             'porcentaje_ejecutado': round(porcentaje_ejecutado, 2),
@@ -1865,12 +1948,12 @@ def directivo_finanzas_resumen_ejecutivo(request):
         },
         'top_monitores': {
             'por_costo': top_monitores,
-            'total_considerados': len(monitores_costo)
+            'total_considerados': monitores_con_horarios
         },
         'alertas': alertas,
         'resumen_semanal': {
             'costo_semanal_total': round(costo_semanal_promedio * monitores_con_horarios, 2),
-            'horas_semanal_promedio': round(total_horas_actuales / max(1, (fecha_fin - fecha_inicio).days + 1) * 7, 2),
+            'horas_semanal_promedio': round(totales['horas_semanal_promedio'], 2),
             'proyeccion_fin_semestre': round(total_costo_proyectado - total_costo_actual, 2)
         }
     }
@@ -1878,52 +1961,74 @@ def directivo_finanzas_resumen_ejecutivo(request):
     return Response(response_data)
 
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+@cache_respuesta(*MODELOS_FINANZAS)
 def directivo_finanzas_comparativa_semanas(request):
     """
     Comparativa financiera por semanas del semestre.
-    Muestra evolución de costos y horas por semana.
+    Muestra evolución real de costos y horas por semana frente a lo proyectado
+    por los horarios fijos.
+    Filtros: fecha_inicio (inicio del semestre; por defecto la configuración
+    'fecha_inicio_semestre' o el lunes de hace 7 semanas)
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
+    total_semanas = obtener_semanas_semestre()
+    if total_semanas < 1:
+        return Response({'detail': ERROR_SEMANAS_SEMESTRE}, status=status.HTTP_400_BAD_REQUEST)
+    costo_por_hora = obtener_costo_por_hora()
 
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
+    # Inicio del semestre (se normaliza al lunes de esa semana)
+    fecha_inicio_param = request.query_params.get('fecha_inicio')
+    fecha_inicio_str = fecha_inicio_param or obtener_configuracion('fecha_inicio_semestre')
+    if fecha_inicio_str:
+        try:
+            fecha_inicio = _parse_fecha_estricta(fecha_inicio_str)
+        except ValueError:
+            origen = 'fecha_inicio' if fecha_inicio_param else "La configuración 'fecha_inicio_semestre'"
+            return Response({'detail': f'{origen} debe tener formato YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        fecha_inicio = date.today() - timedelta(weeks=7)
+    fecha_inicio = fecha_inicio - timedelta(days=fecha_inicio.weekday())
+
+    # Semanas que ya comenzaron
+    semanas_trabajadas = min(total_semanas, max(0, (date.today() - fecha_inicio).days // 7 + 1))
+
+    # Proyección semanal a partir de los horarios fijos y horas reales agrupadas por
+    # semana del semestre: dos consultas independientes que se ejecutan a la vez
+    from .finanzas import horas_reales_por_semana
+    consultas = consultar_en_paralelo(
+        proyeccion=lambda: HorarioFijo.objects.filter(usuario__tipo_usuario='MONITOR').aggregate(
+            jornadas=Count('id'),
+            monitores=Count('usuario', distinct=True)
+        ),
+        horas_por_semana=lambda: horas_reales_por_semana(fecha_inicio, total_semanas)
+    )
+    proyeccion = consultas['proyeccion']
+    horas_proyectadas_semana = proyeccion['jornadas'] * HORAS_POR_JORNADA
+    costo_proyectado_semana = horas_proyectadas_semana * costo_por_hora
+    monitores_con_horarios = proyeccion['monitores']
+    horas_por_semana = consultas['horas_por_semana']
 
-    # Obtener todos los monitores
-    monitores = UsuarioPersonalizado.objects.filter(tipo_usuario='MONITOR')
-    
-    # Calcular datos por semana (simulado para las primeras 16 semanas)
     semanas_data = []
-    total_semanas = obtener_semanas_semestre()
-    
     for semana in range(1, total_semanas + 1):
-        semana_costo_total = 0.0
-        semana_horas_total = 0.0
-        monitores_semana = 0
-        
-        for monitor in monitores:
-            # Simular datos por semana (en un caso real, esto vendría de datos históricos)
-            proyeccion = calcular_costo_proyectado_monitor(monitor.id, semana)
-            
-            if proyeccion['horas_semanales'] > 0:
-                semana_costo_total += proyeccion['costo_trabajado_proyectado']
-                semana_horas_total += proyeccion['horas_trabajadas_proyectadas']
-                monitores_semana += 1
-        
+        inicio_semana = fecha_inicio + timedelta(weeks=semana - 1)
+        datos_semana = horas_por_semana.get(semana, {'horas': 0.0, 'monitores_activos': 0})
+        semana_horas_total = datos_semana['horas']
+        semana_costo_total = semana_horas_total * costo_por_hora
+        monitores_semana = datos_semana['monitores_activos']
+
         semanas_data.append({
             'semana': semana,
+            'fecha_inicio': inicio_semana.strftime('%Y-%m-%d'),
+            'fecha_fin': (inicio_semana + timedelta(days=6)).strftime('%Y-%m-%d'),
             'costo_total': round(semana_costo_total, 2),
             'horas_total': round(semana_horas_total, 2),
+            'costo_proyectado': round(costo_proyectado_semana, 2),
+            'horas_proyectadas': horas_proyectadas_semana,
             'monitores_activos': monitores_semana,
             'costo_promedio_por_monitor': round(semana_costo_total / max(1, monitores_semana), 2),
-            'estado': 'completada' if semana <= 8 else 'pendiente'
+            'estado': 'completada' if semana <= semanas_trabajadas else 'pendiente'
         })
     
     # Calcular totales acumulados
@@ -1935,28 +2040,37 @@ def directivo_finanzas_comparativa_semanas(request):
         horas_acumuladas += semana_data['horas_total']
         semana_data['costo_acumulado'] = round(costo_acumulado, 2)
         semana_data['horas_acumuladas'] = round(horas_acumuladas, 2)
+        semana_data['costo_proyectado_acumulado'] = round(costo_proyectado_semana * semana_data['semana'], 2)
     
-    # Calcular porcentajes después de tener todos los totales acumulados
-    costo_total_final = semanas_data[-1]['costo_acumulado'] if semanas_data else 0
+    # Porcentaje ejecutado frente al costo proyectado del semestre
+    costo_proyectado_semestre = costo_proyectado_semana * total_semanas
     for semana_data in semanas_data:
-        semana_data['porcentaje_completado'] = round((semana_data['costo_acumulado'] / max(1, costo_total_final)) * 100, 2)
+        semana_data['porcentaje_completado'] = round((semana_data['costo_acumulado'] / max(1, costo_proyectado_semestre)) * 100, 2)
+
+    costo_total_semestre = semanas_data[-1]['costo_acumulado'] if semanas_data else 0
+    horas_total_semestre = semanas_data[-1]['horas_acumuladas'] if semanas_data else 0
 
     # Respuesta
     response_data = {
+        'fecha_inicio_semestre': fecha_inicio.strftime('%Y-%m-%d'),
         'total_semanas': total_semanas,
-        'semanas_trabajadas': 8,  # Por defecto
-        'semanas_pendientes': total_semanas - 8,
+        'semanas_trabajadas': semanas_trabajadas,
+        'semanas_pendientes': total_semanas - semanas_trabajadas,
+        'monitores_con_horarios': monitores_con_horarios,
         'resumen_general': {
-            'costo_total_semestre': round(semanas_data[-1]['costo_acumulado'], 2),
-            'horas_total_semestre': round(semanas_data[-1]['horas_acumuladas'], 2),
-            'costo_promedio_por_semana': round(semanas_data[-1]['costo_acumulado'] / total_semanas, 2),
-            'horas_promedio_por_semana': round(semanas_data[-1]['horas_acumuladas'] / total_semanas, 2)
+            'costo_total_semestre': round(costo_total_semestre, 2),
+            'horas_total_semestre': round(horas_total_semestre, 2),
+            'costo_proyectado_semestre': round(costo_proyectado_semestre, 2),
+            'horas_proyectadas_semestre': horas_proyectadas_semana * total_semanas,
+            'costo_promedio_por_semana': round(costo_total_semestre / max(1, semanas_trabajadas), 2),
+            'horas_promedio_por_semana': round(horas_total_semestre / max(1, semanas_trabajadas), 2)
         },
         'semanas': semanas_data,
         'tendencias': {
             'costo_por_semana': [s['costo_total'] for s in semanas_data],
             'horas_por_semana': [s['horas_total'] for s in semanas_data],
-            'costo_acumulado': [s['costo_acumulado'] for s in semanas_data]
+            'costo_acumulado': [s['costo_acumulado'] for s in semanas_data],
+            'costo_proyectado_acumulado': [s['costo_proyectado_acumulado'] for s in semanas_data]
         }
     }
 
@@ -1966,23 +2080,14 @@ def directivo_finanzas_comparativa_semanas(request):
 # ===== Endpoints para CONFIGURACIONES DEL SISTEMA =====
 
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+@con_etag(ConfiguracionSistema, UsuarioPersonalizado)
 def directivo_configuraciones(request):
     """
     Listar todas las configuraciones del sistema.
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     configuraciones = ConfiguracionSistema.objects.all().select_related('creado_por')
     serializer = ConfiguracionSistemaSerializer(configuraciones, many=True)
     
@@ -1992,23 +2097,13 @@ def directivo_configuraciones(request):
     })
 
 @api_view(['POST'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
 def directivo_configuraciones_crear(request):
     """
     Crear nueva configuración del sistema.
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     serializer = ConfiguracionSistemaCreateSerializer(data=request.data)
     if serializer.is_valid():
         # Verificar si ya existe una configuración con esa clave
@@ -2019,14 +2114,14 @@ def directivo_configuraciones_crear(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        configuracion = serializer.save(creado_por=usuario_directivo)
+        configuracion = serializer.save(creado_por_id=request.user.id)
         return Response(ConfiguracionSistemaSerializer(configuracion).data, status=status.HTTP_201_CREATED)
     else:
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
 def directivo_configuraciones_detalle(request, clave):
     """
     GET: Obtener configuración específica
@@ -2034,16 +2129,6 @@ def directivo_configuraciones_detalle(request, clave):
     DELETE: Eliminar configuración
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     try:
         configuracion = ConfiguracionSistema.objects.select_related('creado_por').get(clave=clave)
     except ConfiguracionSistema.DoesNotExist:
@@ -2065,8 +2150,8 @@ def directivo_configuraciones_detalle(request, clave):
         return Response({'detail': 'Configuración eliminada exitosamente'}, status=status.HTTP_204_NO_CONTENT)
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
 def directivo_configuraciones_detalle_por_id(request, id):
     """
     GET: Obtener configuración específica por ID
@@ -2074,16 +2159,6 @@ def directivo_configuraciones_detalle_por_id(request, id):
     DELETE: Eliminar configuración por ID
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     try:
         configuracion = ConfiguracionSistema.objects.select_related('creado_por').get(id=id)
     except ConfiguracionSistema.DoesNotExist:
@@ -2105,24 +2180,15 @@ def directivo_configuraciones_detalle_por_id(request, id):
         return Response({'detail': 'Configuración eliminada exitosamente'}, status=status.HTTP_204_NO_CONTENT)
 
 @api_view(['GET'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
+@cache_respuesta(*MODELOS_FINANZAS)
 def directivo_total_horas_horarios(request):
     """
     Calcular el total de horas basado en los horarios fijos de los monitores * total de semanas.
     Filtros opcionales: monitor_id, sede, jornada
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     # Parámetros de filtrado
     monitor_id = request.query_params.get('monitor_id')
     sede = request.query_params.get('sede')  # SA|BA
@@ -2195,8 +2261,7 @@ def directivo_total_horas_horarios(request):
 
     # Calcular horas y costos para cada monitor
     for monitor_id, data in monitores_data.items():
-        # Cada jornada = 4 horas
-        horas_semanales = data['total_jornadas_semana'] * 4
+        horas_semanales = data['total_jornadas_semana'] * HORAS_POR_JORNADA
         horas_semestre = horas_semanales * total_semanas
         costo_semestre = horas_semestre * costo_por_hora
         
@@ -2227,7 +2292,7 @@ def directivo_total_horas_horarios(request):
         'configuracion': {
             'total_semanas_semestre': total_semanas,
             'costo_por_hora': costo_por_hora,
-            'horas_por_jornada': 4
+            'horas_por_jornada': HORAS_POR_JORNADA
         },
         'estadisticas_generales': {
             'total_monitores': total_monitores,
@@ -2260,8 +2325,8 @@ def _calcular_resumen_por_sede(monitores_data):
             sede = horario['sede']
             if sede in resumen:
                 resumen[sede]['monitores'] += 1
-                resumen[sede]['horas_semana'] += 4  # 4 horas por jornada
-                resumen[sede]['horas_semestre'] += 4 * 14  # 14 semanas por defecto
+                resumen[sede]['horas_semana'] += HORAS_POR_JORNADA
+                resumen[sede]['horas_semestre'] += HORAS_POR_JORNADA * 14  # 14 semanas por defecto
     
     return resumen
 
@@ -2275,29 +2340,19 @@ def _calcular_resumen_por_jornada(monitores_data):
             jornada = horario['jornada']
             if jornada in resumen:
                 resumen[jornada]['monitores'] += 1
-                resumen[jornada]['horas_semana'] += 4  # 4 horas por jornada
-                resumen[jornada]['horas_semestre'] += 4 * 14  # 14 semanas por defecto
+                resumen[jornada]['horas_semana'] += HORAS_POR_JORNADA
+                resumen[jornada]['horas_semestre'] += HORAS_POR_JORNADA * 14  # 14 semanas por defecto
     
     return resumen
 
 @api_view(['POST'])
-@authentication_classes([])
-@permission_classes([AllowAny])
+@authentication_classes([UsuarioPersonalizadoJWTAuthentication])
+@permission_classes([EsDirectivo])
 def directivo_configuraciones_inicializar(request):
     """
     Inicializar configuraciones por defecto del sistema.
     Acceso: solo DIRECTIVO
     """
-    # Autenticación manual
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return Response({'detail': 'Token de autenticación requerido'}, status=status.HTTP_401_UNAUTHORIZED)
-
-    # Usuario DIRECTIVO temporal
-    usuario_directivo = UsuarioPersonalizado.objects.filter(tipo_usuario='DIRECTIVO').first()
-    if not usuario_directivo:
-        return Response({'detail': 'No hay usuarios DIRECTIVO'}, status=status.HTTP_403_FORBIDDEN)
-
     configuraciones_por_defecto = [
         {
             'clave': 'costo_por_hora',
@@ -2327,7 +2382,7 @@ def directivo_configuraciones_inicializar(request):
                 valor=config_data['valor'],
                 descripcion=config_data['descripcion'],
                 tipo_dato=config_data['tipo_dato'],
-                creado_por=usuario_directivo
+                creado_por_id=request.user.id
             )
             configuraciones_creadas.append(ConfiguracionSistemaSerializer(configuracion).data)
 